@@ -0,0 +1,4 @@
+"""Analysis helpers."""
+
+from .bus_stats import BusStats, frame_bits  # noqa: F401
+from .dbc import DbcDatabase, DbcSyntaxError, load_dbc, parse_dbc  # noqa: F401
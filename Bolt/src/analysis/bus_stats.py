@@ -0,0 +1,194 @@
+"""Online bus-load and per-identifier timing statistics.
+
+Everything here is updated in O(1) per frame with constant memory per ID:
+period mean and jitter use Welford's algorithm, and frame/bit rates come
+from a fixed ring of 100 ms buckets keyed by the device timestamp. Frames
+only move that ring forward, so reads move it on by the host time elapsed
+since the newest bucket began: a bus that goes quiet drops to 0 frames/s.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_BITRATE = 500_000
+# Sliding windows reported by BusStats.rates(), in seconds
+WINDOWS = (1, 10, 60)
+
+_BUCKET_US = 100_000
+_BUCKETS = max(WINDOWS) * 1_000_000 // _BUCKET_US
+
+
+def frame_bits(extended: bool, dlc: int, rtr: bool = False) -> int:
+    """Worst-case on-wire length of a classic CAN frame in bits.
+
+    Counts SOF through EOF plus the 3-bit interframe space, with the maximum
+    number of stuff bits for the stuffed region (SOF to CRC)::
+
+        g + 8n + 13 + floor((g + 8n - 1) / 4),  g = 34 (standard) or 54 (extended)
+    """
+    data_bits = 0 if rtr else 8 * min(max(dlc, 0), 8)
+    g = 54 if extended else 34
+    return g + data_bits + 13 + (g + data_bits - 1) // 4
+
+
+class IdTiming:
+    """Per-identifier count and period statistics (Welford)."""
+
+    __slots__ = ('count', 'last_ts_us', 'periods', 'mean_us', 'm2', 'bits')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.last_ts_us: Optional[int] = None
+        self.periods = 0
+        self.mean_us = 0.0
+        self.m2 = 0.0
+        self.bits = 0
+
+    def add(self, ts_us: int, bits: int) -> None:
+        self.count += 1
+        self.bits += bits
+        last = self.last_ts_us
+        self.last_ts_us = ts_us
+        if last is None or ts_us < last:
+            return
+        period = ts_us - last
+        self.periods += 1
+        delta = period - self.mean_us
+        self.mean_us += delta / self.periods
+        self.m2 += delta * (period - self.mean_us)
+
+    @property
+    def jitter_us(self) -> float:
+        """Standard deviation of the period."""
+        if self.periods < 2:
+            return 0.0
+        return math.sqrt(self.m2 / (self.periods - 1))
+
+
+class BusStats:
+    """Frame rates, bus load and per-ID timing for one CAN bus."""
+
+    def __init__(self, bitrate: int = DEFAULT_BITRATE) -> None:
+        self.bitrate = int(bitrate)
+        self.reset()
+
+    def reset(self) -> None:
+        self.ids: Dict[int, IdTiming] = {}
+        self.total_frames = 0
+        self.total_bits = 0
+        self._frames = array('I', bytes(4 * _BUCKETS))
+        self._bits = array('Q', bytes(8 * _BUCKETS))
+        # Absolute indexes (ts_us // bucket size) of the oldest and newest buckets
+        self._origin = 0
+        self._head: Optional[int] = None
+        # Host clock (time.monotonic) at which the head bucket began
+        self._head_host = 0.0
+
+    def set_bitrate(self, bitrate: int) -> None:
+        if bitrate <= 0:
+            raise ValueError('bitrate must be positive')
+        self.bitrate = int(bitrate)
+
+    def update(self, ts_us: int, identifier: int, extended: bool, dlc: int, rtr: bool = False) -> None:
+        bits = frame_bits(extended, dlc, rtr)
+        self.total_frames += 1
+        self.total_bits += bits
+
+        timing = self.ids.get(identifier)
+        if timing is None:
+            timing = self.ids[identifier] = IdTiming()
+        timing.add(ts_us, bits)
+
+        bucket = ts_us // _BUCKET_US
+        head = self._head
+        if head is None or abs(bucket - head) >= _BUCKETS:
+            # First frame, a long silence or a device clock reset
+            self._clear_buckets()
+            self._origin = self._head = head = bucket
+            self._head_host = time.monotonic() - (ts_us % _BUCKET_US) / 1e6
+        elif bucket > head:
+            self._advance(bucket)
+            self._head_host = time.monotonic() - (ts_us % _BUCKET_US) / 1e6
+        slot = bucket % _BUCKETS
+        self._frames[slot] += 1
+        self._bits[slot] += bits
+
+    def _advance(self, bucket: int) -> None:
+        """Make ``bucket`` the head, emptying the buckets in between."""
+        head = self._head
+        assert head is not None
+        for skipped in range(head + 1, min(bucket, head + _BUCKETS) + 1):
+            slot = skipped % _BUCKETS
+            self._frames[slot] = 0
+            self._bits[slot] = 0
+        self._head = bucket
+
+    def _catch_up(self, now: Optional[float]) -> None:
+        """Move the head on by the host time elapsed since it began (no frames meanwhile)."""
+        if self._head is None:
+            return
+        now = time.monotonic() if now is None else now
+        elapsed = int((now - self._head_host) * 1e6) // _BUCKET_US
+        if elapsed > 0:
+            self._advance(self._head + elapsed)
+            self._head_host += elapsed * _BUCKET_US / 1e6
+
+    def _clear_buckets(self) -> None:
+        for slot in range(_BUCKETS):
+            self._frames[slot] = 0
+            self._bits[slot] = 0
+
+    def _window(self, seconds: int) -> Tuple[int, int, float]:
+        """Frames, bits and covered seconds over the last ``seconds``.
+
+        Only complete buckets count, and right after a (re)start the window
+        shrinks to the time actually observed so rates are not diluted.
+        """
+        if self._head is None:
+            return 0, 0, 0.0
+        count = min(seconds * 1_000_000 // _BUCKET_US, _BUCKETS - 1, self._head - self._origin)
+        frames = bits = 0
+        # Skip the bucket that is still filling
+        for absolute in range(self._head - count, self._head):
+            slot = absolute % _BUCKETS
+            frames += self._frames[slot]
+            bits += self._bits[slot]
+        return frames, bits, count * _BUCKET_US / 1e6
+
+    def rates(self, now: Optional[float] = None) -> Dict[int, float]:
+        """Frames per second for each window in :data:`WINDOWS` (``now`` is ``time.monotonic()``)."""
+        self._catch_up(now)
+        out: Dict[int, float] = {}
+        for seconds in WINDOWS:
+            frames, _, covered = self._window(seconds)
+            out[seconds] = frames / covered if covered else 0.0
+        return out
+
+    def bus_load(self, seconds: int = 1, now: Optional[float] = None) -> float:
+        """Estimated bus load (0..1) over the window, from worst-case bit lengths."""
+        self._catch_up(now)
+        _, bits, covered = self._window(seconds)
+        if not covered:
+            return 0.0
+        return min(bits / covered / self.bitrate, 1.0)
+
+    def top_ids(self, limit: int = 12) -> List[Tuple[int, IdTiming]]:
+        return heapq.nlargest(limit, self.ids.items(), key=lambda item: item[1].count)
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, object]:
+        now = time.monotonic() if now is None else now
+        return {
+            'bitrate': self.bitrate,
+            'total_frames': self.total_frames,
+            'frames_per_s': self.rates(now),
+            'bus_load': {seconds: self.bus_load(seconds, now) for seconds in WINDOWS},
+            'ids': len(self.ids),
+        }
+
+
+__all__ = ['DEFAULT_BITRATE', 'WINDOWS', 'BusStats', 'IdTiming', 'frame_bits']
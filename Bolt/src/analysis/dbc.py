@@ -0,0 +1,295 @@
+"""DBC loading and signal decoding with precompiled per-message extractors.
+
+Each signal is compiled once into a shift/mask over the 64-bit payload word
+(little-endian for Intel signals, big-endian for Motorola ones), so decoding is
+a handful of integer operations. :meth:`DbcMessage.decode_many` decodes a batch
+of frames of one message column-wise: the payloads are converted into word
+arrays in one call and every signal is extracted with a single comprehension
+over them.
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Bit 31 of a BO_ identifier marks an extended (29-bit) frame
+_DBC_EXT_FLAG = 0x80000000
+
+_BO_RE = re.compile(r'^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s*(\w*)')
+_SG_RE = re.compile(
+    r'^SG_\s+(\w+)\s*(M|m\d+M?)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*'
+    r'\(\s*([^,\s]+)\s*,\s*([^)\s]+)\s*\)\s*'
+    r'\[\s*([^|\s]*)\s*\|\s*([^\]\s]*)\s*\]\s*"([^"]*)"'
+)
+_VAL_RE = re.compile(r'^VAL_\s+(\d+)\s+(\w+)\s+(.*);')
+_VAL_ITEM_RE = re.compile(r'(-?\d+)\s+"([^"]*)"')
+_VALTYPE_RE = re.compile(r'^SIG_VALTYPE_\s+(\d+)\s+(\w+)\s*:?\s*([12])\s*;')
+# SIG_VALTYPE_ 1 = IEEE float32, 2 = float64
+_FLOAT_TYPES = {1: struct.Struct('<f'), 2: struct.Struct('<d')}
+_WORD_TYPES = {1: struct.Struct('<I'), 2: struct.Struct('<Q')}
+
+
+class DbcSyntaxError(ValueError):
+    """Raised for a DBC line that cannot be parsed."""
+
+    def __init__(self, message: str, line: int) -> None:
+        super().__init__(f'{message} (line {line})')
+        self.line = line
+
+
+@dataclass
+class DbcSignal:
+    name: str
+    start: int
+    length: int
+    little_endian: bool
+    signed: bool
+    scale: float = 1.0
+    offset: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    unit: str = ''
+    # Multiplexed signals are only present when the multiplexor equals this value
+    mux_value: Optional[int] = None
+    is_multiplexor: bool = False
+    # 1 = IEEE float32, 2 = float64 (SIG_VALTYPE_)
+    float_type: int = 0
+    choices: Dict[int, str] = field(default_factory=dict)
+
+    # Compiled extractor, filled in by compile()
+    shift: int = field(default=0, init=False, repr=False)
+    mask: int = field(default=0, init=False, repr=False)
+    sign_bit: int = field(default=0, init=False, repr=False)
+
+    def compile(self) -> None:
+        if self.little_endian:
+            shift = self.start
+        else:
+            # Motorola start bit is the MSB in DBC "sawtooth" numbering; map it
+            # to a position counted from the MSB of the big-endian word
+            msb = (self.start // 8) * 8 + (7 - self.start % 8)
+            shift = 63 - (msb + self.length - 1)
+        if self.length <= 0 or shift < 0 or shift + self.length > 64:
+            raise ValueError(f'signal {self.name} does not fit in 8 bytes')
+        self.shift = shift
+        self.mask = (1 << self.length) - 1
+        self.sign_bit = 1 << (self.length - 1) if self.signed else 0
+
+    @property
+    def is_identity(self) -> bool:
+        return self.scale == 1.0 and self.offset == 0.0 and not self.float_type
+
+    def raw(self, le_word: int, be_word: int) -> int:
+        value = ((le_word if self.little_endian else be_word) >> self.shift) & self.mask
+        if self.sign_bit and value & self.sign_bit:
+            value -= self.mask + 1
+        return value
+
+    def physical(self, raw: int) -> Union[int, float]:
+        if self.float_type:
+            raw = _FLOAT_TYPES[self.float_type].unpack(_WORD_TYPES[self.float_type].pack(raw & self.mask))[0]
+        if self.is_identity:
+            return raw
+        return raw * self.scale + self.offset
+
+    def raw_column(self, le_words: array, be_words: array) -> List[int]:
+        """Raw (sign-extended) values of this signal for a batch of payload words."""
+        words = le_words if self.little_endian else be_words
+        shift, mask = self.shift, self.mask
+        raws = [(w >> shift) & mask for w in words]
+        if self.sign_bit:
+            sign, full = self.sign_bit, mask + 1
+            raws = [r - full if r & sign else r for r in raws]
+        return raws
+
+    def column(self, le_words: array, be_words: array) -> List[Union[int, float]]:
+        """Physical values of this signal for a batch of payload words."""
+        raws = self.raw_column(le_words, be_words)
+        if self.float_type:
+            return [self.physical(r) for r in raws]
+        if self.is_identity:
+            return raws
+        scale, offset = self.scale, self.offset
+        return [r * scale + offset for r in raws]
+
+    def format(self, value: Union[int, float]) -> str:
+        if self.choices and isinstance(value, int) and value in self.choices:
+            return self.choices[value]
+        text = f'{value:g}' if isinstance(value, float) else str(value)
+        return f'{text} {self.unit}' if self.unit else text
+
+
+@dataclass
+class DbcMessage:
+    frame_id: int
+    name: str
+    dlc: int
+    extended: bool = False
+    sender: str = ''
+    signals: List[DbcSignal] = field(default_factory=list)
+    multiplexor: Optional[DbcSignal] = field(default=None, init=False, repr=False)
+
+    def compile(self) -> None:
+        for signal in self.signals:
+            signal.compile()
+        self.multiplexor = next((s for s in self.signals if s.is_multiplexor), None)
+
+    def signal(self, name: str) -> Optional[DbcSignal]:
+        for signal in self.signals:
+            if signal.name == name:
+                return signal
+        return None
+
+    def decode(self, payload: bytes) -> Dict[str, Union[int, float]]:
+        """Decode one payload (shorter payloads are zero padded)."""
+        block = bytes(payload[:8]).ljust(8, b'\x00')
+        le_word = int.from_bytes(block, 'little')
+        be_word = int.from_bytes(block, 'big')
+        mux = None
+        if self.multiplexor is not None:
+            mux = self.multiplexor.raw(le_word, be_word)
+        out: Dict[str, Union[int, float]] = {}
+        for signal in self.signals:
+            if signal.mux_value is not None and signal.mux_value != mux:
+                continue
+            out[signal.name] = signal.physical(signal.raw(le_word, be_word))
+        return out
+
+    def decode_many(self, block: bytes) -> Dict[str, List[Optional[Union[int, float]]]]:
+        """Decode ``block`` (concatenated 8-byte payloads) column by column.
+
+        Multiplexed signals are ``None`` for frames where their multiplexor
+        value does not match.
+        """
+        le_words, be_words = payload_words(block)
+        columns: Dict[str, List[Optional[Union[int, float]]]] = {}
+        mux_column: Optional[List[int]] = None
+        if self.multiplexor is not None:
+            mux_column = self.multiplexor.raw_column(le_words, be_words)
+        for signal in self.signals:
+            values: List[Optional[Union[int, float]]] = list(signal.column(le_words, be_words))
+            if signal.mux_value is not None and mux_column is not None:
+                wanted = signal.mux_value
+                values = [v if m == wanted else None for v, m in zip(values, mux_column)]
+            columns[signal.name] = values
+        return columns
+
+
+def payload_words(block: bytes) -> Tuple[array, array]:
+    """Little- and big-endian 64-bit words of concatenated 8-byte payloads."""
+    le_words = array('Q')
+    le_words.frombytes(block[: len(block) - len(block) % 8])
+    be_words = array('Q', le_words)
+    if sys.byteorder == 'little':
+        be_words.byteswap()
+    else:
+        le_words.byteswap()
+    return le_words, be_words
+
+
+class DbcDatabase:
+    """Messages of one DBC file, keyed by identifier for O(1) dispatch."""
+
+    def __init__(self, messages: Iterable[DbcMessage] = ()) -> None:
+        self.messages: Dict[int, DbcMessage] = {}
+        for message in messages:
+            message.compile()
+            self.messages[message.frame_id] = message
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def message(self, identifier: int) -> Optional[DbcMessage]:
+        return self.messages.get(identifier)
+
+    def message_by_name(self, name: str) -> Optional[DbcMessage]:
+        for message in self.messages.values():
+            if message.name == name:
+                return message
+        return None
+
+
+def parse_dbc(text: str) -> DbcDatabase:
+    """Parse the message, signal, value-table and value-type sections of a DBC."""
+    messages: Dict[int, DbcMessage] = {}
+    current: Optional[DbcMessage] = None
+    for lineno, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if stripped.startswith('BO_ '):
+            match = _BO_RE.match(stripped)
+            if not match:
+                raise DbcSyntaxError('invalid BO_ definition', lineno)
+            raw_id = int(match.group(1))
+            current = DbcMessage(
+                frame_id=raw_id & ~_DBC_EXT_FLAG,
+                name=match.group(2),
+                dlc=int(match.group(3)),
+                extended=bool(raw_id & _DBC_EXT_FLAG),
+                sender=match.group(4),
+            )
+            messages[raw_id] = current
+        elif stripped.startswith('SG_ '):
+            match = _SG_RE.match(stripped)
+            if not match or current is None:
+                raise DbcSyntaxError('invalid SG_ definition', lineno)
+            name, mux, start, length, order, sign, scale, offset, low, high, unit = match.groups()
+            mux = mux or ''
+            try:
+                signal = DbcSignal(
+                    name=name,
+                    start=int(start),
+                    length=int(length),
+                    little_endian=order == '1',
+                    signed=sign == '-',
+                    scale=float(scale),
+                    offset=float(offset),
+                    minimum=float(low) if low else None,
+                    maximum=float(high) if high else None,
+                    unit=unit,
+                    mux_value=int(mux[1:].rstrip('M')) if mux.startswith('m') else None,
+                    is_multiplexor=mux.endswith('M'),
+                )
+            except ValueError as exc:
+                raise DbcSyntaxError(str(exc), lineno) from None
+            current.signals.append(signal)
+        elif stripped.startswith('VAL_ '):
+            match = _VAL_RE.match(stripped)
+            message = messages.get(int(match.group(1))) if match else None
+            signal = message.signal(match.group(2)) if match and message else None
+            if signal is not None:
+                signal.choices = {int(k): v for k, v in _VAL_ITEM_RE.findall(match.group(3))}
+        elif stripped.startswith('SIG_VALTYPE_ '):
+            match = _VALTYPE_RE.match(stripped)
+            message = messages.get(int(match.group(1))) if match else None
+            signal = message.signal(match.group(2)) if match and message else None
+            if signal is not None:
+                signal.float_type = int(match.group(3))
+        elif stripped and not line[:1].isspace():
+            # Any other top-level keyword ends the current message block
+            current = None
+    try:
+        return DbcDatabase(messages.values())
+    except ValueError as exc:
+        raise DbcSyntaxError(str(exc), 0) from None
+
+
+def load_dbc(path: str, encoding: str = 'cp1252') -> DbcDatabase:
+    """Load a DBC file (Vector tools write cp1252 by default)."""
+    with open(path, 'r', encoding=encoding, errors='replace') as fh:
+        return parse_dbc(fh.read())
+
+
+__all__ = [
+    'DbcDatabase',
+    'DbcMessage',
+    'DbcSignal',
+    'DbcSyntaxError',
+    'load_dbc',
+    'parse_dbc',
+    'payload_words',
+]
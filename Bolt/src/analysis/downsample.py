@@ -0,0 +1,168 @@
+"""Downsampling of time series to a chart's pixel width.
+
+:func:`lttb` (Largest-Triangle-Three-Buckets) keeps the visual shape of a
+window with ``threshold`` points; :func:`min_max` keeps the extremes of every
+bucket so spikes are never lost. :class:`MinMaxEnvelope` maintains the min/max
+reduction incrementally as points arrive, so the full-range view costs O(1)
+per new point instead of a pass over the whole history.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import List, Sequence, Tuple
+
+Points = List[Tuple[float, float]]
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> Points:
+    """Largest-Triangle-Three-Buckets downsampling of ``(xs, ys)``."""
+    count = len(xs)
+    if threshold >= count or threshold < 3:
+        return list(zip(xs, ys))
+
+    out: Points = [(xs[0], ys[0])]
+    every = (count - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, count)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        out.append((xs[best], ys[best]))
+        a = best
+    out.append((xs[count - 1], ys[count - 1]))
+    return out
+
+
+def min_max(xs: Sequence[float], ys: Sequence[float], buckets: int) -> Points:
+    """Keep the minimum and maximum of each of ``buckets`` equal-count buckets."""
+    count = len(xs)
+    if buckets <= 0 or count <= 2 * buckets:
+        return list(zip(xs, ys))
+    out: Points = []
+    size = count / buckets
+    for b in range(buckets):
+        start = int(b * size)
+        end = int((b + 1) * size)
+        if start >= end:
+            continue
+        window = ys[start:end]
+        lo = start + min(range(len(window)), key=window.__getitem__)
+        hi = start + max(range(len(window)), key=window.__getitem__)
+        for j in sorted({lo, hi}):
+            out.append((xs[j], ys[j]))
+    return out
+
+
+class MinMaxEnvelope:
+    """Incremental min/max reduction over time-aligned buckets.
+
+    Buckets are ``bucket_us`` wide. When more than ``max_buckets`` exist the
+    width doubles and neighbouring buckets are merged, which is exact for
+    min/max, so the envelope never has to be rebuilt from the raw points.
+    """
+
+    def __init__(self, max_buckets: int, bucket_us: int = 1000) -> None:
+        self.max_buckets = max(int(max_buckets), 1)
+        self.initial_bucket_us = max(int(bucket_us), 1)
+        self.clear()
+
+    def clear(self) -> None:
+        self.bucket_us = self.initial_bucket_us
+        self._keys = array('q')
+        self._min_ts = array('q')
+        self._min = array('d')
+        self._max_ts = array('q')
+        self._max = array('d')
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, ts_us: int, value: float) -> None:
+        key = ts_us // self.bucket_us
+        keys = self._keys
+        if keys and key == keys[-1]:
+            if value < self._min[-1]:
+                self._min[-1] = value
+                self._min_ts[-1] = ts_us
+            if value > self._max[-1]:
+                self._max[-1] = value
+                self._max_ts[-1] = ts_us
+            return
+        if keys and key < keys[-1]:
+            # Out-of-order sample: fold it into the last bucket
+            if value < self._min[-1]:
+                self._min[-1] = value
+            if value > self._max[-1]:
+                self._max[-1] = value
+            return
+        keys.append(key)
+        self._min_ts.append(ts_us)
+        self._min.append(value)
+        self._max_ts.append(ts_us)
+        self._max.append(value)
+        if len(keys) > self.max_buckets:
+            self._coarsen()
+
+    def _coarsen(self) -> None:
+        while len(self._keys) > self.max_buckets:
+            self.bucket_us *= 2
+            keys, min_ts, mins, max_ts, maxs = array('q'), array('q'), array('d'), array('q'), array('d')
+            for i, key in enumerate(self._keys):
+                key //= 2
+                if keys and keys[-1] == key:
+                    if self._min[i] < mins[-1]:
+                        mins[-1] = self._min[i]
+                        min_ts[-1] = self._min_ts[i]
+                    if self._max[i] > maxs[-1]:
+                        maxs[-1] = self._max[i]
+                        max_ts[-1] = self._max_ts[i]
+                    continue
+                keys.append(key)
+                min_ts.append(self._min_ts[i])
+                mins.append(self._min[i])
+                max_ts.append(self._max_ts[i])
+                maxs.append(self._max[i])
+            self._keys, self._min_ts, self._min, self._max_ts, self._max = keys, min_ts, mins, max_ts, maxs
+
+    def evict_before(self, ts_us: int) -> None:
+        """Drop buckets that end before ``ts_us`` (points evicted upstream)."""
+        cut = 0
+        limit = ts_us // self.bucket_us
+        keys = self._keys
+        while cut < len(keys) and keys[cut] < limit:
+            cut += 1
+        if cut:
+            for column in (self._keys, self._min_ts, self._min, self._max_ts, self._max):
+                del column[:cut]
+
+    def points(self) -> List[Tuple[int, float]]:
+        """Min and max of every bucket, in time order."""
+        out: List[Tuple[int, float]] = []
+        for i in range(len(self._keys)):
+            lo = (self._min_ts[i], self._min[i])
+            hi = (self._max_ts[i], self._max[i])
+            if lo[0] == hi[0]:
+                out.append(hi)
+            elif lo[0] < hi[0]:
+                out.extend((lo, hi))
+            else:
+                out.extend((hi, lo))
+        return out
+
+
+__all__ = ['MinMaxEnvelope', 'Points', 'lttb', 'min_max']
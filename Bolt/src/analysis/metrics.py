@@ -0,0 +1,256 @@
+"""Counters and latency histograms for the ingestion and render paths.
+
+Collection is off by default. Instrumented code checks the module-level
+``ENABLED`` flag before it measures anything, so with metrics off each
+instrumented site costs one attribute lookup per serial read, text line or
+render. Totals that other modules already keep (stored frames, queue
+depths, drop counters) are registered as *collected* metrics and only read
+when :func:`render` runs.
+
+:func:`render` produces the Prometheus text exposition format, which
+``metrics_api`` serves at ``/metrics``. Metrics are per process: a decoder
+process (see ``usb_serial.decode_process``) does not report its reads.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+ENABLED = False
+
+# Upper bounds in seconds
+PARSE_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3)
+DECODE_BUCKETS = (1e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 5e-2)
+RENDER_BUCKETS = (1e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25)
+LATENCY_BUCKETS = (1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Sample = Tuple[str, str, float]
+
+_LOCK = threading.Lock()
+_METRICS: Dict[str, Union['Counter', 'Histogram', 'Collected']] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """A monotonically increasing total, optionally split by one label."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, label: Optional[str] = None) -> None:
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self._values: Dict[str, float] = {}
+
+    def inc(self, amount: float = 1, label_value: str = '') -> None:
+        with _LOCK:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value: str = '') -> float:
+        return self._values.get(label_value, 0)
+
+    def reset(self) -> None:
+        with _LOCK:
+            self._values.clear()
+
+    def samples(self) -> Iterator[Sample]:
+        with _LOCK:
+            items = sorted(self._values.items())
+        for label_value, value in items:
+            yield self.name, _labels([(self.label, label_value)] if self.label else []), value
+
+
+class Histogram:
+    """Observations counted into cumulative ``le`` buckets, with sum and count."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label: Optional[str] = None) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label = label
+        # label value -> [bucket counts (last is +Inf), sum, count]
+        self._series: Dict[str, List] = {}
+
+    def observe(self, value: float, label_value: str = '', count: int = 1) -> None:
+        """Add ``count`` observations of ``value`` (seconds for the latency histograms)."""
+        index = bisect_left(self.buckets, value)
+        with _LOCK:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += count
+            series[1] += value * count
+            series[2] += count
+
+    def count(self, label_value: str = '') -> int:
+        series = self._series.get(label_value)
+        return series[2] if series else 0
+
+    def reset(self) -> None:
+        with _LOCK:
+            self._series.clear()
+
+    def samples(self) -> Iterator[Sample]:
+        with _LOCK:
+            items = sorted((key, ([*series[0]], series[1], series[2])) for key, series in self._series.items())
+        for label_value, (counts, total, count) in items:
+            base = [(self.label, label_value)] if self.label else []
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket
+                yield f'{self.name}_bucket', _labels(base + [('le', _number(bound))]), cumulative
+            yield f'{self.name}_sum', _labels(base), total
+            yield f'{self.name}_count', _labels(base), count
+
+
+class Collected:
+    """A gauge or counter whose value is read from ``fn`` at scrape time.
+
+    ``fn`` returns a number, or a dict of numbers by ``label`` value.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable[[], Union[float, Dict[str, float]]],
+        kind: str = 'gauge',
+        label: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.kind = kind
+        self.label = label
+
+    def reset(self) -> None:
+        pass
+
+    def samples(self) -> Iterator[Sample]:
+        try:
+            value = self.fn()
+        except Exception:
+            return
+        if isinstance(value, dict):
+            for label_value, number in sorted(value.items()):
+                yield self.name, _labels([(self.label or 'name', str(label_value))]), number
+        else:
+            yield self.name, '', value
+
+
+def counter(name: str, help_text: str, label: Optional[str] = None) -> Counter:
+    metric = _METRICS.get(name)
+    if not isinstance(metric, Counter):
+        metric = _METRICS[name] = Counter(name, help_text, label)
+    return metric
+
+
+def histogram(name: str, help_text: str, buckets: Sequence[float], label: Optional[str] = None) -> Histogram:
+    metric = _METRICS.get(name)
+    if not isinstance(metric, Histogram):
+        metric = _METRICS[name] = Histogram(name, help_text, buckets, label)
+    return metric
+
+
+def collected(
+    name: str,
+    help_text: str,
+    fn: Callable[[], Union[float, Dict[str, float]]],
+    kind: str = 'gauge',
+    label: Optional[str] = None,
+) -> Collected:
+    """Register (or replace) a metric that is read from ``fn`` when scraped."""
+    metric = _METRICS[name] = Collected(name, help_text, fn, kind, label)
+    return metric
+
+
+def enable(enabled: bool = True) -> None:
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def enabled() -> bool:
+    return ENABLED
+
+
+def reset() -> None:
+    """Zero the counters and histograms (collected metrics are not ours to reset)."""
+    for metric in list(_METRICS.values()):
+        metric.reset()
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format (version 0.0.4)."""
+    lines = [
+        '# HELP bolt_metrics_enabled Whether hot-path metrics are being collected.',
+        '# TYPE bolt_metrics_enabled gauge',
+        f'bolt_metrics_enabled {int(ENABLED)}',
+    ]
+    for name in sorted(_METRICS):
+        metric = _METRICS[name]
+        lines.append(f'# HELP {name} {metric.help}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for sample_name, labels, value in metric.samples():
+            lines.append(f'{sample_name}{labels} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# Instrumented in usb_serial.framing, jtag.data_processor, gui.render and gui.state
+BYTES_READ = counter('bolt_serial_bytes_read_total', 'Bytes read from sniffer ports.', 'channel')
+LINES_FRAMED = counter('bolt_serial_lines_total', 'Text lines split off the serial stream.', 'channel')
+BATCHES_DECODED = counter('bolt_serial_binary_batches_total', 'Binary frame batches decoded.', 'channel')
+DECODE_SECONDS = histogram(
+    'bolt_decode_seconds', 'Time to frame and fast-parse one serial read.', DECODE_BUCKETS
+)
+LINE_PARSE_SECONDS = histogram(
+    'bolt_line_parse_seconds', 'Time to process one text line (generic path, logs, status).', PARSE_BUCKETS
+)
+RENDER_SECONDS = histogram('bolt_render_seconds', 'Time to render one view for all clients.', RENDER_BUCKETS, 'view')
+FRAME_TO_RENDER_SECONDS = histogram(
+    'bolt_frame_to_render_seconds',
+    'Device timestamp of the newest frame to the end of the table render, '
+    'relative to the fastest frame seen.',
+    LATENCY_BUCKETS,
+)
+
+
+__all__ = [
+    'BATCHES_DECODED',
+    'BYTES_READ',
+    'DECODE_SECONDS',
+    'FRAME_TO_RENDER_SECONDS',
+    'LINES_FRAMED',
+    'LINE_PARSE_SECONDS',
+    'RENDER_SECONDS',
+    'Collected',
+    'Counter',
+    'Histogram',
+    'collected',
+    'counter',
+    'enable',
+    'enabled',
+    'histogram',
+    'render',
+    'reset',
+]
@@ -0,0 +1,146 @@
+"""Per-signal ring buffers and their downsampled chart views."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+from analysis.downsample import MinMaxEnvelope, lttb, min_max
+
+DEFAULT_CAPACITY = 500_000
+DEFAULT_WIDTH_PX = 800
+MODES = ('lttb', 'minmax')
+
+
+class SignalSeries:
+    """Bounded (timestamp, value) history of one signal.
+
+    Columns are plain arrays kept in time order; once they hold twice the
+    capacity the oldest half is cut off in one slice deletion, so appends
+    stay amortised O(1) and windows can be found with bisect.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = max(int(capacity), 1)
+        self.ts_us = array('q')
+        self.values = array('d')
+
+    def __len__(self) -> int:
+        return len(self.ts_us)
+
+    def clear(self) -> None:
+        del self.ts_us[:]
+        del self.values[:]
+
+    def append(self, ts_us: int, value: float) -> bool:
+        """Add a sample; returns False if it restarted the series (clock reset)."""
+        restarted = bool(self.ts_us) and ts_us < self.ts_us[-1]
+        if restarted:
+            self.clear()
+        self.ts_us.append(ts_us)
+        self.values.append(value)
+        if len(self.ts_us) >= 2 * self.capacity:
+            cut = len(self.ts_us) - self.capacity
+            del self.ts_us[:cut]
+            del self.values[:cut]
+        return not restarted
+
+    @property
+    def first_ts(self) -> Optional[int]:
+        return self.ts_us[0] if self.ts_us else None
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return self.ts_us[-1] if self.ts_us else None
+
+    def window(self, start_us: Optional[int] = None, end_us: Optional[int] = None) -> Tuple[int, int]:
+        """Index range of samples with ``start_us <= ts <= end_us``."""
+        start = 0 if start_us is None else bisect_left(self.ts_us, start_us)
+        end = len(self.ts_us) if end_us is None else bisect_right(self.ts_us, end_us)
+        return start, end
+
+
+class SignalPlot:
+    """A signal's series plus the downsampled points a chart should draw.
+
+    The full-range view comes from an incrementally maintained
+    :class:`MinMaxEnvelope`. A zoomed window is reduced on demand with LTTB
+    (or min/max) and cached until the window, the width or the samples inside
+    the window change.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        unit: str = '',
+        capacity: int = DEFAULT_CAPACITY,
+        width_px: int = DEFAULT_WIDTH_PX,
+        mode: str = 'lttb',
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f'mode must be one of {MODES}')
+        self.name = name
+        self.unit = unit
+        self.mode = mode
+        self.series = SignalSeries(capacity)
+        self.width_px = max(int(width_px), 16)
+        self.envelope = MinMaxEnvelope(self.width_px)
+        self.view: Optional[Tuple[int, int]] = None
+        self._cache_key: Optional[Tuple[int, int, int, int, int]] = None
+        self._cache: List[Tuple[float, float]] = []
+
+    def add(self, ts_us: int, value: Optional[float]) -> None:
+        if value is None:
+            return
+        series = self.series
+        first = series.first_ts
+        if not series.append(ts_us, value):
+            self.envelope.clear()
+        elif series.first_ts != first:
+            # The oldest samples were cut off; drop their buckets too
+            self.envelope.evict_before(series.ts_us[0])
+        self.envelope.add(ts_us, value)
+
+    def extend(self, ts_us: Iterable[int], values: Iterable[Optional[float]]) -> None:
+        for ts, value in zip(ts_us, values):
+            self.add(ts, value)
+
+    def set_width(self, width_px: int) -> None:
+        width_px = max(int(width_px), 16)
+        if width_px == self.width_px:
+            return
+        self.width_px = width_px
+        self._rebuild_envelope()
+
+    def set_view(self, start_us: Optional[int], end_us: Optional[int]) -> None:
+        """Zoom to a time window; ``None`` returns to the full range."""
+        self.view = None if start_us is None or end_us is None else (int(start_us), int(end_us))
+
+    def _rebuild_envelope(self) -> None:
+        self.envelope = MinMaxEnvelope(self.width_px)
+        for ts, value in zip(self.series.ts_us, self.series.values):
+            self.envelope.add(ts, value)
+
+    def points(self) -> List[Tuple[float, float]]:
+        """Points to draw for the current view, at most about ``2 * width_px``."""
+        if self.view is None:
+            first = self.series.first_ts
+            # The oldest bucket may still hold extremes of evicted samples
+            return [point for point in self.envelope.points() if first is not None and point[0] >= first]
+        start, end = self.series.window(*self.view)
+        # Samples only ever arrive at the end, so this key changes exactly when
+        # the visible data does
+        key = (self.view[0], self.view[1], self.width_px, start, end)
+        if key != self._cache_key:
+            xs = self.series.ts_us[start:end]
+            ys = self.series.values[start:end]
+            if self.mode == 'lttb':
+                self._cache = lttb(xs, ys, self.width_px)
+            else:
+                self._cache = min_max(xs, ys, self.width_px // 2)
+            self._cache_key = key
+        return self._cache
+
+
+__all__ = ['DEFAULT_CAPACITY', 'DEFAULT_WIDTH_PX', 'MODES', 'SignalPlot', 'SignalSeries']
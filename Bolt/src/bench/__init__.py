@@ -0,0 +1 @@
+"""Benchmarks and synthetic traffic for the host pipeline."""
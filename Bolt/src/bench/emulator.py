@@ -0,0 +1,445 @@
+"""ESP32 sniffer emulator on a pseudo-terminal.
+
+The emulator models the firmware's data path: frames are numbered and enter
+a bounded queue (``ORACLE_QUEUE_LENGTH``) as they are "received", overflow is
+dropped and reported at most once per second in the same JSON status line
+(so the host sees both the counter and the gap in ``seq``), and a sender
+drains the queue onto the serial link as ``Oracle_FormatCANFrame`` JSON lines
+or binary COBS batches. Point the dashboard at the printed pty path, or run a headless
+end-to-end load test::
+
+    python -m bench.emulator --rate 10000                 # serve a pty until Ctrl-C
+    python -m bench.emulator --rate 10000 --measure 10    # JSON latency/drop report
+
+Frame timestamps are taken from the host's monotonic clock, so the time from
+"reception" on the emulated device to a frame being stored by the dashboard
+can be measured directly. POSIX only (uses :mod:`pty`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import errno
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from bench.traffic import TrafficGenerator, TrafficProfile, esp_log_line, frame_line, status_line
+from usb_serial import binary_codec
+
+# Firmware constants (main/Oracle/Oracle_usb_jtag.c)
+ORACLE_QUEUE_LENGTH = 64
+ORACLE_LOG_TAG = '[ORACLE_JTAG]'
+ORACLE_STATUS_PERIOD_S = 1.0
+# Sender loop period; frames due in between are generated together
+_TICK_S = 0.001
+# Stop draining the device queue while this much output is unwritten (a blocked USB write)
+_MAX_UNWRITTEN = 4096
+
+
+def _now_us() -> int:
+    return time.monotonic_ns() // 1000
+
+
+class SnifferEmulator:
+    """Emulated sniffer writing the firmware wire format to a pty.
+
+    ``rate_hz`` is the steady bus frame rate. Every ``burst_every_s`` seconds
+    ``burst_frames`` extra frames arrive at once. ``corruption`` is the
+    probability that an emitted line is damaged (truncated, a byte flipped or
+    a character dropped). ``link_bytes_per_s`` caps the serial throughput
+    like a slow USB link (None for unlimited); together with the queue length
+    it decides when the device starts dropping frames.
+    """
+
+    def __init__(
+        self,
+        rate_hz: float = 1000.0,
+        *,
+        burst_every_s: float = 0.0,
+        burst_frames: int = 0,
+        corruption: float = 0.0,
+        log_every_s: float = 5.0,
+        binary: bool = False,
+        queue_length: int = ORACLE_QUEUE_LENGTH,
+        link_bytes_per_s: Optional[float] = None,
+        seed: int = 1,
+        profile: Optional[TrafficProfile] = None,
+    ) -> None:
+        self.rate_hz = float(rate_hz)
+        self.burst_every_s = float(burst_every_s)
+        self.burst_frames = int(burst_frames)
+        self.corruption = float(corruption)
+        self.log_every_s = float(log_every_s)
+        self.binary = bool(binary)
+        self.queue_length = int(queue_length)
+        self.link_bytes_per_s = link_bytes_per_s
+        # Log lines and corruption are produced here, not by the generator
+        self.generator = TrafficGenerator(profile or TrafficProfile(garbage_ratio=0.0), seed=seed)
+        self.random = self.generator.random
+
+        self.port: Optional[str] = None
+        self.frames_generated = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.lines_corrupted = 0
+        self.log_lines = 0
+        self.status_lines = 0
+        self.bytes_written = 0
+
+        self._frames = self.generator.frames()
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._out = bytearray()
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_seq = 0
+        self._reported_drops = 0
+
+    # -- lifecycle -------------------------------------------------------
+
+    def open(self) -> str:
+        import pty
+        import tty
+
+        master, slave = pty.openpty()
+        # Raw mode: no echo and no newline translation, like a USB CDC port
+        tty.setraw(slave)
+        os.set_blocking(master, False)
+        self._master, self._slave = master, slave
+        self.port = os.ttyname(slave)
+        return self.port
+
+    def start(self) -> str:
+        if self._master is None:
+            self.open()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sniffer-emulator', daemon=True)
+        self._thread.start()
+        assert self.port is not None
+        return self.port
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master = self._slave = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'port': self.port,
+            'frames_generated': self.frames_generated,
+            'frames_sent': self.frames_sent,
+            'frames_dropped': self.frames_dropped,
+            'lines_corrupted': self.lines_corrupted,
+            'log_lines': self.log_lines,
+            'status_lines': self.status_lines,
+            'bytes_written': self.bytes_written,
+            'queued': len(self._queue),
+        }
+
+    # -- device model ----------------------------------------------------
+
+    def _receive(self, count: int) -> None:
+        """Frames arriving from the bus, queued like Oracle_QueueFrame."""
+        for _ in range(count):
+            frame = next(self._frames)
+            frame['ts_us'] = _now_us()
+            # Dropped frames use up a number too, which is what makes the gap
+            frame['seq'] = self._next_seq
+            self._next_seq = (self._next_seq + 1) & 0xFFFF
+            self.frames_generated += 1
+            if len(self._queue) >= self.queue_length:
+                self.frames_dropped += 1
+                continue
+            self._queue.append(frame)
+
+    def _send_status(self) -> None:
+        """Report the drop counter if it changed, like Oracle_send_status."""
+        if self.frames_dropped == self._reported_drops:
+            return
+        self._reported_drops = self.frames_dropped
+        self._out += status_line(
+            {'oracle_dropped': self.frames_dropped, 'queue_waiting': len(self._queue), 'next_seq': self._next_seq}
+        ).encode()
+        self.status_lines += 1
+
+    def _log(self, level: str, message: str, tag: str = ORACLE_LOG_TAG) -> None:
+        # ESP_LOG writes straight to the console, bypassing the frame queue
+        self._out += esp_log_line(level, tag, message, _now_us() // 1000).encode()
+        self.log_lines += 1
+
+    def _corrupt(self, chunk: bytes) -> bytes:
+        self.lines_corrupted += 1
+        if self.binary:
+            # Flip one byte between the delimiters; the batch fails to decode
+            body = bytearray(chunk)
+            index = self.random.randrange(1, len(body) - 1)
+            body[index] = (body[index] ^ 0xA5) or 0x01
+            return bytes(body)
+        kind = self.random.randrange(3)
+        body = bytearray(chunk[:-1])
+        if kind == 0 and len(body) > 4:
+            del body[self.random.randrange(4, len(body)) :]
+        elif kind == 1 and body:
+            body[self.random.randrange(len(body))] ^= 1 << self.random.randrange(7)
+        elif body:
+            del body[self.random.randrange(len(body))]
+        return bytes(body) + b'\n'
+
+    def _send_queued(self, budget: float) -> float:
+        """Move queued frames to the output, like Oracle_to_laptop. Returns bytes used."""
+        used = 0
+        while self._queue and len(self._out) < _MAX_UNWRITTEN and used < budget:
+            if self.binary:
+                batch = [self._queue.popleft() for _ in range(min(binary_codec.MAX_BATCH, len(self._queue)))]
+                chunk = binary_codec.encode_packet(batch)
+                sent = len(batch)
+            else:
+                chunk = frame_line(self._queue.popleft()).encode()
+                sent = 1
+            if self.corruption and self.random.random() < self.corruption:
+                chunk = self._corrupt(chunk)
+            self._out += chunk
+            self.frames_sent += sent
+            used += len(chunk)
+        return used
+
+    def _flush(self) -> None:
+        if not self._out or self._master is None:
+            return
+        try:
+            written = os.write(self._master, self._out)
+        except OSError as exc:
+            if exc.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return
+            raise
+        del self._out[:written]
+        self.bytes_written += written
+
+    def _run(self) -> None:
+        start = time.monotonic()
+        next_burst = start + self.burst_every_s if self.burst_every_s > 0 else None
+        next_log = start + self.log_every_s if self.log_every_s > 0 else None
+        next_status = start + ORACLE_STATUS_PERIOD_S
+        link_credit = 0.0
+        last = start
+        steady = 0
+        self._log('I', 'Oracle USB Serial JTAG transport ready')
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = int((now - start) * self.rate_hz) - steady
+            if due > 0:
+                self._receive(due)
+                steady += due
+            if next_burst is not None and now >= next_burst:
+                self._receive(self.burst_frames)
+                next_burst += self.burst_every_s
+            if next_log is not None and now >= next_log:
+                self._log('I', f'heap free: {200_000 + self.random.randrange(4096)}', tag='Setup')
+                next_log += self.log_every_s
+            if now >= next_status:
+                self._send_status()
+                next_status += ORACLE_STATUS_PERIOD_S
+            if self.link_bytes_per_s:
+                # Token bucket, capped at 50 ms worth of bytes
+                link_credit = min(link_credit + (now - last) * self.link_bytes_per_s, self.link_bytes_per_s * 0.05)
+                link_credit -= self._send_queued(link_credit)
+            else:
+                self._send_queued(float('inf'))
+            last = now
+            try:
+                self._flush()
+            except OSError:
+                # The reader side went away; keep running until stopped
+                self._out.clear()
+            self._stop.wait(_TICK_S)
+
+
+def run_load_test(
+    duration_s: float = 10.0,
+    baudrate: int = 921600,
+    delivery: str = 'loop',
+    latency_s: float = 0.01,
+    drain_batch: int = 300,
+    drain_interval_s: float = 0.1,
+    **emulator_options: Any,
+) -> Dict[str, Any]:
+    """Run the dashboard pipeline headless against an emulator and report.
+
+    ``delivery='loop'`` mirrors ``gui.app``: the reader hands batches to the
+    asyncio loop (held at most ``latency_s``) and a render tick runs every
+    100 ms. ``delivery='queue'`` uses the reader thread and a periodic drain of
+    up to ``drain_batch`` items every ``drain_interval_s``, as the dashboard did
+    before. Latency is measured per stored frame as host time minus emission
+    time.
+    """
+    from bench.pipeline import _install_headless_updaters
+    from gui import state as st
+    from jtag.data_processor import process_item
+    from usb_serial import serial_handler
+
+    if delivery not in ('loop', 'queue'):
+        raise ValueError("delivery must be 'loop' or 'queue'")
+    _install_headless_updaters()
+    st.clear_frames()
+    st.register_drop_source('host', serial_handler.drop_stats)
+    emulator = SnifferEmulator(**emulator_options)
+
+    store = st._frame_store
+    started_us = _now_us()
+    first_seq = store.last_seq + 1
+    next_seq = first_seq
+    latencies: List[int] = []
+    max_backlog = 0
+
+    def collect() -> None:
+        nonlocal next_seq
+        if store.last_seq >= next_seq:
+            now_us = _now_us()
+            # Corrupted lines can carry a damaged timestamp; keep plausible values only
+            latencies.extend(
+                now_us - ts for ts in store.column('ts_us', next_seq) if started_us <= ts <= now_us
+            )
+            next_seq = store.last_seq + 1
+
+    def drain(limit: int) -> None:
+        nonlocal max_backlog
+        max_backlog = max(max_backlog, serial_handler.pending_count())
+        for item in serial_handler.get_pending_lines(limit):
+            process_item(item)
+        collect()
+
+    def connect() -> None:
+        ok, message = serial_handler.connect(emulator.start(), baudrate, timeout=0.05)
+        if not ok:
+            emulator.stop()
+            raise OSError(message)
+
+    def run_queue() -> int:
+        connect()
+        try:
+            deadline = time.monotonic() + duration_s
+            while time.monotonic() < deadline:
+                drain(drain_batch)
+                st.render_tick()
+                time.sleep(drain_interval_s)
+            emulator.stop()
+            backlog = serial_handler.pending_count()
+            # Let the reader catch up with what was written, then drain everything
+            time.sleep(0.3)
+            while serial_handler.pending_count():
+                drain(drain_batch)
+            return backlog
+        finally:
+            emulator.stop()
+            serial_handler.disconnect()
+
+    async def run_loop() -> int:
+        def on_items(items: List[Any]) -> None:
+            for item in items:
+                process_item(item)
+            collect()
+
+        serial_handler.attach_event_loop(on_items, latency_s=latency_s)
+        connect()
+        try:
+            deadline = time.monotonic() + duration_s
+            while time.monotonic() < deadline:
+                drain(serial_handler.pending_count())
+                st.render_tick()
+                await asyncio.sleep(0.1)
+            emulator.stop()
+            await asyncio.sleep(0.3)
+            return serial_handler.pending_count()
+        finally:
+            emulator.stop()
+            serial_handler.disconnect()
+            serial_handler.detach_event_loop()
+            # Batches handed over while disconnecting
+            await asyncio.sleep(0)
+
+    backlog_at_stop = asyncio.run(run_loop()) if delivery == 'loop' else run_queue()
+
+    device = emulator.stats()
+    received = next_seq - first_seq
+    latencies.sort()
+
+    def pct(p: float) -> Optional[float]:
+        if not latencies:
+            return None
+        return round(latencies[min(int(p * len(latencies)), len(latencies) - 1)] / 1000.0, 3)
+
+    return {
+        'duration_s': duration_s,
+        'mode': 'binary' if emulator.binary else 'text',
+        'delivery': delivery,
+        'rate_hz': emulator.rate_hz,
+        'device': device,
+        'frames_received': received,
+        'frames_lost_on_link': max(device['frames_sent'] - received, 0),
+        'device_drop_rate': round(device['frames_dropped'] / device['frames_generated'], 6)
+        if device['frames_generated']
+        else 0.0,
+        'drops': st.drop_counters(),
+        'host_backlog_max': max_backlog,
+        'host_backlog_at_stop': backlog_at_stop,
+        'received_per_s': round(received / duration_s, 1),
+        'latency_ms': {
+            'p50': pct(0.50),
+            'p95': pct(0.95),
+            'p99': pct(0.99),
+            'max': pct(1.0),
+        },
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Emulate the Bolt ESP32 sniffer on a pseudo-terminal.')
+    parser.add_argument('--rate', type=float, default=1000.0, help='frames per second')
+    parser.add_argument('--burst-every', type=float, default=0.0, help='seconds between bursts')
+    parser.add_argument('--burst-frames', type=int, default=0)
+    parser.add_argument('--corruption', type=float, default=0.0, help='probability a line is corrupted')
+    parser.add_argument('--binary', action='store_true', help='send COBS binary batches')
+    parser.add_argument('--link-bytes', type=float, default=None, help='serial throughput cap in bytes/s')
+    parser.add_argument('--queue-length', type=int, default=ORACLE_QUEUE_LENGTH)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--delivery', choices=('loop', 'queue'), default='loop', help='host delivery path to measure')
+    parser.add_argument('--measure', type=float, metavar='SECONDS', help='run a headless load test and print JSON')
+    args = parser.parse_args()
+    options: Dict[str, Any] = {
+        'rate_hz': args.rate,
+        'burst_every_s': args.burst_every,
+        'burst_frames': args.burst_frames,
+        'corruption': args.corruption,
+        'binary': args.binary,
+        'link_bytes_per_s': args.link_bytes,
+        'queue_length': args.queue_length,
+        'seed': args.seed,
+    }
+    if args.measure:
+        print(json.dumps(run_load_test(args.measure, delivery=args.delivery, **options), indent=2))
+    else:
+        emulator = SnifferEmulator(**options)
+        print(f'Emulating sniffer on {emulator.start()} (Ctrl-C to stop)')
+        try:
+            while True:
+                time.sleep(5)
+                print(emulator.stats())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            emulator.stop()
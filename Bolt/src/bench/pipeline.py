@@ -0,0 +1,298 @@
+"""Throughput benchmarks for the host ingestion pipeline.
+
+Each benchmark feeds synthetic traffic through the real code path — the
+serial reader loop, the shared-memory ring, ``data_processor.process_line``,
+``state.append_can_frame``, the table refresh and the filters — with the GUI updaters replaced by
+callables that do the same server-side work without a browser. Run with::
+
+    python -m bench.pipeline --frames 200000 --output bench.json
+
+Add ``--metrics`` to run with metric collection on and compare the cost.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from analysis import metrics
+from bench.traffic import TrafficGenerator, chunked
+from gui import state as st
+from jtag import data_processor
+from usb_serial.channel import read_loop
+from usb_serial.framing import StreamDecoder
+from usb_serial.shm_ring import FrameRing
+
+Result = Dict[str, Any]
+
+FILTER_EXPRESSIONS = (
+    'id == 0x100',
+    'id in [0x100..0x2FF] and dlc == 8',
+    'ext',
+    'data[0] & 0x0F == 0x03',
+    'not id in [0x0C0, 0x0F0] and data[1] > 0x80',
+)
+
+
+class _ReplaySerial:
+    """Serial stand-in returning a prepared byte stream in ``read`` sized pieces."""
+
+    def __init__(self, chunks: Sequence[bytes], stop: threading.Event) -> None:
+        self._chunks = iter(chunks)
+        self._stop = stop
+        self.is_open = True
+
+    def read(self, size: int = 256) -> bytes:
+        chunk = next(self._chunks, b'')
+        if not chunk:
+            self._stop.set()
+        return chunk
+
+
+def _result(items: int, seconds: float, **extra: Any) -> Result:
+    out: Result = {
+        'items': items,
+        'seconds': round(seconds, 6),
+        'items_per_s': round(items / seconds, 1) if seconds > 0 else None,
+        'us_per_item': round(seconds * 1e6 / items, 3) if items else None,
+    }
+    out.update(extra)
+    return out
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _install_headless_updaters() -> None:
+    """Register updaters that do the server-side work of each view, minus the browser."""
+    st.register_table_updater(lambda: st.query_frames(1, 20, None, True))
+    st.register_chart_updater(lambda labels, counts, periods: None)
+    st.register_trace_updater(lambda rows: None)
+    st.register_load_updater(lambda summary: None)
+    st.register_plot_updater(lambda data: None)
+    st.register_log(lambda line: None, lambda: None)
+    st.set_log_file(None)
+
+
+def _read_stream(stream: bytes, read_size: int = 256) -> Tuple[float, List[Any]]:
+    """Drive the channel reader loop over an in-memory stream; returns (seconds, items)."""
+    stop = threading.Event()
+    items: List[Any] = []
+    ser = _ReplaySerial(list(chunked(stream, read_size)), stop)
+    seconds = _timed(lambda: read_loop(ser, stop, items.extend))
+    return seconds, items
+
+
+def _run_reader_loop(stream: bytes, read_size: int = 256) -> Result:
+    seconds, items = _read_stream(stream, read_size)
+    lines = frames = 0
+    for item in items:
+        if isinstance(item, str):
+            lines += 1
+        else:
+            frames += len(item)
+    return _result(
+        len(stream),
+        seconds,
+        unit='bytes',
+        mb_per_s=round(len(stream) / seconds / 1e6, 2),
+        lines=lines,
+        frames=frames,
+    )
+
+
+def bench_reader_text(frames: int, seed: int) -> Result:
+    stream = ''.join(TrafficGenerator(seed=seed).lines(frames)).encode()
+    return _run_reader_loop(stream)
+
+
+def bench_reader_binary(frames: int, seed: int) -> Result:
+    stream = b''.join(TrafficGenerator(seed=seed).binary_packets(frames))
+    return _run_reader_loop(stream)
+
+
+def bench_ingest_text(frames: int, seed: int) -> Result:
+    """Bytes in to frames stored: the reader loop plus processing of every item."""
+    stream = ''.join(TrafficGenerator(seed=seed).lines(frames)).encode()
+    st.clear_frames()
+    read_seconds, items = _read_stream(stream)
+    process = data_processor.process_item
+
+    def run() -> None:
+        for item in items:
+            process(item)
+
+    seconds = read_seconds + _timed(run)
+    return _result(frames, seconds, unit='lines', mb_per_s=round(len(stream) / seconds / 1e6, 2))
+
+
+def bench_ring_consume(frames: int, seed: int) -> Result:
+    """UI-process share of process mode: frames out of the shared-memory ring and stored."""
+    stream = ''.join(TrafficGenerator(seed=seed).lines(frames)).encode()
+    batches = [item for item in StreamDecoder().feed(stream) if not isinstance(item, str)]
+    ring = FrameRing.create(max(frames, 1))
+    try:
+        for batch in batches:
+            ring.write(batch)
+        count = ring.pending
+        st.clear_frames()
+        seconds = _timed(lambda: data_processor.process_frames(ring.read()))
+    finally:
+        ring.close()
+    return _result(count, seconds, unit='frames')
+
+
+def bench_process_line(frames: int, seed: int) -> Result:
+    lines = list(TrafficGenerator(seed=seed).lines(frames))
+    st.clear_frames()
+    process = data_processor.process_line
+
+    def run() -> None:
+        for line in lines:
+            process(line)
+
+    return _result(len(lines), _timed(run), unit='lines', includes='line parse, append_frame')
+
+
+def bench_append_can_frame(frames: int, seed: int) -> Result:
+    # Same shape as process_line produces: hex string payloads
+    items = [dict(frame, data=frame['data'].hex().upper()) for frame in TrafficGenerator(seed=seed).frames(frames)]
+    st.clear_frames()
+    append = st.append_can_frame
+
+    def run() -> None:
+        for frame in items:
+            append(frame)
+
+    return _result(len(items), _timed(run), unit='frames')
+
+
+def _fill_store(frames: int, seed: int) -> None:
+    st.clear_frames()
+    append = st.append_can_frame
+    for frame in TrafficGenerator(seed=seed).frames(frames):
+        append(frame)
+
+
+def bench_table_update(frames: int, seed: int, renders: int = 200) -> Result:
+    """``_push_table_update`` with a full store, for the default and an ID-sorted page."""
+    _fill_store(frames, seed)
+    st.set_filter('')
+    seconds = _timed(lambda: [st._push_table_update() for _ in range(renders)])
+    sorted_renders = max(renders // 20, 1)
+    sorted_seconds = _timed(lambda: [st.query_frames(1, 20, 'id_hex', False) for _ in range(sorted_renders)])
+    return _result(
+        renders,
+        seconds,
+        unit='renders',
+        stored_frames=st.frame_count(),
+        sorted_by_id_ms=round(sorted_seconds * 1000 / sorted_renders, 3),
+    )
+
+
+def bench_filters(frames: int, seed: int) -> Result:
+    """Full scans of the store for each expression, plus the free-text fallback."""
+    _fill_store(frames, seed)
+    per_filter: Dict[str, Any] = {}
+    total = 0.0
+    for text in FILTER_EXPRESSIONS + ('0x1a0',):
+        st.set_filter(text)
+        cache = st._filter_cache_for(text)
+        seconds = _timed(lambda: st._filtered_seqs(cache))
+        total += seconds
+        per_filter[text] = {'ms': round(seconds * 1000, 3), 'matches': len(st._filtered_seqs(cache))}
+    st.set_filter('')
+    scans = len(per_filter)
+    return _result(scans * st.frame_count(), total, unit='frames scanned', filters=per_filter)
+
+
+def bench_render_tick(frames: int, seed: int, ticks: int = 100) -> Result:
+    """One scheduler tick with every view dirty, as after a busy 100 ms."""
+    _fill_store(frames, seed)
+    views = ('table', 'chart', 'trace', 'load', 'plot')
+
+    def run() -> None:
+        # render_now bypasses the rate cap, which is what a tick does once due
+        for _ in range(ticks):
+            for name in views:
+                st._scheduler.render_now(name)
+
+    return _result(ticks, _timed(run), unit='ticks')
+
+
+BENCHMARKS: Dict[str, Callable[[int, int], Result]] = {
+    'reader_loop_text': bench_reader_text,
+    'reader_loop_binary': bench_reader_binary,
+    'ingest_text': bench_ingest_text,
+    'ring_consume': bench_ring_consume,
+    'process_line': bench_process_line,
+    'append_can_frame': bench_append_can_frame,
+    'push_table_update': bench_table_update,
+    'filters': bench_filters,
+    'render_tick': bench_render_tick,
+}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_benchmarks(
+    frames: int = 100_000, seed: int = 1, only: Optional[Sequence[str]] = None, collect_metrics: bool = False
+) -> Dict[str, Any]:
+    """Run the selected benchmarks and return a JSON-serialisable report."""
+    _install_headless_updaters()
+    names: List[str] = list(only) if only else list(BENCHMARKS)
+    results: Dict[str, Result] = {}
+    was_enabled = metrics.enabled()
+    metrics.enable(collect_metrics)
+    try:
+        for name in names:
+            results[name] = BENCHMARKS[name](frames, seed)
+    finally:
+        metrics.enable(was_enabled)
+    st.clear_frames()
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'frames': frames,
+        'seed': seed,
+        'metrics': collect_metrics,
+        'results': results,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the Bolt host pipeline.')
+    parser.add_argument('--frames', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS))
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--metrics', action='store_true', help='collect hot-path metrics while running')
+    args = parser.parse_args()
+    report = run_benchmarks(args.frames, args.seed, args.only, args.metrics)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+        for name, result in report['results'].items():
+            print(f"{name:20s} {result['items_per_s'] or 0:>14,.0f} {result['unit']}/s")
+    else:
+        print(text)
@@ -0,0 +1,201 @@
+"""Synthetic CAN traffic in the sniffer's wire formats.
+
+:class:`TrafficGenerator` produces a deterministic (seeded) mix of periodic
+identifiers, bursty identifiers, extended identifiers and non-frame lines,
+and renders it exactly as the firmware would: ``Oracle_FormatCANFrame`` JSON
+lines, ``Oracle_FormatStatus`` status lines, ESP-IDF log lines and
+COBS-framed binary batches. Frames are numbered with the firmware's 16-bit
+``seq``.
+"""
+
+from __future__ import annotations
+
+import heapq
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from usb_serial import binary_codec
+
+Frame = Dict[str, Any]
+
+
+@dataclass
+class TrafficProfile:
+    """Shape of the generated bus traffic."""
+
+    # Periodic standard identifiers and their periods in microseconds
+    periodic: Dict[int, int] = field(
+        default_factory=lambda: {
+            0x0C0: 1_000,
+            0x0F0: 2_000,
+            0x100: 5_000,
+            0x1A0: 10_000,
+            0x200: 10_000,
+            0x2F0: 20_000,
+            0x3E8: 50_000,
+            0x4F0: 100_000,
+            0x5A0: 100_000,
+            0x7DF: 500_000,
+        }
+    )
+    # Extended identifiers sent periodically alongside the standard ones
+    extended: Dict[int, int] = field(
+        default_factory=lambda: {
+            0x18FEF100: 10_000,
+            0x18FEEE00: 100_000,
+            0x0CF00400: 5_000,
+        }
+    )
+    # Bursty identifiers: (id, mean gap between bursts in us, frames per burst)
+    bursty: List[Tuple[int, int, int]] = field(default_factory=lambda: [(0x6A0, 200_000, 40), (0x123, 1_000_000, 200)])
+    # Spacing of frames inside a burst
+    burst_spacing_us: int = 150
+    # Cycle jitter as a fraction of the period
+    jitter: float = 0.02
+    # Fraction of emitted lines that are not CAN frames (logs, corrupted JSON)
+    garbage_ratio: float = 0.01
+    # Fraction of frames that are remote requests
+    rtr_ratio: float = 0.002
+
+
+class TrafficGenerator:
+    """Deterministic frame and line source for benchmarks and the emulator."""
+
+    def __init__(self, profile: Optional[TrafficProfile] = None, seed: int = 1, start_ts_us: int = 1_000_000) -> None:
+        self.profile = profile or TrafficProfile()
+        self.random = random.Random(seed)
+        self._payloads: Dict[int, bytearray] = {}
+        # (due ts, id, extended, period, burst frames left)
+        self._schedule: List[Tuple[int, int, bool, int, int]] = []
+        for identifier, period in self.profile.periodic.items():
+            self._schedule.append((start_ts_us + self.random.randrange(period), identifier, False, period, 0))
+        for identifier, period in self.profile.extended.items():
+            self._schedule.append((start_ts_us + self.random.randrange(period), identifier, True, period, 0))
+        for identifier, gap, _ in self.profile.bursty:
+            self._schedule.append((start_ts_us + self.random.randrange(gap), identifier, False, -gap, 0))
+        heapq.heapify(self._schedule)
+        self.garbage_lines = 0
+        self._seq = 0
+
+    def _payload(self, identifier: int) -> bytes:
+        data = self._payloads.get(identifier)
+        if data is None:
+            data = self._payloads[identifier] = bytearray(self.random.randbytes(8))
+        # A counter byte, a slowly changing signal and an occasional flip
+        data[0] = (data[0] + 1) & 0xFF
+        if self.random.random() < 0.1:
+            data[self.random.randrange(1, 8)] ^= 1 << self.random.randrange(8)
+        return bytes(data)
+
+    def frames(self, count: Optional[int] = None) -> Iterator[Frame]:
+        """Frames in timestamp order (forever when ``count`` is None)."""
+        produced = 0
+        profile = self.profile
+        bursts = {identifier: size for identifier, _, size in profile.bursty}
+        while count is None or produced < count:
+            due, identifier, extended, period, left = heapq.heappop(self._schedule)
+            rtr = self.random.random() < profile.rtr_ratio
+            dlc = 8 if not rtr else 0
+            payload = b'' if rtr else self._payload(identifier)
+            seq = self._seq
+            self._seq = (seq + 1) & 0xFFFF
+            yield {'id': identifier, 'ts_us': due, 'dlc': dlc, 'ext': extended, 'rtr': rtr, 'data': payload, 'seq': seq}
+            produced += 1
+            if period < 0:
+                # Bursty: a run of closely spaced frames, then a random gap
+                if left > 1:
+                    nxt = (due + profile.burst_spacing_us, identifier, extended, period, left - 1)
+                else:
+                    gap = int(self.random.expovariate(1.0 / -period)) + 1
+                    nxt = (due + gap, identifier, extended, period, bursts[identifier])
+            else:
+                wobble = int(period * profile.jitter * (self.random.random() * 2 - 1))
+                nxt = (due + max(period + wobble, 1), identifier, extended, period, 0)
+            heapq.heappush(self._schedule, nxt)
+
+    def lines(self, count: Optional[int] = None) -> Iterator[str]:
+        """Firmware text stream: JSON frame lines mixed with log and garbage lines."""
+        produced = 0
+        ratio = self.profile.garbage_ratio
+        for frame in self.frames():
+            if count is not None and produced >= count:
+                return
+            if ratio and self.random.random() < ratio:
+                self.garbage_lines += 1
+                yield self.garbage_line(frame['ts_us'])
+            else:
+                yield frame_line(frame)
+            produced += 1
+
+    def garbage_line(self, ts_us: int) -> str:
+        kind = self.random.randrange(4)
+        ms = ts_us // 1000
+        if kind == 0:
+            return status_line({'oracle_dropped': self.random.randrange(1, 5000), 'next_seq': self._seq})
+        if kind == 1:
+            return esp_log_line('W', '[CAN]', 'RX queue full; consider increasing ORACLE_QUEUE_LENGTH', ms)
+        if kind == 2:
+            # A frame line cut short, as after a USB hiccup
+            line = frame_line({'id': 0x100, 'ts_us': ts_us, 'dlc': 8, 'data': b'\x00' * 8})
+            return line[: self.random.randrange(5, len(line) - 2)] + '\n'
+        return ''.join(chr(self.random.randrange(33, 127)) for _ in range(self.random.randrange(4, 40))) + '\n'
+
+    def binary_packets(self, count: int, batch: int = binary_codec.MAX_BATCH) -> Iterator[bytes]:
+        """COBS-framed binary batches covering ``count`` frames."""
+        pending: List[Frame] = []
+        for frame in self.frames(count):
+            pending.append(frame)
+            if len(pending) >= batch:
+                yield binary_codec.encode_packet(pending)
+                pending = []
+        if pending:
+            yield binary_codec.encode_packet(pending)
+
+
+def frame_line(frame: Frame) -> str:
+    """One frame formatted byte-for-byte like ``Oracle_FormatCANFrame``."""
+    data = frame.get('data') or b''
+    dlc = min(int(frame.get('dlc') or 0), 8)
+    if isinstance(data, str):
+        data_hex = data.upper()[: dlc * 2]
+    else:
+        data_hex = bytes(data[:dlc]).hex().upper()
+    seq = f',"seq":{int(frame["seq"])}' if frame.get('seq') is not None else ''
+    return (
+        f'{{"type":"can","ts_us":{int(frame["ts_us"])},"id":{int(frame["id"])},'
+        f'"ext":{"true" if frame.get("ext") else "false"},"rtr":{"true" if frame.get("rtr") else "false"},'
+        f'"dlc":{dlc},"data":"{data_hex}"{seq}}}\n'
+    )
+
+
+def status_line(status: Dict[str, int]) -> str:
+    """Drop counters formatted like ``Oracle_FormatStatus``; missing counters are 0."""
+    return (
+        f'{{"type":"status","oracle_dropped":{int(status.get("oracle_dropped", 0))},'
+        f'"twai_rx_missed":{int(status.get("twai_rx_missed", 0))},'
+        f'"twai_rx_overrun":{int(status.get("twai_rx_overrun", 0))},'
+        f'"queue_waiting":{int(status.get("queue_waiting", 0))},"next_seq":{int(status.get("next_seq", 0))}}}\n'
+    )
+
+
+def esp_log_line(level: str, tag: str, message: str, ms: int) -> str:
+    """An ESP-IDF log line as printed on the USB console (no colour codes)."""
+    return f'{level} ({ms}) {tag}: {message}\n'
+
+
+def chunked(stream: bytes, size: int = 256) -> Iterator[bytes]:
+    """Split a byte stream into reads of ``size`` bytes, like ``serial.read(256)``."""
+    view = memoryview(stream)
+    for start in range(0, len(view), size):
+        yield bytes(view[start : start + size])
+
+
+__all__ = [
+    'TrafficGenerator',
+    'TrafficProfile',
+    'chunked',
+    'esp_log_line',
+    'frame_line',
+    'status_line',
+]
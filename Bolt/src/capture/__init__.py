@@ -0,0 +1,4 @@
+"""Capture recording helpers."""
+
+from .recorder import start_recording, stop_recording  # noqa: F401
+from .triggers import add_trigger, remove_trigger  # noqa: F401
@@ -0,0 +1,147 @@
+"""On-disk capture format shared by the recorder and the replay engine.
+
+A capture file is a 16-byte header followed by fixed-size frame records::
+
+    header = magic (8 bytes, b'BOLTCAP\\x00') | version (u16) | record size (u16) | reserved (4)
+    record = ts_us (u64 LE) | id (u32 LE) | flags (u8) | dlc (u8) | data (8 bytes) | channel (u8)
+
+Records start with the layout of the firmware's version 1 binary transport
+(no sequence number), so a file can be appended to without framing and read
+back with ``struct.iter_unpack``. Version 1 files have no channel byte
+(22-byte records); they are still read, as channel 0.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, Iterable, List, Tuple
+
+MAGIC = b'BOLTCAP\x00'
+VERSION = 2
+SUFFIX = '.boltcap'
+
+FLAG_EXT = 0x01
+FLAG_RTR = 0x02
+
+HEADER = struct.Struct('<8sHH4x')
+RECORD = struct.Struct('<QIBB8sB')
+RECORD_V1 = struct.Struct('<QIBB8s')
+_RECORDS = {1: RECORD_V1, 2: RECORD}
+
+HEADER_SIZE = HEADER.size
+RECORD_SIZE = RECORD.size
+
+
+def header_bytes() -> bytes:
+    return HEADER.pack(MAGIC, VERSION, RECORD_SIZE)
+
+
+def check_header(data: bytes) -> int:
+    """Return the file's format version; ``ValueError`` unless ``data`` starts with a valid header."""
+    if len(data) < HEADER_SIZE:
+        raise ValueError('capture file is shorter than its header')
+    magic, version, record_size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('not a Bolt capture file')
+    record = _RECORDS.get(version)
+    if record is None or record_size != record.size:
+        raise ValueError(f'unsupported capture version {version} (record size {record_size})')
+    return version
+
+
+def record_struct(version: int = VERSION) -> struct.Struct:
+    """Record layout of a format version (as returned by :func:`check_header`)."""
+    return _RECORDS[version]
+
+
+def payload_bytes(data: Any, dlc: int) -> bytes:
+    """Normalise a frame's ``data`` (bytes, hex string or ints) to bytes."""
+    if data is None:
+        return b''
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        values = bytes(data)
+    elif isinstance(data, str):
+        text = data.replace(' ', '').replace('-', '').replace('_', '')
+        try:
+            values = bytes.fromhex(text[: len(text) - len(text) % 2])
+        except ValueError:
+            values = b''
+    else:
+        try:
+            values = bytes(int(v) & 0xFF for v in data)
+        except Exception:
+            values = b''
+    limit = dlc if 0 < dlc <= 8 else 8
+    return values[:limit]
+
+
+def pack_frame(frame: Dict[str, Any]) -> bytes:
+    """Pack a frame dict (as produced by ``jtag.data_processor``) into a record."""
+    flags = 0
+    if frame.get('ext'):
+        flags |= FLAG_EXT
+    if frame.get('rtr'):
+        flags |= FLAG_RTR
+    try:
+        dlc = int(frame.get('dlc') or 0)
+    except Exception:
+        dlc = 0
+    dlc = min(max(dlc, 0), 8)
+    try:
+        ts_us = max(int(frame.get('ts_us') or 0), 0)
+    except Exception:
+        ts_us = 0
+    try:
+        identifier = int(frame.get('id') or 0) & 0xFFFFFFFF
+    except Exception:
+        identifier = 0
+    try:
+        channel = min(max(int(frame.get('channel') or 0), 0), 0xFF)
+    except Exception:
+        channel = 0
+    data = payload_bytes(frame.get('data'), dlc)
+    return RECORD.pack(ts_us, identifier, flags, dlc, data.ljust(8, b'\x00'), channel)
+
+
+def unpack_records(block: bytes, version: int = VERSION) -> List[Dict[str, Any]]:
+    """Decode a block of whole records (of format ``version``) into frame dicts."""
+    frames: List[Dict[str, Any]] = []
+    append = frames.append
+    if version == 1:
+        records: Iterable[Tuple[int, int, int, int, bytes, int]] = (
+            record + (0,) for record in RECORD_V1.iter_unpack(block)
+        )
+    else:
+        records = RECORD.iter_unpack(block)
+    for ts_us, identifier, flags, dlc, data, channel in records:
+        append(
+            {
+                'id': identifier,
+                'ts_us': ts_us,
+                'dlc': dlc,
+                'ext': bool(flags & FLAG_EXT),
+                'rtr': bool(flags & FLAG_RTR),
+                'data': b'' if flags & FLAG_RTR else data[:dlc],
+                'channel': channel,
+                'raw': '',
+            }
+        )
+    return frames
+
+
+def pack_frames(frames: Iterable[Dict[str, Any]]) -> bytes:
+    return b''.join(pack_frame(frame) for frame in frames)
+
+
+__all__ = [
+    'HEADER_SIZE',
+    'RECORD_SIZE',
+    'SUFFIX',
+    'check_header',
+    'header_bytes',
+    'pack_frame',
+    'pack_frames',
+    'payload_bytes',
+    'record_struct',
+    'unpack_records',
+]
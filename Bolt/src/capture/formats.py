@@ -0,0 +1,508 @@
+"""Streaming readers and writers for common CAN log formats.
+
+Supported formats:
+
+``candump``  SocketCAN ``candump -l`` logs: ``(1436509052.249713) can0 123#DEADBEEF``
+``asc``      Vector ASCII logs (``base hex``/``dec``, absolute timestamps)
+``csv``      ``ts_us,id,ext,rtr,dlc,data,channel`` with the payload as hex
+``pcapng``   pcapng with ``LINKTYPE_CAN_SOCKETCAN`` (227) packets
+``boltcap``  Bolt's own capture files (see ``capture.capture_file``)
+
+Every reader is a generator yielding lists of frame dicts (``id``, ``ts_us``,
+``dlc``, ``ext``, ``rtr``, ``data``, ``channel``) of at most ``chunk_size`` frames, and
+every writer consumes an iterable of such chunks, so files of any size are
+converted in constant memory.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import re
+import struct
+from datetime import datetime
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from capture import capture_file
+
+Frame = Dict[str, Any]
+Chunk = List[Frame]
+
+_CAN_IFACE_RE = re.compile(r'^v?can(\d+)$')
+
+DEFAULT_CHUNK = 4096
+
+_EXTENSIONS = {
+    '.log': 'candump',
+    '.candump': 'candump',
+    '.asc': 'asc',
+    '.csv': 'csv',
+    '.pcapng': 'pcapng',
+    capture_file.SUFFIX: 'boltcap',
+}
+
+FORMAT_EXTENSIONS = {
+    'candump': '.log',
+    'asc': '.asc',
+    'csv': '.csv',
+    'pcapng': '.pcapng',
+    'boltcap': capture_file.SUFFIX,
+}
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        return _EXTENSIONS[ext]
+    except KeyError:
+        raise ValueError(f'unknown log format for {path!r}') from None
+
+
+def _frame(ts_us: int, identifier: int, ext: bool, rtr: bool, dlc: int, data: bytes, channel: int = 0) -> Frame:
+    return {
+        'id': identifier,
+        'ts_us': ts_us,
+        'dlc': dlc,
+        'ext': ext,
+        'rtr': rtr,
+        'data': data,
+        'raw': '',
+        'channel': channel,
+    }
+
+
+def _normalise(frame: Frame) -> Frame:
+    """Coerce a frame dict from any source into plain ints/bytes."""
+    dlc = min(max(int(frame.get('dlc') or 0), 0), 8)
+    data = b'' if frame.get('rtr') else capture_file.payload_bytes(frame.get('data'), dlc)
+    return _frame(
+        max(int(frame.get('ts_us') or 0), 0),
+        int(frame.get('id') or 0) & 0x1FFFFFFF,
+        bool(frame.get('ext')),
+        bool(frame.get('rtr')),
+        dlc,
+        data,
+        min(max(int(frame.get('channel') or 0), 0), 0xFF),
+    )
+
+
+def _chunked(frames: Iterable[Frame], chunk_size: int) -> Iterator[Chunk]:
+    chunk: Chunk = []
+    for frame in frames:
+        chunk.append(frame)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --------------------------------------------------------------------------
+# candump
+# --------------------------------------------------------------------------
+
+_CANDUMP_RE = re.compile(r'^\((\d+)\.(\d+)\)\s+(\S+)\s+([0-9A-Fa-f]+)#(R\d*|[0-9A-Fa-f.]*)')
+
+
+def _read_candump(fh: IO[str], chunk_size: int) -> Iterator[Chunk]:
+    def frames() -> Iterator[Frame]:
+        for line in fh:
+            match = _CANDUMP_RE.match(line.strip())
+            if not match:
+                continue
+            secs, frac, iface, ident, body = match.groups()
+            iface_match = _CAN_IFACE_RE.match(iface)
+            channel = int(iface_match.group(1)) if iface_match else 0
+            ts_us = int(secs) * 1_000_000 + int(frac.ljust(6, '0')[:6])
+            ext = len(ident) > 3
+            if body.startswith('R'):
+                dlc = int(body[1:]) if len(body) > 1 else 0
+                yield _frame(ts_us, int(ident, 16), ext, True, min(dlc, 8), b'', channel)
+                continue
+            data = bytes.fromhex(body.replace('.', ''))[:8]
+            yield _frame(ts_us, int(ident, 16), ext, False, len(data), data, channel)
+
+    yield from _chunked(frames(), chunk_size)
+
+
+def _write_candump(fh: IO[str], chunks: Iterable[Chunk], interface: Optional[str] = None) -> int:
+    """Frames go to ``can<channel>`` unless one ``interface`` is given."""
+    count = 0
+    for chunk in chunks:
+        lines = []
+        for frame in chunk:
+            f = _normalise(frame)
+            ident = f"{f['id']:08X}" if f['ext'] else f"{f['id']:03X}"
+            body = f"R{f['dlc']}" if f['rtr'] else f['data'].hex().upper()
+            secs, micros = divmod(f['ts_us'], 1_000_000)
+            iface = interface or f"can{f['channel']}"
+            lines.append(f'({secs}.{micros:06d}) {iface} {ident}#{body}\n')
+        fh.writelines(lines)
+        count += len(chunk)
+    return count
+
+
+# --------------------------------------------------------------------------
+# Vector ASC
+# --------------------------------------------------------------------------
+
+_ASC_RE = re.compile(
+    r'^\s*(\d+(?:\.\d+)?)\s+(\d+)\s+([0-9A-Fa-f]+)(x?)\s+(?:Rx|Tx)\s+([dr])\s*([0-9A-Fa-f]*)\s*(.*)$'
+)
+
+
+def _read_asc(fh: IO[str], chunk_size: int) -> Iterator[Chunk]:
+    def frames() -> Iterator[Frame]:
+        base = 16
+        for line in fh:
+            stripped = line.strip()
+            if stripped.startswith('base '):
+                base = 10 if ' dec' in stripped else 16
+                continue
+            match = _ASC_RE.match(line)
+            if not match:
+                continue
+            stamp, channel_text, ident, ext, kind, dlc_text, rest = match.groups()
+            # ASC channels count from 1
+            channel = max(int(channel_text) - 1, 0)
+            ts_us = int(round(float(stamp) * 1_000_000))
+            identifier = int(ident, base)
+            dlc = min(int(dlc_text, 16), 8) if dlc_text else 0
+            if kind == 'r':
+                yield _frame(ts_us, identifier, bool(ext), True, dlc, b'', channel)
+                continue
+            fields = rest.split()[:dlc]
+            try:
+                data = bytes(int(v, base) & 0xFF for v in fields)
+            except ValueError:
+                continue
+            yield _frame(ts_us, identifier, bool(ext), False, len(data), data, channel)
+
+    yield from _chunked(frames(), chunk_size)
+
+
+def _write_asc(fh: IO[str], chunks: Iterable[Chunk], channel: Optional[int] = None) -> int:
+    """Frames go to ASC channel ``channel + 1`` unless one ``channel`` is given."""
+    stamp = datetime.now().strftime('%a %b %d %I:%M:%S.000 %p %Y').lower()
+    fh.write(f'date {stamp}\nbase hex  timestamps absolute\ninternal events logged\n')
+    fh.write('// version 9.0.0\n')
+    fh.write(f'Begin Triggerblock {stamp}\n')
+    count = 0
+    for chunk in chunks:
+        lines = []
+        for frame in chunk:
+            f = _normalise(frame)
+            ident = f"{f['id']:X}x" if f['ext'] else f"{f['id']:X}"
+            stamp_s = f['ts_us'] / 1_000_000
+            ch = channel or f['channel'] + 1
+            if f['rtr']:
+                lines.append(f"{stamp_s:11.6f} {ch}  {ident:<15} Rx   r {f['dlc']:X}\n")
+            else:
+                data = ' '.join(f'{b:02X}' for b in f['data'])
+                lines.append(f"{stamp_s:11.6f} {ch}  {ident:<15} Rx   d {f['dlc']:X} {data}\n")
+        fh.writelines(lines)
+        count += len(chunk)
+    fh.write('End TriggerBlock\n')
+    return count
+
+
+# --------------------------------------------------------------------------
+# CSV
+# --------------------------------------------------------------------------
+
+_CSV_FIELDS = ['ts_us', 'id', 'ext', 'rtr', 'dlc', 'data', 'channel']
+
+
+def _csv_bool(value: str) -> bool:
+    return value.strip().lower() in ('1', 'true', 'yes', 'x')
+
+
+def _read_csv(fh: IO[str], chunk_size: int) -> Iterator[Chunk]:
+    def frames() -> Iterator[Frame]:
+        for row in csv.DictReader(fh):
+            try:
+                ident_text = (row.get('id') or '').strip()
+                identifier = int(ident_text, 0)
+                ts_us = int(float(row.get('ts_us') or 0))
+                dlc = int(row.get('dlc') or 0)
+                channel = int(row.get('channel') or 0)
+            except ValueError:
+                continue
+            rtr = _csv_bool(row.get('rtr') or '')
+            data = b'' if rtr else capture_file.payload_bytes(row.get('data') or '', dlc)
+            ext = _csv_bool(row.get('ext') or '')
+            yield _frame(ts_us, identifier, ext, rtr, min(max(dlc, 0), 8), data, min(max(channel, 0), 0xFF))
+
+    yield from _chunked(frames(), chunk_size)
+
+
+def _write_csv(fh: IO[str], chunks: Iterable[Chunk]) -> int:
+    writer = csv.writer(fh, lineterminator='\n')
+    writer.writerow(_CSV_FIELDS)
+    count = 0
+    for chunk in chunks:
+        rows = []
+        for frame in chunk:
+            f = _normalise(frame)
+            rows.append(
+                [
+                    f['ts_us'],
+                    f"0x{f['id']:X}",
+                    int(f['ext']),
+                    int(f['rtr']),
+                    f['dlc'],
+                    f['data'].hex().upper(),
+                    f['channel'],
+                ]
+            )
+        writer.writerows(rows)
+        count += len(chunk)
+    return count
+
+
+# --------------------------------------------------------------------------
+# pcapng (LINKTYPE_CAN_SOCKETCAN)
+# --------------------------------------------------------------------------
+
+_LINKTYPE_CAN_SOCKETCAN = 227
+_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+_BLOCK_SHB = 0x0A0D0D0A
+_BLOCK_IDB = 0x00000001
+_BLOCK_EPB = 0x00000006
+_CAN_EFF_FLAG = 0x80000000
+_CAN_RTR_FLAG = 0x40000000
+_CAN_ERR_FLAG = 0x20000000
+# can_id (big endian) | len | pad | res0 | len8_dlc | data[8]
+_SOCKETCAN = struct.Struct('>IBBBB8s')
+
+
+def _pad4(length: int) -> int:
+    return (4 - length % 4) % 4
+
+
+def _block(block_type: int, body: bytes) -> bytes:
+    body += b'\x00' * _pad4(len(body))
+    total = len(body) + 12
+    return struct.pack('<II', block_type, total) + body + struct.pack('<I', total)
+
+
+def _write_pcapng(fh: IO[bytes], chunks: Iterable[Chunk]) -> int:
+    # Section header: byte-order magic, version 1.0, unknown section length
+    fh.write(_block(_BLOCK_SHB, struct.pack('<IHHq', _BYTE_ORDER_MAGIC, 1, 0, -1)))
+    # Interface description: linktype, reserved, snaplen, if_tsresol=6 (µs), end
+    options = struct.pack('<HHB3x', 9, 1, 6) + struct.pack('<HH', 0, 0)
+    fh.write(_block(_BLOCK_IDB, struct.pack('<HHI', _LINKTYPE_CAN_SOCKETCAN, 0, _SOCKETCAN.size) + options))
+    count = 0
+    for chunk in chunks:
+        blocks = []
+        for frame in chunk:
+            f = _normalise(frame)
+            can_id = f['id'] | (_CAN_EFF_FLAG if f['ext'] else 0) | (_CAN_RTR_FLAG if f['rtr'] else 0)
+            packet = _SOCKETCAN.pack(can_id, f['dlc'], 0, 0, 0, f['data'].ljust(8, b'\x00'))
+            ts = f['ts_us']
+            header = struct.pack('<IIIII', 0, ts >> 32, ts & 0xFFFFFFFF, len(packet), len(packet))
+            blocks.append(_block(_BLOCK_EPB, header + packet))
+        fh.write(b''.join(blocks))
+        count += len(chunk)
+    return count
+
+
+def _read_pcapng(fh: IO[bytes], chunk_size: int) -> Iterator[Chunk]:
+    def frames() -> Iterator[Frame]:
+        endian = '<'
+        # Per interface: (linktype, ticks per second)
+        interfaces: List[tuple] = []
+        while True:
+            head = fh.read(8)
+            if len(head) < 8:
+                return
+            block_type = struct.unpack('<I', head[:4])[0]
+            if block_type == _BLOCK_SHB:
+                magic = fh.read(4)
+                endian = '<' if struct.unpack('<I', magic)[0] == _BYTE_ORDER_MAGIC else '>'
+                total = struct.unpack(endian + 'I', head[4:])[0]
+                fh.read(total - 12)
+                interfaces = []
+                continue
+            block_type, total = struct.unpack(endian + 'II', head)
+            if total < 12:
+                raise ValueError('corrupt pcapng block')
+            body = fh.read(total - 8)[:-4]
+            if block_type == _BLOCK_IDB:
+                linktype = struct.unpack_from(endian + 'H', body)[0]
+                interfaces.append((linktype, _pcapng_tsresol(body[8:], endian)))
+            elif block_type == _BLOCK_EPB:
+                iface, ts_high, ts_low, caplen = struct.unpack_from(endian + 'IIII', body)
+                if iface >= len(interfaces) or interfaces[iface][0] != _LINKTYPE_CAN_SOCKETCAN:
+                    continue
+                packet = body[20 : 20 + caplen]
+                if len(packet) < 8:
+                    continue
+                can_id, length = struct.unpack_from('>IB', packet)
+                if can_id & _CAN_ERR_FLAG:
+                    continue
+                ticks = (ts_high << 32) | ts_low
+                ts_us = ticks * 1_000_000 // interfaces[iface][1]
+                rtr = bool(can_id & _CAN_RTR_FLAG)
+                dlc = min(length, 8)
+                data = b'' if rtr else bytes(packet[8 : 8 + dlc])
+                yield _frame(ts_us, can_id & 0x1FFFFFFF, bool(can_id & _CAN_EFF_FLAG), rtr, dlc, data)
+
+    yield from _chunked(frames(), chunk_size)
+
+
+def _pcapng_tsresol(options: bytes, endian: str) -> int:
+    pos = 0
+    while pos + 4 <= len(options):
+        code, length = struct.unpack_from(endian + 'HH', options, pos)
+        if code == 0:
+            break
+        if code == 9 and length >= 1:
+            value = options[pos + 4]
+            return 2 ** (value & 0x7F) if value & 0x80 else 10 ** value
+        pos += 4 + length + _pad4(length)
+    return 1_000_000
+
+
+# --------------------------------------------------------------------------
+# Bolt capture
+# --------------------------------------------------------------------------
+
+
+def _read_boltcap(fh: IO[bytes], chunk_size: int) -> Iterator[Chunk]:
+    version = capture_file.check_header(fh.read(capture_file.HEADER_SIZE))
+    record_size = capture_file.record_struct(version).size
+    while True:
+        block = fh.read(chunk_size * record_size)
+        whole = len(block) - len(block) % record_size
+        if not whole:
+            return
+        yield capture_file.unpack_records(block[:whole], version)
+
+
+def _write_boltcap(fh: IO[bytes], chunks: Iterable[Chunk]) -> int:
+    fh.write(capture_file.header_bytes())
+    count = 0
+    for chunk in chunks:
+        fh.write(capture_file.pack_frames(chunk))
+        count += len(chunk)
+    return count
+
+
+# --------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------
+
+_READERS: Dict[str, Callable[[Any, int], Iterator[Chunk]]] = {
+    'candump': _read_candump,
+    'asc': _read_asc,
+    'csv': _read_csv,
+    'pcapng': _read_pcapng,
+    'boltcap': _read_boltcap,
+}
+
+_WRITERS: Dict[str, Callable[[Any, Iterable[Chunk]], int]] = {
+    'candump': _write_candump,
+    'asc': _write_asc,
+    'csv': _write_csv,
+    'pcapng': _write_pcapng,
+    'boltcap': _write_boltcap,
+}
+
+_BINARY = {'pcapng', 'boltcap'}
+
+
+def read_frames(path: str, fmt: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK) -> Iterator[Chunk]:
+    """Stream frames from ``path`` in chunks; the format follows the extension."""
+    fmt = fmt or detect_format(path)
+    try:
+        reader = _READERS[fmt]
+    except KeyError:
+        raise ValueError(f'unsupported format {fmt!r}') from None
+    if fmt in _BINARY:
+        with open(path, 'rb') as fh:
+            yield from reader(fh, chunk_size)
+    else:
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as fh:
+            yield from reader(fh, chunk_size)
+
+
+def write_frames(path: str, chunks: Iterable[Chunk], fmt: Optional[str] = None) -> int:
+    """Write chunks of frames to ``path``; returns the number of frames written."""
+    fmt = fmt or detect_format(path)
+    try:
+        writer = _WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f'unsupported format {fmt!r}') from None
+    if fmt in _BINARY:
+        with open(path, 'wb') as fh:
+            return writer(fh, chunks)
+    with open(path, 'w', encoding='utf-8', newline='') as fh:
+        return writer(fh, chunks)
+
+
+def convert(
+    source: str,
+    destination: str,
+    source_fmt: Optional[str] = None,
+    destination_fmt: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> int:
+    """Convert between any two supported formats in constant memory."""
+    return write_frames(destination, read_frames(source, source_fmt, chunk_size), destination_fmt)
+
+
+class FrameFileReader:
+    """Replay source for foreign log formats (same interface as CaptureReader).
+
+    Text and pcapng files cannot be bisected, so :meth:`seek` skips frames
+    while streaming instead.
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None) -> None:
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self._min_ts: Optional[int] = None
+
+    def first_ts(self) -> Optional[int]:
+        for chunk in read_frames(self.path, self.fmt, 1):
+            return chunk[0]['ts_us']
+        return None
+
+    def seek(self, ts_us: int) -> None:
+        self._min_ts = ts_us
+
+    def rewind(self) -> None:
+        self._min_ts = None
+
+    def chunks(self, records: int = DEFAULT_CHUNK) -> Iterator[Chunk]:
+        min_ts = self._min_ts
+        for chunk in read_frames(self.path, self.fmt, records):
+            if min_ts is not None:
+                chunk = [frame for frame in chunk if frame['ts_us'] >= min_ts]
+                if not chunk:
+                    continue
+            yield chunk
+
+
+__all__ = [
+    'FORMAT_EXTENSIONS',
+    'FrameFileReader',
+    'convert',
+    'detect_format',
+    'read_frames',
+    'write_frames',
+]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert CAN logs between formats.')
+    parser.add_argument('source')
+    parser.add_argument('destination')
+    parser.add_argument('--from', dest='source_fmt', choices=sorted(FORMAT_EXTENSIONS))
+    parser.add_argument('--to', dest='destination_fmt', choices=sorted(FORMAT_EXTENSIONS))
+    args = parser.parse_args()
+    total = convert(args.source, args.destination, args.source_fmt, args.destination_fmt)
+    print(f'{total} frames written to {args.destination}')
@@ -0,0 +1,272 @@
+"""Append-only capture recorder with size/time rotation.
+
+Frames are packed into fixed-size records on the caller's thread (a single
+``struct.pack`` and a buffer append) and written by a background thread in
+large chunks, so recording never blocks the UI loop on disk I/O. If a write
+fails the recorder reports it through ``notify`` and stops taking frames.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from capture import capture_file
+
+# Writer wakes up at least this often to flush pending records
+_FLUSH_INTERVAL_S = 0.25
+# Pending records beyond this are dropped instead of growing memory
+_MAX_PENDING_BYTES = 64 * 1024 * 1024
+
+
+class CaptureRecorder:
+    """Write frames to rotating ``.boltcap`` files in ``directory``.
+
+    ``max_bytes`` / ``max_seconds`` start a new file once exceeded (0 turns the
+    limit off). ``fsync_interval`` forces data to disk at most that often; the
+    file is always fsynced on rotation and stop.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = 'bolt',
+        max_bytes: int = 256 * 1024 * 1024,
+        max_seconds: float = 3600.0,
+        fsync_interval: float = 5.0,
+        write_buffer: int = 1024 * 1024,
+        notify: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = int(max_bytes)
+        self.max_seconds = float(max_seconds)
+        self.fsync_interval = float(fsync_interval)
+        self.write_buffer = int(write_buffer)
+        self.notify = notify
+
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.frames_dropped = 0
+        self.files_written = 0
+        self.current_path: Optional[str] = None
+        self.last_error: Optional[str] = None
+        # Set by the writer thread when it gave up; record() then ignores frames
+        self.failed = False
+
+        self._pending = bytearray()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._file: Optional[Any] = None
+        self._file_bytes = 0
+        self._file_opened = 0.0
+        self._last_fsync = 0.0
+
+    # -- producer side ---------------------------------------------------
+
+    def record(self, frame: Dict[str, Any]) -> None:
+        if self.failed:
+            return
+        record = capture_file.pack_frame(frame)
+        with self._lock:
+            if len(self._pending) >= _MAX_PENDING_BYTES:
+                self.frames_dropped += 1
+                return
+            self._pending += record
+            if len(self._pending) >= self.write_buffer:
+                self._wake.set()
+
+    def record_many(self, frames: Iterable[Dict[str, Any]]) -> None:
+        if self.failed:
+            return
+        for frame in frames:
+            self.record(frame)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self) -> None:
+        if self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self.failed = False
+        self.last_error = None
+        self._open_new_file()
+        self._thread = threading.Thread(target=self._writer_loop, name='capture-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.running,
+            'path': self.current_path,
+            'frames_written': self.frames_written,
+            'bytes_written': self.bytes_written,
+            'frames_dropped': self.frames_dropped,
+            'files_written': self.files_written,
+            'pending_bytes': len(self._pending),
+            'failed': self.failed,
+            'error': self.last_error,
+        }
+
+    # -- writer thread ---------------------------------------------------
+
+    def _writer_loop(self) -> None:
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(_FLUSH_INTERVAL_S)
+                self._wake.clear()
+                self._drain()
+            self._drain()
+        except OSError as exc:
+            self.last_error = str(exc)
+            self.failed = True
+            with self._lock:
+                self._pending.clear()
+            self._emit(f'Recording stopped: {exc} ({self.frames_written} frames written to {self.current_path})')
+        finally:
+            try:
+                self._close_file()
+            except OSError:
+                pass
+
+    def _emit(self, message: str) -> None:
+        notify = self.notify
+        if notify is None:
+            return
+        try:
+            notify(message)
+        except Exception:
+            pass
+
+    def _drain(self) -> None:
+        with self._lock:
+            chunk = bytes(self._pending)
+            self._pending.clear()
+        now = time.monotonic()
+        view = memoryview(chunk)
+        while view:
+            if self._file is None or self._rotation_due(now):
+                self._close_file()
+                self._open_new_file()
+            part = view[: self._room()]
+            assert self._file is not None
+            self._file.write(part)
+            self._file_bytes += len(part)
+            self.bytes_written += len(part)
+            self.frames_written += len(part) // capture_file.RECORD_SIZE
+            view = view[len(part):]
+        if self._file and self.fsync_interval > 0 and now - self._last_fsync >= self.fsync_interval:
+            self._sync()
+
+    def _room(self) -> int:
+        """Bytes (whole records) that still fit in the current file."""
+        if not self.max_bytes:
+            return _MAX_PENDING_BYTES
+        room = self.max_bytes - self._file_bytes
+        # Always make progress, even with a limit smaller than one record
+        return max(room - room % capture_file.RECORD_SIZE, capture_file.RECORD_SIZE)
+
+    def _rotation_due(self, now: float) -> bool:
+        if self._file_bytes <= capture_file.HEADER_SIZE:
+            return False
+        if self.max_bytes and self._file_bytes + capture_file.RECORD_SIZE > self.max_bytes:
+            return True
+        if self.max_seconds and now - self._file_opened >= self.max_seconds:
+            return True
+        return False
+
+    def _open_new_file(self) -> None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        index = self.files_written
+        path = os.path.join(self.directory, f'{self.prefix}-{stamp}-{index:03d}{capture_file.SUFFIX}')
+        self._file = open(path, 'ab', buffering=self.write_buffer)
+        if self._file.tell() == 0:
+            self._file.write(capture_file.header_bytes())
+        self._file_bytes = capture_file.HEADER_SIZE
+        self._file_opened = time.monotonic()
+        self._last_fsync = self._file_opened
+        self.current_path = path
+        self.files_written += 1
+
+    def _sync(self) -> None:
+        if not self._file:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _close_file(self) -> None:
+        if not self._file:
+            return
+        try:
+            self._sync()
+        finally:
+            self._file.close()
+            self._file = None
+
+
+_RECORDER: Optional[CaptureRecorder] = None
+_NOTIFY: Optional[Callable[[str], None]] = None
+
+
+def set_notifier(fn: Optional[Callable[[str], None]]) -> None:
+    """Where recorder failures are reported (the monitor log in the dashboard)."""
+    global _NOTIFY
+    _NOTIFY = fn
+    if _RECORDER is not None:
+        _RECORDER.notify = fn
+
+
+def start_recording(directory: str = 'captures', **options: Any) -> CaptureRecorder:
+    """Start the global recorder that ``jtag.data_processor`` feeds."""
+    global _RECORDER
+    stop_recording()
+    options.setdefault('notify', _NOTIFY)
+    recorder = CaptureRecorder(directory, **options)
+    recorder.start()
+    _RECORDER = recorder
+    return recorder
+
+
+def stop_recording() -> Optional[Dict[str, Any]]:
+    global _RECORDER
+    recorder = _RECORDER
+    _RECORDER = None
+    if recorder is None:
+        return None
+    recorder.stop()
+    return recorder.stats()
+
+
+def active_recorder() -> Optional[CaptureRecorder]:
+    return _RECORDER
+
+
+def record_frame(frame: Dict[str, Any]) -> None:
+    recorder = _RECORDER
+    if recorder is not None:
+        recorder.record(frame)
+
+
+__all__ = [
+    'CaptureRecorder',
+    'active_recorder',
+    'record_frame',
+    'set_notifier',
+    'start_recording',
+    'stop_recording',
+]
@@ -0,0 +1,322 @@
+"""Stream recorded captures back into the live ingestion pipeline."""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from capture import capture_file, formats
+from usb_serial.serial_handler import pending_count, push_frames
+
+# Records read from disk per chunk
+_READ_RECORDS = 4096
+# Frames handed to the pipeline per batch
+_BATCH_FRAMES = 256
+# In real-time mode, frames due within this window are sent together
+_BATCH_LATENCY_S = 0.02
+# Back off while the consumer has this many batches queued (max-speed mode)
+_MAX_QUEUED_BATCHES = 64
+
+
+def capture_paths(source: Union[str, Sequence[str]]) -> List[str]:
+    """Resolve a file, a directory of rotated files or a list of files."""
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            names = sorted(n for n in os.listdir(source) if n.endswith(capture_file.SUFFIX))
+            return [os.path.join(source, n) for n in names]
+        return [source]
+    return list(source)
+
+
+class CaptureReader:
+    """Sequential reader over one or more capture files.
+
+    Files are read in chunks of whole records, never loaded completely.
+    :meth:`seek` positions the reader on the first frame at or after a device
+    timestamp by bisecting over record offsets, which assumes timestamps are
+    non-decreasing across the files (true for a single recording session).
+    """
+
+    def __init__(self, source: Union[str, Sequence[str]]) -> None:
+        self.paths = capture_paths(source)
+        if not self.paths:
+            raise FileNotFoundError(f'no capture files in {source!r}')
+        # Format version per file; a folder may mix files from before and after an upgrade
+        self._versions = [self._version(path) for path in self.paths]
+        self._counts = [
+            self._record_count(path, capture_file.record_struct(version).size)
+            for path, version in zip(self.paths, self._versions)
+        ]
+        self._file_index = 0
+        self._record_index = 0
+
+    @staticmethod
+    def _version(path: str) -> int:
+        with open(path, 'rb') as fh:
+            return capture_file.check_header(fh.read(capture_file.HEADER_SIZE))
+
+    @staticmethod
+    def _record_count(path: str, record_size: int) -> int:
+        size = os.path.getsize(path) - capture_file.HEADER_SIZE
+        # A crash mid-write can leave a partial trailing record; ignore it
+        return max(size, 0) // record_size
+
+    def _record(self, file_index: int) -> struct.Struct:
+        return capture_file.record_struct(self._versions[file_index])
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def _read_ts(self, file_index: int, record_index: int) -> int:
+        record = self._record(file_index)
+        offset = capture_file.HEADER_SIZE + record_index * record.size
+        with open(self.paths[file_index], 'rb') as fh:
+            fh.seek(offset)
+            return record.unpack(fh.read(record.size))[0]
+
+    def first_ts(self) -> Optional[int]:
+        for index, count in enumerate(self._counts):
+            if count:
+                return self._read_ts(index, 0)
+        return None
+
+    def seek(self, ts_us: int) -> None:
+        """Position on the first frame with ``ts_us`` >= the given timestamp."""
+        for file_index, count in enumerate(self._counts):
+            if not count or self._read_ts(file_index, count - 1) < ts_us:
+                continue
+            low, high = 0, count - 1
+            record = self._record(file_index)
+            with open(self.paths[file_index], 'rb') as fh:
+                while low < high:
+                    mid = (low + high) // 2
+                    fh.seek(capture_file.HEADER_SIZE + mid * record.size)
+                    mid_ts = record.unpack(fh.read(record.size))[0]
+                    if mid_ts < ts_us:
+                        low = mid + 1
+                    else:
+                        high = mid
+            self._file_index, self._record_index = file_index, low
+            return
+        # Past the end: nothing left to read
+        self._file_index, self._record_index = len(self.paths), 0
+
+    def rewind(self) -> None:
+        self._file_index, self._record_index = 0, 0
+
+    def chunks(self, records: int = _READ_RECORDS) -> Iterator[List[Dict[str, Any]]]:
+        """Yield frame dicts in chunks from the current position onwards."""
+        while self._file_index < len(self.paths):
+            path = self.paths[self._file_index]
+            count = self._counts[self._file_index]
+            version = self._versions[self._file_index]
+            size = capture_file.record_struct(version).size
+            with open(path, 'rb') as fh:
+                fh.seek(capture_file.HEADER_SIZE + self._record_index * size)
+                while self._record_index < count:
+                    take = min(records, count - self._record_index)
+                    block = fh.read(take * size)
+                    take = len(block) // size
+                    if not take:
+                        break
+                    self._record_index += take
+                    yield capture_file.unpack_records(block[: take * size], version)
+            self._file_index += 1
+            self._record_index = 0
+
+    def frames(self) -> Iterator[Dict[str, Any]]:
+        for chunk in self.chunks():
+            yield from chunk
+
+
+def open_capture(source: Union[str, Sequence[str]]) -> Union[CaptureReader, formats.FrameFileReader]:
+    """Open a Bolt capture (file, folder or list) or a candump/ASC/CSV/pcapng log."""
+    if isinstance(source, str) and not os.path.isdir(source):
+        fmt = formats.detect_format(source)
+        if fmt != 'boltcap':
+            if not os.path.exists(source):
+                raise FileNotFoundError(source)
+            return formats.FrameFileReader(source, fmt)
+    return CaptureReader(source)
+
+
+class Replayer:
+    """Feed a capture to ``sink`` at original, scaled or maximum speed.
+
+    ``speed`` 1.0 reproduces the original timing, 2.0 plays twice as fast and
+    0 (or None) sends frames as fast as the consumer accepts them. Playback
+    begins at ``start_ts_us`` or, failing that, ``start_offset_s`` seconds
+    after the first frame.
+    ``backlog`` reports how many batches the consumer still has queued; in
+    max-speed mode the replayer waits while it exceeds a small bound so the
+    queue cannot grow without limit.
+    """
+
+    def __init__(
+        self,
+        reader: Union[CaptureReader, formats.FrameFileReader],
+        sink: Callable[[List[Dict[str, Any]]], None],
+        speed: Optional[float] = 1.0,
+        start_ts_us: Optional[int] = None,
+        backlog: Optional[Callable[[], int]] = None,
+        on_finish: Optional[Callable[['Replayer'], None]] = None,
+        start_offset_s: float = 0.0,
+    ) -> None:
+        self.reader = reader
+        self.sink = sink
+        self.speed = float(speed or 0.0)
+        self.start_ts_us = start_ts_us
+        self.start_offset_s = max(float(start_offset_s or 0.0), 0.0)
+        self.backlog = backlog
+        self.on_finish = on_finish
+
+        self.frames_sent = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='capture-replay', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        end = self.finished_at or time.monotonic()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            'running': self.running,
+            'frames_sent': self.frames_sent,
+            'elapsed_s': round(elapsed, 3),
+            'frames_per_s': round(self.frames_sent / elapsed, 1) if elapsed > 0 else 0.0,
+            'speed': self.speed,
+            'error': self.last_error,
+        }
+
+    def _run(self) -> None:
+        self.started_at = time.monotonic()
+        try:
+            start_ts_us = self.start_ts_us
+            if start_ts_us is None and self.start_offset_s:
+                first_ts = self.reader.first_ts()
+                if first_ts is not None:
+                    start_ts_us = first_ts + int(self.start_offset_s * 1e6)
+            if start_ts_us is not None:
+                self.reader.seek(start_ts_us)
+            if self.speed > 0:
+                self._run_timed()
+            else:
+                self._run_max_speed()
+        except (OSError, ValueError) as exc:
+            self.last_error = str(exc)
+        finally:
+            self.finished_at = time.monotonic()
+            if self.on_finish:
+                self.on_finish(self)
+
+    def _send(self, batch: List[Dict[str, Any]]) -> None:
+        self.sink(batch)
+        self.frames_sent += len(batch)
+
+    def _run_max_speed(self) -> None:
+        for chunk in self.reader.chunks():
+            for start in range(0, len(chunk), _BATCH_FRAMES):
+                while self.backlog and self.backlog() > _MAX_QUEUED_BATCHES:
+                    if self._stop.wait(0.005):
+                        return
+                if self._stop.is_set():
+                    return
+                self._send(chunk[start : start + _BATCH_FRAMES])
+
+    def _run_timed(self) -> None:
+        origin_ts: Optional[int] = None
+        origin_clock = 0.0
+        batch: List[Dict[str, Any]] = []
+        for chunk in self.reader.chunks():
+            for frame in chunk:
+                ts_us = frame['ts_us']
+                if origin_ts is None:
+                    origin_ts, origin_clock = ts_us, time.monotonic()
+                due = origin_clock + (ts_us - origin_ts) / 1e6 / self.speed
+                delay = due - time.monotonic()
+                if delay > _BATCH_LATENCY_S or len(batch) >= _BATCH_FRAMES:
+                    if batch:
+                        self._send(batch)
+                        batch = []
+                    if delay > 0 and self._stop.wait(delay):
+                        return
+                if self._stop.is_set():
+                    return
+                batch.append(frame)
+        if batch:
+            self._send(batch)
+
+
+_REPLAYER: Optional[Replayer] = None
+
+
+def start_replay(
+    source: Union[str, Sequence[str]],
+    speed: Optional[float] = 1.0,
+    start_ts_us: Optional[int] = None,
+    on_finish: Optional[Callable[[Replayer], None]] = None,
+    start_offset_s: float = 0.0,
+) -> Replayer:
+    """Replay a capture or log through the serial reader queue (and so process_item).
+
+    ``start_offset_s`` starts that many seconds into the capture (see :class:`Replayer`).
+    """
+    global _REPLAYER
+    stop_replay()
+    replayer = Replayer(
+        open_capture(source),
+        push_frames,
+        speed=speed,
+        start_ts_us=start_ts_us,
+        backlog=pending_count,
+        on_finish=on_finish,
+        start_offset_s=start_offset_s,
+    )
+    replayer.start()
+    _REPLAYER = replayer
+    return replayer
+
+
+def stop_replay() -> Optional[Dict[str, Any]]:
+    global _REPLAYER
+    replayer = _REPLAYER
+    _REPLAYER = None
+    if replayer is None:
+        return None
+    replayer.stop()
+    return replayer.stats()
+
+
+def active_replay() -> Optional[Replayer]:
+    return _REPLAYER
+
+
+__all__ = [
+    'CaptureReader',
+    'Replayer',
+    'active_replay',
+    'capture_paths',
+    'open_capture',
+    'start_replay',
+    'stop_replay',
+]
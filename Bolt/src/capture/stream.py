@@ -0,0 +1,250 @@
+"""Fan decoded frames out to streaming clients.
+
+``jtag.data_processor`` hands every decoded batch to :func:`publish`, next
+to the recorder. Each :class:`StreamClient` keeps its own filter and a
+bounded buffer, so a slow consumer only ever loses its own frames: with
+the ``drop_oldest`` policy the oldest buffered frames are discarded (and
+counted), with ``disconnect`` the client is flagged as overflowed and its
+transport closes it. Publishing never blocks and costs one list check when
+nobody is connected.
+
+The transport (``stream_api``) drains clients with :meth:`StreamClient.take`.
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections import deque
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+DROP_OLDEST = 'drop_oldest'
+DISCONNECT = 'disconnect'
+POLICIES = (DROP_OLDEST, DISCONNECT)
+
+# Frames a client may have waiting by default
+DEFAULT_BUFFER = 10_000
+MAX_BUFFER = 1_000_000
+
+_CLIENTS: List['StreamClient'] = []
+_NEXT_ID = itertools.count(1)
+
+
+def _parse_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    return int(str(value).strip(), 0)
+
+
+def _split(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part for part in value.split(',') if part.strip()]
+    return list(value)
+
+
+class StreamFilter:
+    """Server-side frame filter: identifier sets, identifier ranges and channels.
+
+    A frame passes when its identifier is in ``ids`` or inside one of the
+    inclusive ``ranges`` (both empty: every identifier) and, if ``channels``
+    is set, its channel is listed.
+    """
+
+    __slots__ = ('ids', 'ranges', 'channels')
+
+    def __init__(
+        self,
+        ids: Iterable[int] = (),
+        ranges: Iterable[Tuple[int, int]] = (),
+        channels: Optional[Iterable[int]] = None,
+    ) -> None:
+        self.ids: FrozenSet[int] = frozenset(ids)
+        self.ranges: Tuple[Tuple[int, int], ...] = tuple((min(lo, hi), max(lo, hi)) for lo, hi in ranges)
+        self.channels: Optional[FrozenSet[int]] = None if channels is None else frozenset(channels)
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> 'StreamFilter':
+        """Build a filter from query parameters or a JSON object.
+
+        ``ids`` is a list (or comma-separated string) of identifiers,
+        ``ranges`` a list of ``[lo, hi]`` pairs or ``"lo-hi"`` strings and
+        ``channels`` a list of channel numbers. Numbers may be written in
+        hex (``0x100``). Raises ``ValueError`` on malformed input.
+        """
+        ids = [_parse_int(value) for value in _split(spec.get('ids'))]
+        ranges: List[Tuple[int, int]] = []
+        for item in _split(spec.get('ranges')):
+            if isinstance(item, str):
+                lo, sep, hi = item.strip().partition('-')
+                if not sep:
+                    raise ValueError(f'range {item!r} must look like lo-hi')
+                ranges.append((_parse_int(lo), _parse_int(hi)))
+            else:
+                lo, hi = item
+                ranges.append((_parse_int(lo), _parse_int(hi)))
+        channels = spec.get('channels')
+        return cls(ids, ranges, None if channels in (None, '') else [_parse_int(c) for c in _split(channels)])
+
+    @property
+    def accepts_all(self) -> bool:
+        return not self.ids and not self.ranges and self.channels is None
+
+    def match(self, frame: Dict[str, Any]) -> bool:
+        if self.channels is not None and frame.get('channel', 0) not in self.channels:
+            return False
+        if not self.ids and not self.ranges:
+            return True
+        identifier = frame['id']
+        if identifier in self.ids:
+            return True
+        for lo, hi in self.ranges:
+            if lo <= identifier <= hi:
+                return True
+        return False
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'ids': sorted(self.ids),
+            'ranges': [list(r) for r in self.ranges],
+            'channels': None if self.channels is None else sorted(self.channels),
+        }
+
+
+class StreamClient:
+    """One consumer: a filter, a bounded frame buffer and drop counters.
+
+    ``on_ready`` is called (from whichever thread publishes) once at least
+    ``wake_at`` frames are waiting or the client overflowed, so the
+    transport can send early instead of waiting for its next tick.
+    """
+
+    def __init__(
+        self,
+        stream_filter: Optional[StreamFilter] = None,
+        max_buffer: int = DEFAULT_BUFFER,
+        policy: str = DROP_OLDEST,
+        wake_at: int = 0,
+        on_ready: Optional[Callable[[], None]] = None,
+        name: str = '',
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f'policy must be one of {", ".join(POLICIES)}')
+        self.id = next(_NEXT_ID)
+        self.name = name
+        self.filter = stream_filter or StreamFilter()
+        self.max_buffer = min(max(int(max_buffer), 1), MAX_BUFFER)
+        self.policy = policy
+        self.wake_at = wake_at
+        self.on_ready = on_ready
+        self.overflowed = False
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+        self.batches = 0
+        self._buffer: Deque[Dict[str, Any]] = deque()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def set_filter(self, stream_filter: StreamFilter) -> None:
+        """Replace the filter; frames already buffered are kept."""
+        self.filter = stream_filter
+
+    def offer(self, frames: Sequence[Dict[str, Any]]) -> None:
+        if self.overflowed:
+            return
+        if self.filter.accepts_all:
+            matched: Sequence[Dict[str, Any]] = frames
+        else:
+            match = self.filter.match
+            matched = [frame for frame in frames if match(frame)]
+        if not matched:
+            return
+        self.received += len(matched)
+        buffer = self._buffer
+        buffer.extend(matched)
+        excess = len(buffer) - self.max_buffer
+        if excess > 0:
+            if self.policy == DISCONNECT:
+                self.overflowed = True
+                self.dropped += len(buffer)
+                buffer.clear()
+            else:
+                self.dropped += excess
+                for _ in range(excess):
+                    buffer.popleft()
+        if self.on_ready is not None and (self.overflowed or len(buffer) >= self.wake_at):
+            self.on_ready()
+
+    def take(self, max_frames: int) -> List[Dict[str, Any]]:
+        """Remove and return up to ``max_frames`` buffered frames, oldest first."""
+        buffer = self._buffer
+        count = min(len(buffer), max_frames)
+        if count <= 0:
+            return []
+        popleft = buffer.popleft
+        out = [popleft() for _ in range(count)]
+        self.sent += count
+        self.batches += 1
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'client': self.id,
+            'name': self.name,
+            'policy': self.policy,
+            'max_buffer': self.max_buffer,
+            'pending': self.pending,
+            'received': self.received,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'overflowed': self.overflowed,
+            'filter': self.filter.describe(),
+        }
+
+
+def add_client(client: StreamClient) -> StreamClient:
+    if client not in _CLIENTS:
+        _CLIENTS.append(client)
+    return client
+
+
+def remove_client(client: StreamClient) -> None:
+    try:
+        _CLIENTS.remove(client)
+    except ValueError:
+        pass
+
+
+def clients() -> List[StreamClient]:
+    return list(_CLIENTS)
+
+
+def client_stats() -> List[Dict[str, Any]]:
+    return [client.stats() for client in _CLIENTS]
+
+
+def publish(frames: Sequence[Dict[str, Any]]) -> None:
+    """Offer a decoded batch to every connected client."""
+    if not _CLIENTS:
+        return
+    for client in tuple(_CLIENTS):
+        client.offer(frames)
+
+
+__all__ = [
+    'DEFAULT_BUFFER',
+    'DISCONNECT',
+    'DROP_OLDEST',
+    'POLICIES',
+    'StreamClient',
+    'StreamFilter',
+    'add_client',
+    'client_stats',
+    'clients',
+    'publish',
+    'remove_client',
+]
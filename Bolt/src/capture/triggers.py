@@ -0,0 +1,565 @@
+"""Triggered capture: keep recent history, save it when something happens.
+
+Instead of recording for hours to catch an intermittent fault, arm one or
+more :class:`Trigger` objects. ``jtag.data_processor`` hands every decoded
+frame and every log line to the global :class:`TriggerEngine`, which
+
+- packs each frame into a fixed-size pre-trigger ring (``pre_frames``
+  records, allocated once), and
+- checks the armed triggers against it.
+
+When a trigger fires, the ring is saved together with the frames that
+follow, for ``post_ms`` of device time or ``post_frames`` frames, whichever
+comes first. Sniffers run on independent clocks, so the window is timed on
+the triggering channel's clock; frames from the other channels are kept
+until it ends. The result is written to ``captures/trigger-<name>-<stamp>.boltcap``,
+which can be replayed or exported like any other recording.
+
+Trigger kinds:
+
+    id          a frame with ``id`` arrives
+    pattern     (data & mask) == (pattern & mask), optionally for one ``id``
+    dlc_change  a frame's DLC differs from the previous one for its identifier
+    missing     ``id`` was not seen for ``timeout_ms`` (noticed on the next
+                frame of the same channel)
+    log         a log line matches ``regex`` (by default the sniffer's
+                bus-error and error-passive alerts)
+
+Every kind can be limited to one ``channel``. After firing, a trigger
+ignores matches for ``holdoff_s`` seconds. With ``rearm`` off it disarms
+until :meth:`Trigger.arm` is called. A trigger that fires while a capture
+is still running is counted, but it does not start a second capture.
+
+With no triggers defined, :func:`offer_frames` and :func:`offer_line` cost one
+check each.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Pattern, Sequence, Tuple
+
+from capture import capture_file
+
+ID = 'id'
+PATTERN = 'pattern'
+DLC_CHANGE = 'dlc_change'
+MISSING = 'missing'
+LOG = 'log'
+KINDS = (ID, PATTERN, DLC_CHANGE, MISSING, LOG)
+
+DEFAULT_PRE_FRAMES = 20_000
+DEFAULT_POST_MS = 2000.0
+DEFAULT_POST_FRAMES = 100_000
+DEFAULT_HOLDOFF_S = 1.0
+# Alerts logged by the sniffer's CAN handler (see main/Drivers/can_handler.c)
+DEFAULT_LOG_REGEX = r'bus error|error-passive|bus-off|error frame'
+# A capture whose post window never fills (bus went quiet) is closed this
+# long after its post window ends, in host time
+_IDLE_GRACE_S = 1.0
+_MAX_CAPTURES_KEPT = 50
+
+_NAMES = itertools.count(1)
+
+
+def _parse_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    return int(str(value).strip(), 0)
+
+
+def _parse_hex(value: Any) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if isinstance(value, (list, tuple)):
+        return bytes(_parse_int(v) & 0xFF for v in value)
+    text = str(value).replace(' ', '').replace('-', '').replace('_', '')
+    if len(text) % 2:
+        raise ValueError(f'hex bytes {value!r} must have an even number of digits')
+    return bytes.fromhex(text)
+
+
+class Trigger:
+    """One armed condition; see the module docstring for the kinds."""
+
+    def __init__(
+        self,
+        kind: str,
+        name: Optional[str] = None,
+        identifier: Optional[int] = None,
+        channel: Optional[int] = None,
+        pattern: bytes = b'',
+        mask: Optional[bytes] = None,
+        timeout_ms: float = 0.0,
+        regex: Optional[str] = None,
+        holdoff_s: float = DEFAULT_HOLDOFF_S,
+        rearm: bool = True,
+    ) -> None:
+        if kind not in KINDS:
+            raise ValueError(f'kind must be one of {", ".join(KINDS)}')
+        if kind in (ID, MISSING) and identifier is None:
+            raise ValueError(f'a {kind} trigger needs an id')
+        if kind == PATTERN:
+            if not pattern or len(pattern) > 8:
+                raise ValueError('pattern must be 1 to 8 bytes')
+            mask = b'\xff' * len(pattern) if mask is None else mask
+            if len(mask) != len(pattern):
+                raise ValueError('mask must be as long as the pattern')
+        if kind == MISSING and timeout_ms <= 0:
+            raise ValueError('a missing trigger needs timeout_ms > 0')
+        self.kind = kind
+        self.name = name or f'{kind}-{next(_NAMES)}'
+        self.identifier = identifier
+        self.channel = channel
+        self.pattern = pattern
+        self.mask = mask or b''
+        self.timeout_ms = float(timeout_ms)
+        self.regex = regex if regex is not None else (DEFAULT_LOG_REGEX if kind == LOG else None)
+        self.holdoff_s = max(float(holdoff_s), 0.0)
+        self.rearm = bool(rearm)
+        self.armed = True
+        self.fired = 0
+        self.held_off = 0
+        self.last_fired: Optional[float] = None
+        self.last_reason: Optional[str] = None
+
+        self._width = len(self.pattern)
+        self._mask_int = int.from_bytes(self.mask, 'big')
+        self._value_int = int.from_bytes(self.pattern, 'big') & self._mask_int
+        self._compiled: Optional[Pattern[str]] = re.compile(self.regex, re.IGNORECASE) if self.regex else None
+        # dlc_change: (channel, id) -> last DLC; missing: channel -> [last seen ts_us, reported]
+        self._last_dlc: Dict[Tuple[int, int], int] = {}
+        self._last_seen: Dict[int, List[Any]] = {}
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> 'Trigger':
+        """Build a trigger from a JSON object.
+
+        Keys: ``kind``, ``name``, ``id``, ``channel``, ``pattern`` and
+        ``mask`` (hex strings such as ``"12 34"``), ``timeout_ms``,
+        ``regex``, ``holdoff_s`` and ``rearm``. Numbers may be written in
+        hex. Raises ``ValueError`` on malformed input.
+        """
+        try:
+            identifier = spec.get('id')
+            channel = spec.get('channel')
+            mask = spec.get('mask')
+            return cls(
+                str(spec.get('kind') or ''),
+                name=str(spec['name']) if spec.get('name') else None,
+                identifier=None if identifier in (None, '') else _parse_int(identifier),
+                channel=None if channel in (None, '') else _parse_int(channel),
+                pattern=_parse_hex(spec.get('pattern') or b''),
+                mask=None if mask in (None, '') else _parse_hex(mask),
+                timeout_ms=float(spec.get('timeout_ms') or 0),
+                regex=spec.get('regex') or None,
+                holdoff_s=float(spec.get('holdoff_s', DEFAULT_HOLDOFF_S)),
+                rearm=bool(spec.get('rearm', True)),
+            )
+        except re.error as exc:
+            raise ValueError(f'bad regex: {exc}') from None
+        except TypeError as exc:
+            raise ValueError(str(exc)) from None
+
+    def arm(self) -> None:
+        self.armed = True
+
+    def disarm(self) -> None:
+        self.armed = False
+
+    def match_frame(self, frame: Dict[str, Any]) -> Optional[str]:
+        """Why ``frame`` sets this trigger off, or ``None``."""
+        kind = self.kind
+        if kind == LOG:
+            return None
+        channel = frame.get('channel', 0)
+        if self.channel is not None and channel != self.channel:
+            return None
+        identifier = frame['id']
+        if kind == MISSING:
+            return self._check_missing(channel, identifier, frame.get('ts_us') or 0)
+        if self.identifier is not None and identifier != self.identifier:
+            return None
+        if kind == ID:
+            return f'0x{identifier:X} received'
+        if kind == PATTERN:
+            data = frame.get('data')
+            if not isinstance(data, (bytes, bytearray)):
+                data = capture_file.payload_bytes(data, int(frame.get('dlc') or 0))
+            if len(data) < self._width:
+                return None
+            if int.from_bytes(data[: self._width], 'big') & self._mask_int != self._value_int:
+                return None
+            return f'0x{identifier:X} data {bytes(data).hex(" ").upper()}'
+        # DLC_CHANGE
+        dlc = int(frame.get('dlc') or 0)
+        key = (channel, identifier)
+        previous = self._last_dlc.get(key)
+        self._last_dlc[key] = dlc
+        if previous is None or previous == dlc:
+            return None
+        return f'0x{identifier:X} DLC {previous} -> {dlc}'
+
+    def _check_missing(self, channel: int, identifier: int, ts_us: int) -> Optional[str]:
+        seen = self._last_seen.get(channel)
+        if identifier == self.identifier:
+            if seen is None:
+                self._last_seen[channel] = [ts_us, False]
+            else:
+                seen[0] = ts_us
+                seen[1] = False
+            return None
+        if seen is None or seen[1]:
+            return None
+        gap_ms = (ts_us - seen[0]) / 1000.0
+        if gap_ms <= self.timeout_ms:
+            return None
+        # Once per gap; the next sighting starts watching again
+        seen[1] = True
+        return f'0x{self.identifier:X} missing for {gap_ms:.1f} ms'
+
+    def match_line(self, text: str, channel: int = 0) -> Optional[str]:
+        if self._compiled is None or (self.channel is not None and channel != self.channel):
+            return None
+        if self._compiled.search(text) is None:
+            return None
+        return f'log: {text[:120]}'
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'id': self.identifier,
+            'channel': self.channel,
+            'pattern': self.pattern.hex(' ').upper() if self.pattern else None,
+            'mask': self.mask.hex(' ').upper() if self.mask else None,
+            'timeout_ms': self.timeout_ms or None,
+            'regex': self.regex,
+            'holdoff_s': self.holdoff_s,
+            'rearm': self.rearm,
+            'armed': self.armed,
+            'fired': self.fired,
+            'held_off': self.held_off,
+            'last_reason': self.last_reason,
+        }
+
+
+class _Capture:
+    __slots__ = (
+        'trigger',
+        'reason',
+        'started_at',
+        'started',
+        'channel',
+        'end_ts_us',
+        'frames_left',
+        'pre',
+        'pre_frames',
+        'post',
+        'post_frames',
+    )
+
+    def __init__(
+        self, trigger: str, reason: str, channel: int, end_ts_us: Optional[int], frames_left: int, pre: bytes
+    ) -> None:
+        self.trigger = trigger
+        self.reason = reason
+        self.started_at = datetime.now()
+        self.started = time.monotonic()
+        # Sniffer clocks are independent: the window is timed on the triggering channel's
+        # clock (None: no frame from it yet, so only poll() and post_frames end it)
+        self.channel = channel
+        self.end_ts_us = end_ts_us
+        self.frames_left = frames_left
+        self.pre = pre
+        self.pre_frames = len(pre) // capture_file.RECORD_SIZE
+        self.post = bytearray()
+        self.post_frames = 0
+
+
+class TriggerEngine:
+    """Pre-trigger ring, trigger evaluation and post-trigger capture.
+
+    Not locked: every method must run on the thread that calls
+    :meth:`offer_frames` (the event loop in the dashboard).
+    """
+
+    def __init__(
+        self,
+        pre_frames: int = DEFAULT_PRE_FRAMES,
+        post_ms: float = DEFAULT_POST_MS,
+        post_frames: int = DEFAULT_POST_FRAMES,
+        directory: str = 'captures',
+        notify: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.post_ms = float(post_ms)
+        self.post_frames = max(int(post_frames), 1)
+        self.directory = directory
+        self.notify = notify
+        self.captures: Deque[Dict[str, Any]] = deque(maxlen=_MAX_CAPTURES_KEPT)
+        # Replaced, never mutated, so the ingestion path can iterate without a lock
+        self._triggers: Tuple[Trigger, ...] = ()
+        self._capture: Optional[_Capture] = None
+        # Newest device timestamp per channel, for triggers on log lines
+        self._last_ts_us: Dict[int, int] = {}
+        self._set_ring(pre_frames)
+
+    def _set_ring(self, pre_frames: int) -> None:
+        self.pre_frames = max(int(pre_frames), 0)
+        self._ring = bytearray(self.pre_frames * capture_file.RECORD_SIZE)
+        self._ring_next = 0
+        self._ring_count = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self._triggers)
+
+    @property
+    def capturing(self) -> bool:
+        return self._capture is not None
+
+    def configure(
+        self,
+        pre_frames: Optional[int] = None,
+        post_ms: Optional[float] = None,
+        post_frames: Optional[int] = None,
+        directory: Optional[str] = None,
+    ) -> None:
+        """Change the capture windows; a new ``pre_frames`` empties the ring."""
+        if pre_frames is not None and int(pre_frames) != self.pre_frames:
+            self._set_ring(pre_frames)
+        if post_ms is not None:
+            self.post_ms = max(float(post_ms), 0.0)
+        if post_frames is not None:
+            self.post_frames = max(int(post_frames), 1)
+        if directory is not None:
+            self.directory = directory
+
+    # -- triggers --------------------------------------------------------
+
+    def add(self, trigger: Trigger) -> Trigger:
+        if any(existing.name == trigger.name for existing in self._triggers):
+            raise ValueError(f'a trigger named {trigger.name!r} already exists')
+        self._triggers = self._triggers + (trigger,)
+        return trigger
+
+    def remove(self, name: str) -> bool:
+        remaining = tuple(trigger for trigger in self._triggers if trigger.name != name)
+        removed = len(remaining) != len(self._triggers)
+        self._triggers = remaining
+        if not remaining:
+            self.finish()
+            self._ring_next = self._ring_count = 0
+        return removed
+
+    def get(self, name: str) -> Optional[Trigger]:
+        for trigger in self._triggers:
+            if trigger.name == name:
+                return trigger
+        return None
+
+    def triggers(self) -> List[Trigger]:
+        return list(self._triggers)
+
+    # -- ingestion path ----------------------------------------------------
+
+    def offer_frames(self, frames: Sequence[Dict[str, Any]]) -> None:
+        triggers = self._triggers
+        if not triggers:
+            return
+        ring = self._ring
+        size = capture_file.RECORD_SIZE
+        slots = self.pre_frames
+        for frame in frames:
+            record = capture_file.pack_frame(frame)
+            ts_us = frame.get('ts_us') or 0
+            channel = frame.get('channel', 0)
+            self._last_ts_us[channel] = ts_us
+            if slots:
+                offset = self._ring_next * size
+                ring[offset : offset + size] = record
+                self._ring_next = (self._ring_next + 1) % slots
+                if self._ring_count < slots:
+                    self._ring_count += 1
+            capture = self._capture
+            if capture is not None:
+                if channel == capture.channel and capture.end_ts_us is not None and ts_us > capture.end_ts_us:
+                    self.finish()
+                else:
+                    capture.post += record
+                    capture.post_frames += 1
+                    capture.frames_left -= 1
+                    if capture.frames_left <= 0:
+                        self.finish()
+            for trigger in triggers:
+                reason = trigger.match_frame(frame)
+                if reason is not None:
+                    self._fire(trigger, reason, channel, ts_us)
+
+    def offer_line(self, text: str, channel: int = 0) -> None:
+        triggers = self._triggers
+        if not triggers:
+            return
+        for trigger in triggers:
+            reason = trigger.match_line(text, channel)
+            if reason is not None:
+                self._fire(trigger, reason, channel, self._last_ts_us.get(channel))
+
+    def poll(self) -> None:
+        """Close a capture whose post window will not fill because the bus went quiet."""
+        capture = self._capture
+        if capture is not None and time.monotonic() - capture.started > self.post_ms / 1000.0 + _IDLE_GRACE_S:
+            self.finish()
+
+    def _fire(self, trigger: Trigger, reason: str, channel: int, ts_us: Optional[int]) -> None:
+        if not trigger.armed:
+            return
+        now = time.monotonic()
+        if trigger.last_fired is not None and now - trigger.last_fired < trigger.holdoff_s:
+            trigger.held_off += 1
+            return
+        trigger.fired += 1
+        trigger.last_fired = now
+        trigger.last_reason = reason
+        if not trigger.rearm:
+            trigger.armed = False
+        if self._capture is not None:
+            self._emit(f'Trigger {trigger.name}: {reason} (capture already running)')
+            return
+        end_ts_us = None if ts_us is None else ts_us + int(self.post_ms * 1000)
+        self._capture = _Capture(trigger.name, reason, channel, end_ts_us, self.post_frames, self._ring_snapshot())
+        self._emit(f'Trigger {trigger.name}: {reason}; capturing')
+
+    def _ring_snapshot(self) -> bytes:
+        size = capture_file.RECORD_SIZE
+        if self._ring_count < self.pre_frames:
+            return bytes(self._ring[: self._ring_count * size])
+        split = self._ring_next * size
+        return bytes(self._ring[split:]) + bytes(self._ring[:split])
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """End the running capture now and save it in the background."""
+        capture = self._capture
+        if capture is None:
+            return None
+        self._capture = None
+        stamp = capture.started_at.strftime('%Y%m%d-%H%M%S')
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', capture.trigger)
+        entry: Dict[str, Any] = {
+            'trigger': capture.trigger,
+            'reason': capture.reason,
+            'started': capture.started_at.isoformat(timespec='seconds'),
+            'path': os.path.join(self.directory, f'trigger-{safe_name}-{stamp}{capture_file.SUFFIX}'),
+            'pre_frames': capture.pre_frames,
+            'post_frames': capture.post_frames,
+            'saved': False,
+            'error': None,
+        }
+        self.captures.append(entry)
+        data = capture_file.header_bytes() + capture.pre + bytes(capture.post)
+        threading.Thread(target=self._write, args=(entry, data), name='trigger-writer', daemon=True).start()
+        return entry
+
+    def _write(self, entry: Dict[str, Any], data: bytes) -> None:
+        path = entry['path']
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            # Two captures in the same second get distinct names
+            base, suffix = os.path.splitext(path)
+            index = 1
+            while os.path.exists(path):
+                path = f'{base}-{index}{suffix}'
+                index += 1
+            with open(path, 'wb') as fh:
+                fh.write(data)
+        except OSError as exc:
+            entry['error'] = str(exc)
+            self._emit(f"Trigger capture for {entry['trigger']} not saved: {exc}")
+            return
+        entry['path'] = path
+        entry['saved'] = True
+        self._emit(
+            f"Trigger capture saved to {path} "
+            f"({entry['pre_frames']} frames before, {entry['post_frames']} after)"
+        )
+
+    def _emit(self, message: str) -> None:
+        notify = self.notify
+        if notify is None:
+            return
+        try:
+            notify(message)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        capture = self._capture
+        return {
+            'pre_frames': self.pre_frames,
+            'post_ms': self.post_ms,
+            'post_frames': self.post_frames,
+            'directory': self.directory,
+            'buffered': self._ring_count,
+            'capturing': None if capture is None else {'trigger': capture.trigger, 'post_frames': capture.post_frames},
+            'triggers': [trigger.describe() for trigger in self._triggers],
+            'captures': list(self.captures),
+        }
+
+
+_ENGINE = TriggerEngine()
+
+
+def engine() -> TriggerEngine:
+    return _ENGINE
+
+
+def set_notifier(fn: Optional[Callable[[str], None]]) -> None:
+    """Where trigger and capture messages go (the monitor log in the dashboard)."""
+    _ENGINE.notify = fn
+
+
+def add_trigger(spec: Dict[str, Any]) -> Trigger:
+    """Arm a trigger built from ``spec`` (see :meth:`Trigger.from_spec`)."""
+    return _ENGINE.add(Trigger.from_spec(spec))
+
+
+def remove_trigger(name: str) -> bool:
+    return _ENGINE.remove(name)
+
+
+def offer_frames(frames: Sequence[Dict[str, Any]]) -> None:
+    _ENGINE.offer_frames(frames)
+
+
+def offer_line(text: str, channel: int = 0) -> None:
+    _ENGINE.offer_line(text, channel)
+
+
+def poll() -> None:
+    if _ENGINE.capturing:
+        _ENGINE.poll()
+
+
+__all__ = [
+    'DLC_CHANGE',
+    'ID',
+    'KINDS',
+    'LOG',
+    'MISSING',
+    'PATTERN',
+    'Trigger',
+    'TriggerEngine',
+    'add_trigger',
+    'engine',
+    'offer_frames',
+    'offer_line',
+    'poll',
+    'remove_trigger',
+    'set_notifier',
+]
@@ -2,15 +2,41 @@
 
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, List
 
+from nicegui import app as ng_app
 from nicegui import run as ng_run
 from nicegui import ui
 
+import metrics_api
+import serial_api
+import stream_api
+import trigger_api
+from capture import recorder, stream, triggers
 from gui import state as st
 from gui.home import build_home
-from jtag.data_processor import process_line
-from usb_serial.serial_handler import get_pending_lines, is_connected, selected_port
+from jtag.data_processor import process_item
+from usb_serial.framing import StreamItem
+from usb_serial.serial_handler import (
+    attach_event_loop,
+    drop_stats,
+    get_pending_lines,
+    is_connected,
+    pending_count,
+    selected_port,
+)
+
+# How long the serial reader may hold items to deliver them in one batch
+_SERIAL_BATCH_LATENCY_S = 0.01
+
+
+def _stream_drops() -> Dict[str, int]:
+    return {'frames': sum(client.dropped for client in stream.clients())}
+
+
+def _recorder_drops() -> Dict[str, int]:
+    active = recorder.active_recorder()
+    return {'frames': active.frames_dropped if active is not None else 0}
 
 
 def init() -> None:
@@ -18,18 +44,43 @@ def init() -> None:
     # Avoid starting a process pool in restricted environments (NiceGUI quirk)
     ng_run.setup = lambda: None  # type: ignore
 
+    def _on_serial_items(items: List[StreamItem]) -> None:
+        # Called on the event loop by the serial reader, already batched
+        for item in items:
+            process_item(item)
+
+    async def _attach_reader() -> None:
+        attach_event_loop(_on_serial_items, latency_s=_SERIAL_BATCH_LATENCY_S)
+
+    ng_app.on_startup(_attach_reader)
+    serial_api.register()
+    stream_api.register()
+    metrics_api.register()
+    trigger_api.register()
+    triggers.set_notifier(st.append_log)
+    recorder.set_notifier(st.append_log)
+    st.register_drop_source('host', drop_stats)
+    st.register_drop_source('stream', _stream_drops)
+    st.register_drop_source('recorder', _recorder_drops)
+
     def _drain_serial(_: float | None = None) -> None:
+        # Replayed captures and pushed status lines still arrive through the queue
         try:
-            lines: List[str] = get_pending_lines(300)
+            items: List[StreamItem] = get_pending_lines(pending_count())
         except Exception as exc:
             st.append_log(f'[Reader] Failed to poll serial: {exc}')
             return
-        if not lines:
+        if not items:
             return
-        for line in lines:
-            process_line(line)
+        for item in items:
+            process_item(item)
+
+    def _render(_: float | None = None) -> None:
+        st.render_tick()
 
     def _refresh_status(_: float | None = None) -> None:
+        triggers.poll()
+        st.refresh_bus_load()
         connected = is_connected()
         port = selected_port() or '—'
         idle = st.seconds_since_last_frame()
@@ -47,4 +98,5 @@ def init() -> None:
         build_home()
         # Attach timers to the page to avoid global UI elements alongside ui.page usage
         ui.timer(0.1, _drain_serial, active=True)
+        st.register_render_timer(ui.timer(st.render_interval(), _render, active=True))
         ui.timer(0.5, _refresh_status, active=True)
@@ -2,33 +2,110 @@
 
 from __future__ import annotations
 
-from typing import Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from nicegui import ui
+from nicegui import events, ui
 
 
-TableUpdater = Callable[[List[Dict[str, str]]], None]
-ChartUpdater = Callable[[List[str], List[int]], None]
+TableUpdater = Callable[[], None]
+TableQuery = Callable[[int, int, Optional[str], bool], Tuple[List[Dict[str, Any]], int]]
+ChartUpdater = Callable[[List[str], List[int], List[float]], None]
+LoadUpdater = Callable[[Dict[str, Any]], None]
+PlotUpdater = Callable[[Dict[str, Any]], None]
+ZoomHandler = Callable[[Optional[float], Optional[float]], None]
 
 
-def make_can_table() -> Tuple[ui.table, TableUpdater]:
+def make_can_table(query: TableQuery) -> Tuple[ui.table, TableUpdater]:
+    """CAN table in Quasar server-side pagination mode.
+
+    Only the requested page is fetched through ``query(page, rows_per_page,
+    sort_by, descending)``; the returned total drives the pager.
+    """
     columns = [
         {'name': 'timestamp', 'label': 'Time (ms)', 'field': 'timestamp', 'align': 'left', 'sortable': True},
+        {'name': 'channel', 'label': 'Ch', 'field': 'channel', 'align': 'right', 'sortable': True},
         {'name': 'id_hex', 'label': 'ID (hex)', 'field': 'id_hex', 'align': 'left', 'sortable': True},
         {'name': 'id_dec', 'label': 'ID (dec)', 'field': 'id_dec', 'align': 'left', 'sortable': True},
         {'name': 'dlc', 'label': 'DLC', 'field': 'dlc', 'align': 'right', 'sortable': True},
         {'name': 'data', 'label': 'Data', 'field': 'data', 'align': 'left'},
         {'name': 'flags', 'label': 'Flags', 'field': 'flags', 'align': 'left'},
+        {'name': 'signals', 'label': 'Signals', 'field': 'signals', 'align': 'left'},
     ]
 
+    pagination: Dict[str, Any] = {
+        'page': 1,
+        'rowsPerPage': 20,
+        'rowsNumber': 0,
+        'sortBy': None,
+        'descending': True,
+    }
+
     table = ui.table(
         columns=columns,
         rows=[],
         row_key='seq',
-        pagination={'rowsPerPage': 20, 'rowsNumber': 0},
-    ).classes('w-full text-sm dark:bg-slate-900 dark:text-gray-100').props('dense flat wrap-cells')
+        pagination=dict(pagination),
+    ).classes('w-full text-sm dark:bg-slate-900 dark:text-gray-100').props(
+        'dense flat wrap-cells :rows-per-page-options="[10, 20, 50, 100]"'
+    )
 
-    def update(rows: List[Dict[str, str]]) -> None:
+    def refresh() -> None:
+        rows, total = query(
+            int(pagination.get('page') or 1),
+            int(pagination.get('rowsPerPage') or 0),
+            pagination.get('sortBy'),
+            bool(pagination.get('descending')),
+        )
+        pagination['rowsNumber'] = total
+        table.rows = rows
+        table.pagination = dict(pagination)
+        table.update()
+
+    def on_request(e: events.GenericEventArguments) -> None:
+        args = e.args if isinstance(e.args, dict) else {}
+        requested = args.get('pagination') or {}
+        for key in ('page', 'rowsPerPage', 'sortBy', 'descending'):
+            if key in requested:
+                pagination[key] = requested[key]
+        refresh()
+
+    table.on('request', on_request, ['pagination'])
+
+    return table, refresh
+
+
+def make_trace_table() -> Tuple[ui.table, Callable[[List[Dict[str, Any]]], None]]:
+    """One row per identifier; payload bytes that changed are highlighted."""
+    columns = [
+        {'name': 'channel', 'label': 'Ch', 'field': 'channel', 'align': 'right'},
+        {'name': 'id_hex', 'label': 'ID', 'field': 'id_hex', 'align': 'left'},
+        {'name': 'flags', 'label': 'Flags', 'field': 'flags', 'align': 'left'},
+        {'name': 'dlc', 'label': 'DLC', 'field': 'dlc', 'align': 'right'},
+        {'name': 'data', 'label': 'Data', 'field': 'bytes', 'align': 'left'},
+        {'name': 'count', 'label': 'Count', 'field': 'count', 'align': 'right'},
+        {'name': 'cycle_ms', 'label': 'Cycle (ms)', 'field': 'cycle_ms', 'align': 'right'},
+        {'name': 'min_ms', 'label': 'Min (ms)', 'field': 'min_ms', 'align': 'right'},
+        {'name': 'max_ms', 'label': 'Max (ms)', 'field': 'max_ms', 'align': 'right'},
+    ]
+
+    table = ui.table(
+        columns=columns,
+        rows=[],
+        row_key='key',
+        pagination=0,
+    ).classes('w-full text-sm dark:bg-slate-900 dark:text-gray-100').props('dense flat virtual-scroll')
+    table.style('max-height: 640px')
+    table.add_slot(
+        'body-cell-data',
+        r"""
+        <q-td :props="props" class="font-mono">
+            <span v-for="(b, i) in props.row.bytes" :key="i"
+                  :class="props.row.changed.includes(i) ? 'text-orange-500 font-bold' : ''">{{ b }}&nbsp;</span>
+        </q-td>
+        """,
+    )
+
+    def update(rows: List[Dict[str, Any]]) -> None:
         table.rows = rows
         table.update()
 
@@ -45,10 +122,10 @@ def make_identifier_chart() -> Tuple[ui.echart, ChartUpdater]:
             'data': [],
             'axisLabel': {'rotate': 45},
         },
-        'yAxis': {
-            'type': 'value',
-            'name': 'Frames',
-        },
+        'yAxis': [
+            {'type': 'value', 'name': 'Frames'},
+            {'type': 'value', 'name': 'Period (ms)', 'splitLine': {'show': False}},
+        ],
         'dataZoom': [
             {'type': 'slider', 'xAxisIndex': 0, 'bottom': 20},
             {'type': 'inside', 'xAxisIndex': 0},
@@ -59,20 +136,123 @@ def make_identifier_chart() -> Tuple[ui.echart, ChartUpdater]:
                 'type': 'bar',
                 'data': [],
                 'itemStyle': {'color': '#2563EB'},
-            }
+            },
+            {
+                'name': 'Mean period (ms)',
+                'type': 'line',
+                'yAxisIndex': 1,
+                'data': [],
+                'itemStyle': {'color': '#F59E0B'},
+            },
         ],
     }
 
     chart = ui.echart(options).classes('w-full dark:bg-slate-900 rounded-md').style('height: 320px')
 
-    def update(labels: List[str], counts: List[int]) -> None:
+    def update(labels: List[str], counts: List[int], periods_ms: List[float]) -> None:
         chart.options['xAxis']['data'] = labels
         chart.options['series'][0]['data'] = counts
+        chart.options['series'][1]['data'] = periods_ms
         chart.update()
 
     return chart, update
 
 
+def make_load_gauge() -> Tuple[ui.echart, LoadUpdater]:
+    options: Dict[str, object] = {
+        'title': {'text': 'Bus load', 'left': 'center', 'top': 10},
+        'series': [
+            {
+                'type': 'gauge',
+                'min': 0,
+                'max': 100,
+                'progress': {'show': True},
+                'detail': {'formatter': '{value}%', 'fontSize': 20},
+                'data': [{'value': 0, 'name': '1 s'}],
+            }
+        ],
+    }
+
+    with ui.column().classes('w-full gap-1'):
+        chart = ui.echart(options).classes('w-full dark:bg-slate-900 rounded-md').style('height: 240px')
+        rates = ui.label('').classes('text-xs text-slate-500 dark:text-slate-400 self-center')
+
+    def update(summary: Dict[str, Any]) -> None:
+        load = summary['bus_load']
+        fps = summary['frames_per_s']
+        chart.options['series'][0]['data'][0]['value'] = round(load[1] * 100.0, 1)
+        chart.update()
+        rates.set_text(
+            f"{fps[1]:,.0f} / {fps[10]:,.0f} / {fps[60]:,.0f} frames/s (1 s / 10 s / 60 s)  ·  "
+            f"load 10 s {load[10] * 100.0:.1f}%, 60 s {load[60] * 100.0:.1f}%  ·  "
+            f"{summary['bitrate'] // 1000} kbit/s"
+        )
+
+    return chart, update
+
+
+def make_signal_chart(on_zoom: ZoomHandler) -> Tuple[ui.echart, PlotUpdater]:
+    """Signal time-series chart fed with server-side downsampled points.
+
+    The x axis always spans the full recorded range so dataZoom percentages map
+    to absolute times; ``on_zoom(start_ms, end_ms)`` asks the server for a
+    finer reduction of the visible window (``None, None`` for the full range).
+    """
+    options: Dict[str, Any] = {
+        'title': {'text': 'Signals', 'left': 'center', 'top': 10},
+        'tooltip': {'trigger': 'axis'},
+        'legend': {'top': 36},
+        'grid': {'left': 60, 'right': 20, 'top': 70, 'bottom': 70},
+        'xAxis': {'type': 'value', 'name': 'ms', 'min': 0, 'max': 1},
+        'yAxis': {'type': 'value', 'scale': True},
+        'dataZoom': [
+            {'type': 'slider', 'xAxisIndex': 0, 'bottom': 20, 'filterMode': 'none', 'start': 0, 'end': 100},
+            {'type': 'inside', 'xAxisIndex': 0, 'filterMode': 'none', 'start': 0, 'end': 100},
+        ],
+        'animation': False,
+        'series': [],
+    }
+    chart = ui.echart(options).classes('w-full dark:bg-slate-900 rounded-md').style('height: 360px')
+    extent: Dict[str, float] = {'min': 0.0, 'max': 1.0}
+
+    def update(data: Dict[str, Any]) -> None:
+        range_ms = data.get('range_ms')
+        if range_ms:
+            extent['min'], extent['max'] = range_ms[0], max(range_ms[1], range_ms[0] + 1e-3)
+        chart.options['xAxis']['min'] = extent['min']
+        chart.options['xAxis']['max'] = extent['max']
+        start, end = 0.0, 100.0
+        view = data.get('view_ms')
+        span = extent['max'] - extent['min']
+        if view and span > 0:
+            start = min(max((view[0] - extent['min']) / span * 100.0, 0.0), 100.0)
+            end = min(max((view[1] - extent['min']) / span * 100.0, 0.0), 100.0)
+        for zoom in chart.options['dataZoom']:
+            zoom['start'], zoom['end'] = start, end
+        chart.options['series'] = [
+            {'name': item['name'], 'type': 'line', 'showSymbol': False, 'sampling': None, 'data': item['points']}
+            for item in data.get('series', [])
+        ]
+        chart.update()
+
+    def handle_zoom(e: events.GenericEventArguments) -> None:
+        args = e.args if isinstance(e.args, dict) else {}
+        if args.get('batch'):
+            args = args['batch'][0]
+        start, end = args.get('start'), args.get('end')
+        if start is None or end is None:
+            return
+        if start <= 0 and end >= 100:
+            on_zoom(None, None)
+            return
+        span = extent['max'] - extent['min']
+        on_zoom(extent['min'] + span * start / 100.0, extent['min'] + span * end / 100.0)
+
+    chart.on('chart:datazoom', handle_zoom)
+
+    return chart, update
+
+
 def make_text_console(title: str) -> Tuple[ui.log, Callable[[str], None], Callable[[], None]]:
     with ui.card().classes('w-full dark:bg-slate-900 dark:text-gray-100') as card:
         ui.label(title).classes('text-md font-medium')
@@ -93,4 +273,4 @@ def make_text_console(title: str) -> Tuple[ui.log, Callable[[str], None], Callab
     return log, write, clear
 
 
-__all__ = ['make_can_table', 'make_identifier_chart', 'make_text_console']
+__all__ = ['make_can_table', 'make_identifier_chart', 'make_text_console', 'make_trace_table']
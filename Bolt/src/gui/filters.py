@@ -0,0 +1,518 @@
+"""Filter expressions for the CAN table, compiled once and run over the store.
+
+Syntax (case-insensitive)::
+
+    id == 0x123                      id != 0x7DF          id >= 0x700
+    id in [0x100, 0x200..0x2FF]      id in 0x600..0x6FF
+    ext      std      rtr            dlc < 8
+    data[2] & 0xF0 == 0x30           data[0] in [1, 2, 5..9]
+    time >= 1500 and time < 3000     (ms since the first frame, as the table shows it)
+    ts_us > 123456789                (device timestamp)
+    channel == 1     ch in [0, 2]    (sniffer the frame came from)
+    not (...)   a and b   a or b     (also !, &&, ||)
+
+Ranges written ``a..b`` are inclusive. Text that does not parse as an
+expression falls back to the original case-insensitive substring search.
+
+Compiled filters scan a :class:`~gui.frame_store.FrameStore` from a given
+sequence number on. Conditions on flags, DLC and payload bytes are evaluated
+column-wise with ``bytes.translate`` lookup tables; conditions on IDs use the
+store's per-identifier index so non-matching IDs are never visited. Anything
+else is evaluated row by row.
+"""
+
+from __future__ import annotations
+
+import operator
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from gui.frame_store import FLAG_EXT, FLAG_RTR, FrameStore
+
+
+class FilterSyntaxError(ValueError):
+    """Raised when filter text is not a valid expression."""
+
+
+_TOKEN_RE = re.compile(
+    r'\s*(?:(?P<num>0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?)|(?P<name>[A-Za-z_]+)'
+    r'|(?P<op>\.\.|==|!=|<=|>=|&&|\|\||[<>&!()\[\],]))'
+)
+
+_COMPARE_OPS: Dict[str, Callable[[float, float], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# Per-row predicate arguments: ts_us, identifier, flags, dlc, payload, base_ts_us, channel,
+# channel clock offset
+RowPredicate = Callable[[int, int, int, int, bytes, int, int, int], bool]
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise FilterSyntaxError(f'unexpected input at {pos}: {text[pos:pos + 10]!r}')
+        pos = match.end()
+        kind = match.lastgroup or ''
+        value = match.group(kind)
+        if kind == 'name':
+            value = value.lower()
+        tokens.append((kind, value))
+    return tokens
+
+
+def _number(text: str) -> float:
+    if text.lower().startswith('0x'):
+        return int(text, 16)
+    if '.' in text:
+        return float(text)
+    return int(text)
+
+
+# --------------------------------------------------------------------------
+# Expression tree
+# --------------------------------------------------------------------------
+
+
+class _Columns:
+    """Lazily fetched single-byte columns of a store, from ``start_seq`` on."""
+
+    def __init__(self, store: FrameStore, start_seq: int) -> None:
+        self.store = store
+        self.start_seq = start_seq
+        self.length = store.last_seq - start_seq + 1
+        self._cache: Dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes:
+        column = self._cache.get(key)
+        if column is None:
+            if key.startswith('data'):
+                column = self.store.payload_byte(int(key[4:]), self.start_seq)
+            else:
+                column = self.store.column_bytes(key, self.start_seq)
+            self._cache[key] = column
+        return column
+
+    def mask(self, key: str, test: Callable[[int], bool]) -> int:
+        """Bytewise 0/1 mask, packed into an int so masks combine with & | ^."""
+        table = bytes(1 if test(value) else 0 for value in range(256))
+        return int.from_bytes(self.get(key).translate(table), 'little')
+
+    @property
+    def ones(self) -> int:
+        return int.from_bytes(b'\x01' * self.length, 'little')
+
+    def seqs(self, mask: int) -> List[int]:
+        packed = mask.to_bytes(self.length, 'little')
+        out: List[int] = []
+        pos = packed.find(1)
+        while pos >= 0:
+            out.append(self.start_seq + pos)
+            pos = packed.find(1, pos + 1)
+        return out
+
+
+class _Node:
+    id_only = False
+
+    def match(
+        self,
+        ts_us: int,
+        identifier: int,
+        flags: int,
+        dlc: int,
+        payload: bytes,
+        base_ts: int,
+        channel: int = 0,
+        offset_us: int = 0,
+    ) -> bool:
+        raise NotImplementedError
+
+    def vector(self, cols: _Columns) -> Optional[Tuple[int, bool]]:
+        """Column-wise mask and whether it is exact (False means superset)."""
+        return None
+
+    def ids(self, present: Sequence[int]) -> Optional[Set[int]]:
+        """IDs that can possibly match, or None when IDs are unconstrained."""
+        return None
+
+
+class _Flag(_Node):
+    def __init__(self, bit: int, expected: bool) -> None:
+        self.bit = bit
+        self.expected = expected
+
+    def match(self, ts_us, identifier, flags, dlc, payload, base_ts, channel=0, offset_us=0):
+        return bool(flags & self.bit) == self.expected
+
+    def vector(self, cols):
+        return cols.mask('flags', lambda v: bool(v & self.bit) == self.expected), True
+
+
+class _Field(_Node):
+    """Comparison of one field against a set of numeric ranges."""
+
+    def __init__(self, field: str, test: Callable[[float], bool], index: int = 0, mask: int = 0xFF) -> None:
+        self.field = field
+        self.test = test
+        self.index = index
+        self.bit_mask = mask
+        self.id_only = field == 'id'
+
+    def match(self, ts_us, identifier, flags, dlc, payload, base_ts, channel=0, offset_us=0):
+        field = self.field
+        if field == 'id':
+            return self.test(identifier)
+        if field == 'dlc':
+            return self.test(dlc)
+        if field == 'channel':
+            return self.test(channel)
+        if field == 'data':
+            if self.index >= len(payload):
+                return False
+            return self.test(payload[self.index] & self.bit_mask)
+        if field == 'time':
+            if not base_ts:
+                return self.test(0.0)
+            # Aligned on the channel's clock offset, like the table's time column
+            return self.test((ts_us + offset_us - base_ts) / 1000.0)
+        return self.test(ts_us)
+
+    def vector(self, cols):
+        if self.field in ('dlc', 'channel'):
+            key = 'dlc' if self.field == 'dlc' else 'channels'
+            return cols.mask(key, self.test), True
+        if self.field == 'data':
+            index, bit_mask = self.index, self.bit_mask
+            present = cols.mask('dlc', lambda v: v > index)
+            return present & cols.mask(f'data{index}', lambda v: self.test(v & bit_mask)), True
+        return None
+
+    def ids(self, present):
+        if self.field != 'id':
+            return None
+        return {identifier for identifier in present if self.test(identifier)}
+
+
+class _Not(_Node):
+    def __init__(self, child: _Node) -> None:
+        self.child = child
+        self.id_only = child.id_only
+
+    def match(self, *args):
+        return not self.child.match(*args)
+
+    def vector(self, cols):
+        result = self.child.vector(cols)
+        if result is None or not result[1]:
+            return None
+        return result[0] ^ cols.ones, True
+
+    def ids(self, present):
+        if not self.child.id_only:
+            return None
+        matched = self.child.ids(present) or set()
+        return set(present) - matched
+
+
+class _And(_Node):
+    def __init__(self, children: List[_Node]) -> None:
+        self.children = children
+        self.id_only = all(child.id_only for child in children)
+
+    def match(self, *args):
+        return all(child.match(*args) for child in self.children)
+
+    def vector(self, cols):
+        mask: Optional[int] = None
+        exact = True
+        for child in self.children:
+            result = child.vector(cols)
+            if result is None:
+                exact = False
+                continue
+            mask = result[0] if mask is None else mask & result[0]
+            exact = exact and result[1]
+        if mask is None:
+            return None
+        return mask, exact
+
+    def ids(self, present):
+        out: Optional[Set[int]] = None
+        for child in self.children:
+            child_ids = child.ids(present)
+            if child_ids is None:
+                continue
+            out = child_ids if out is None else out & child_ids
+        return out
+
+
+class _Or(_Node):
+    def __init__(self, children: List[_Node]) -> None:
+        self.children = children
+        self.id_only = all(child.id_only for child in children)
+
+    def match(self, *args):
+        return any(child.match(*args) for child in self.children)
+
+    def vector(self, cols):
+        mask = 0
+        exact = True
+        for child in self.children:
+            result = child.vector(cols)
+            if result is None:
+                return None
+            mask |= result[0]
+            exact = exact and result[1]
+        return mask, exact
+
+    def ids(self, present):
+        out: Set[int] = set()
+        for child in self.children:
+            child_ids = child.ids(present)
+            if child_ids is None:
+                return None
+            out |= child_ids
+        return out
+
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, str]]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Tuple[str, str]:
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return ('end', '')
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        kind, got = self.take()
+        if got != value:
+            raise FilterSyntaxError(f'expected {value!r}, got {got or "end of input"!r}')
+
+    def parse(self) -> _Node:
+        node = self.parse_or()
+        if self.peek()[0] != 'end':
+            raise FilterSyntaxError(f'unexpected {self.peek()[1]!r}')
+        return node
+
+    def parse_or(self) -> _Node:
+        children = [self.parse_and()]
+        while self.peek()[1] in ('or', '||'):
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else _Or(children)
+
+    def parse_and(self) -> _Node:
+        children = [self.parse_unary()]
+        while self.peek()[1] in ('and', '&&'):
+            self.take()
+            children.append(self.parse_unary())
+        return children[0] if len(children) == 1 else _And(children)
+
+    def parse_unary(self) -> _Node:
+        if self.peek()[1] in ('not', '!'):
+            self.take()
+            return _Not(self.parse_unary())
+        return self.parse_primary()
+
+    def parse_primary(self) -> _Node:
+        kind, value = self.take()
+        if value == '(':
+            node = self.parse_or()
+            self.expect(')')
+            return node
+        if value == 'ext':
+            return _Flag(FLAG_EXT, True)
+        if value == 'std':
+            return _Flag(FLAG_EXT, False)
+        if value == 'rtr':
+            return _Flag(FLAG_RTR, True)
+        if value in ('id', 'dlc', 'time', 'ts_us'):
+            return _Field(value, self.parse_test())
+        if value in ('channel', 'ch'):
+            return _Field('channel', self.parse_test())
+        if value == 'data':
+            self.expect('[')
+            index = self.parse_int()
+            self.expect(']')
+            if not 0 <= index < 8:
+                raise FilterSyntaxError('data index must be 0..7')
+            bit_mask = 0xFF
+            if self.peek()[1] == '&':
+                self.take()
+                bit_mask = self.parse_int() & 0xFF
+            return _Field('data', self.parse_test(), index=index, mask=bit_mask)
+        raise FilterSyntaxError(f'unexpected {value or "end of input"!r}')
+
+    def parse_int(self) -> int:
+        kind, value = self.take()
+        if kind != 'num':
+            raise FilterSyntaxError(f'expected a number, got {value or "end of input"!r}')
+        return int(_number(value))
+
+    def parse_number(self) -> float:
+        kind, value = self.take()
+        if kind != 'num':
+            raise FilterSyntaxError(f'expected a number, got {value or "end of input"!r}')
+        return _number(value)
+
+    def parse_test(self) -> Callable[[float], bool]:
+        kind, value = self.take()
+        if value in _COMPARE_OPS:
+            op = _COMPARE_OPS[value]
+            rhs = self.parse_number()
+            return lambda v: op(v, rhs)
+        if value != 'in':
+            raise FilterSyntaxError(f'expected a comparison, got {value or "end of input"!r}')
+        ranges: List[Tuple[float, float]] = []
+        if self.peek()[1] == '[':
+            self.take()
+            ranges.append(self.parse_range())
+            while self.peek()[1] == ',':
+                self.take()
+                ranges.append(self.parse_range())
+            self.expect(']')
+        else:
+            ranges.append(self.parse_range())
+        singles = {lo for lo, hi in ranges if lo == hi}
+        spans = [(lo, hi) for lo, hi in ranges if lo != hi]
+        if not spans:
+            return lambda v: v in singles
+        return lambda v: v in singles or any(lo <= v <= hi for lo, hi in spans)
+
+    def parse_range(self) -> Tuple[float, float]:
+        low = self.parse_number()
+        if self.peek()[1] == '..':
+            self.take()
+            high = self.parse_number()
+            return (min(low, high), max(low, high))
+        return (low, low)
+
+
+# --------------------------------------------------------------------------
+# Public filters
+# --------------------------------------------------------------------------
+
+
+class ExpressionFilter:
+    """A parsed filter expression."""
+
+    def __init__(self, text: str, root: _Node) -> None:
+        self.text = text
+        self.root = root
+
+    def match(
+        self, store: FrameStore, seq: int, base_ts_us: int = 0, offsets: Optional[Dict[int, int]] = None
+    ) -> bool:
+        _, ts_us, identifier, flags, dlc, payload = store.row(seq)
+        channel = store.channel(seq)
+        offset_us = offsets.get(channel, 0) if offsets else 0
+        return self.root.match(ts_us, identifier, flags, dlc, payload, base_ts_us, channel, offset_us)
+
+    def scan(
+        self, store: FrameStore, start_seq: int, base_ts_us: int = 0, offsets: Optional[Dict[int, int]] = None
+    ) -> List[int]:
+        """Sorted matching sequence numbers from ``start_seq`` to the newest frame.
+
+        ``offsets`` maps channels to the clock offset added to their timestamps
+        for ``time`` conditions (see ``gui.state``).
+        """
+        start_seq = max(start_seq, store.first_seq)
+        if start_seq > store.last_seq:
+            return []
+
+        ids = self.root.ids(store.present_ids())
+        if ids is not None:
+            candidates: Iterable[int] = store.seqs_for_ids(ids, start_seq)
+            if self.root.id_only:
+                return list(candidates)
+        else:
+            cols = _Columns(store, start_seq)
+            vector = self.root.vector(cols)
+            if vector is not None:
+                mask, exact = vector
+                if exact:
+                    return cols.seqs(mask)
+                candidates = cols.seqs(mask)
+            else:
+                candidates = range(start_seq, store.last_seq + 1)
+        return [seq for seq in candidates if self.match(store, seq, base_ts_us, offsets)]
+
+
+class TextFilter:
+    """Case-insensitive substring search (the original filter behaviour)."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.token = text.lower()
+
+    def match(
+        self, store: FrameStore, seq: int, base_ts_us: int = 0, offsets: Optional[Dict[int, int]] = None
+    ) -> bool:
+        _, _, identifier, flags, _, payload = store.row(seq)
+        width = 8 if flags & FLAG_EXT else 3
+        labels = []
+        if flags & FLAG_EXT:
+            labels.append('ext')
+        if flags & FLAG_RTR:
+            labels.append('rtr')
+        haystack = [
+            f"0x{identifier:0{width}x}",
+            str(identifier),
+            payload.hex(' '),
+            ', '.join(labels) if labels else '—',
+            store.raw_text(seq).lower(),
+        ]
+        token = self.token
+        return any(token in fragment for fragment in haystack)
+
+    def scan(
+        self, store: FrameStore, start_seq: int, base_ts_us: int = 0, offsets: Optional[Dict[int, int]] = None
+    ) -> List[int]:
+        start_seq = max(start_seq, store.first_seq)
+        return [
+            seq
+            for seq in range(start_seq, store.last_seq + 1)
+            if self.match(store, seq, base_ts_us)
+        ]
+
+
+def parse_filter(text: str) -> ExpressionFilter:
+    """Parse an expression; raises :class:`FilterSyntaxError` if invalid."""
+    return ExpressionFilter(text, _Parser(_tokenize(text)).parse())
+
+
+def compile_filter(text: str) -> Optional[ExpressionFilter | TextFilter]:
+    """Compile filter text, falling back to substring search. Empty -> None."""
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return parse_filter(text)
+    except FilterSyntaxError:
+        return TextFilter(text)
+
+
+__all__ = [
+    'ExpressionFilter',
+    'FilterSyntaxError',
+    'TextFilter',
+    'compile_filter',
+    'parse_filter',
+]
@@ -0,0 +1,374 @@
+"""Fixed-capacity columnar ring buffer for received CAN frames."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+FLAG_EXT = 0x01
+FLAG_RTR = 0x02
+
+# (seq, ts_us, identifier, flags, dlc, payload)
+FrameRow = Tuple[int, int, int, int, int, bytes]
+
+# Evicted index entries are compacted once this many pile up for one ID
+_INDEX_COMPACT_MIN = 4096
+
+
+class FrameStore:
+    """Ring buffer holding frames as parallel columns instead of objects.
+
+    Columns are ``array`` instances (``ts_us``, ``ids``, ``flags``, ``dlc``)
+    plus one ``bytearray`` holding 8 payload bytes per slot, so a frame costs
+    22 bytes instead of a dataclass with a list of ints. Columns grow on demand
+    until ``capacity`` is reached and are then overwritten in place.
+
+    Frames are addressed by sequence number. Sequence numbers are contiguous
+    (1, 2, 3, ...) so they are derived from the ring position rather than
+    stored: the live window is ``first_seq .. last_seq``.
+
+    A per-identifier index maps each ID to the sorted sequence numbers it
+    occupies, so ID-only queries never touch frames of other IDs. A second
+    index does the same per channel (the sniffer a frame came from), which is
+    what the time-merged multi-channel view walks.
+    """
+
+    def __init__(self, capacity: int, keep_raw: bool = False) -> None:
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+        self.capacity = int(capacity)
+        self.keep_raw = keep_raw
+        self.clear()
+
+    def clear(self) -> None:
+        self.ts_us = array('Q')
+        self.ids = array('I')
+        self.flags = array('B')
+        self.dlc = array('B')
+        self.channels = array('B')
+        self.payload = bytearray()
+        self.raw: Optional[List[str]] = [] if self.keep_raw else None
+        # identifier -> sequence numbers; entries before the offset are evicted
+        self._index: Dict[int, array] = {}
+        self._index_offset: Dict[int, int] = {}
+        # channel -> sequence numbers, kept the same way
+        self._channel_index: Dict[int, array] = {}
+        self._channel_offset: Dict[int, int] = {}
+        # DLC -> sequence numbers (sorting the table by DLC)
+        self._dlc_index: Dict[int, array] = {}
+        self._dlc_offset: Dict[int, int] = {}
+        # Sequence number of the next frame and physical slot it goes into
+        self._next_seq = 1
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def first_seq(self) -> int:
+        return self._next_seq - len(self.ids)
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def total(self) -> int:
+        """Frames appended since the last clear, including overwritten ones."""
+        return self._next_seq - 1
+
+    def append(
+        self,
+        ts_us: int,
+        identifier: int,
+        flags: int,
+        dlc: int,
+        data: bytes,
+        raw: str = '',
+        channel: int = 0,
+    ) -> int:
+        """Store one frame and return its sequence number. O(1)."""
+        payload = data if len(data) == 8 and isinstance(data, bytes) else bytes(data[:8]).ljust(8, b'\x00')
+        if len(self.ids) < self.capacity:
+            self.ts_us.append(ts_us)
+            self.ids.append(identifier)
+            self.flags.append(flags)
+            self.dlc.append(dlc)
+            self.channels.append(channel)
+            self.payload += payload
+            if self.raw is not None:
+                self.raw.append(raw)
+        else:
+            slot = self._head
+            _index_evict(self._index, self._index_offset, self.ids[slot])
+            _index_evict(self._channel_index, self._channel_offset, self.channels[slot])
+            _index_evict(self._dlc_index, self._dlc_offset, self.dlc[slot])
+            self.ts_us[slot] = ts_us
+            self.ids[slot] = identifier
+            self.flags[slot] = flags
+            self.dlc[slot] = dlc
+            self.channels[slot] = channel
+            self.payload[slot * 8 : slot * 8 + 8] = payload
+            if self.raw is not None:
+                self.raw[slot] = raw
+            self._head = (slot + 1) % self.capacity
+        seq = self._next_seq
+        self._next_seq += 1
+        seqs = self._index.get(identifier)
+        if seqs is None:
+            seqs = self._index[identifier] = array('Q')
+            self._index_offset[identifier] = 0
+        seqs.append(seq)
+        seqs = self._channel_index.get(channel)
+        if seqs is None:
+            seqs = self._channel_index[channel] = array('Q')
+            self._channel_offset[channel] = 0
+        seqs.append(seq)
+        seqs = self._dlc_index.get(dlc)
+        if seqs is None:
+            seqs = self._dlc_index[dlc] = array('Q')
+            self._dlc_offset[dlc] = 0
+        seqs.append(seq)
+        return seq
+
+    def present_ids(self) -> List[int]:
+        """Identifiers with at least one frame still in the store."""
+        return list(self._index)
+
+    def id_count(self, identifier: int) -> int:
+        seqs = self._index.get(identifier)
+        if seqs is None:
+            return 0
+        return len(seqs) - self._index_offset[identifier]
+
+    def id_seqs(self, identifier: int, start_seq: Optional[int] = None) -> array:
+        """Sorted live sequence numbers of one identifier (a copy)."""
+        seqs = self._index.get(identifier)
+        if seqs is None:
+            return array('Q')
+        offset = self._index_offset[identifier]
+        if start_seq is not None:
+            offset = max(offset, bisect_left(seqs, start_seq, offset))
+        return seqs[offset:]
+
+    def present_channels(self) -> List[int]:
+        """Channels with at least one frame still in the store, ascending."""
+        return sorted(self._channel_index)
+
+    def channel_count(self, channel: int) -> int:
+        seqs = self._channel_index.get(channel)
+        if seqs is None:
+            return 0
+        return len(seqs) - self._channel_offset[channel]
+
+    def channel_seqs(self, channel: int, start_seq: Optional[int] = None) -> array:
+        """Sorted live sequence numbers of one channel (a copy)."""
+        seqs = self._channel_index.get(channel)
+        if seqs is None:
+            return array('Q')
+        offset = self._channel_offset[channel]
+        if start_seq is not None:
+            offset = max(offset, bisect_left(seqs, start_seq, offset))
+        return seqs[offset:]
+
+    def index_groups(self, column: str) -> Dict[int, Tuple[array, int]]:
+        """Live index of ``ids``, ``channels`` or ``dlc``: key -> (seqs, first live offset).
+
+        The arrays are the index itself, not copies; read them before the
+        next append.
+        """
+        if column == 'ids':
+            index, offsets = self._index, self._index_offset
+        elif column == 'channels':
+            index, offsets = self._channel_index, self._channel_offset
+        elif column == 'dlc':
+            index, offsets = self._dlc_index, self._dlc_offset
+        else:
+            raise ValueError(f'no index for column {column!r}')
+        return {key: (seqs, offsets[key]) for key, seqs in index.items()}
+
+    def channel(self, seq: int) -> int:
+        return self.channels[self.slot(seq)]
+
+    def seqs_for_ids(self, identifiers: Iterable[int], start_seq: Optional[int] = None) -> List[int]:
+        """Sorted sequence numbers of all frames carrying one of ``identifiers``."""
+        merged: List[int] = []
+        for identifier in identifiers:
+            merged.extend(self.id_seqs(identifier, start_seq))
+        merged.sort()
+        return merged
+
+    def slot(self, seq: int) -> int:
+        """Physical index of a live sequence number."""
+        offset = seq - self.first_seq
+        if offset < 0 or offset >= len(self.ids):
+            raise IndexError(f'sequence {seq} is not in the store')
+        if len(self.ids) < self.capacity:
+            return offset
+        return (self._head + offset) % self.capacity
+
+    def contains(self, seq: int) -> bool:
+        return self.first_seq <= seq <= self.last_seq
+
+    def row(self, seq: int) -> FrameRow:
+        slot = self.slot(seq)
+        dlc = self.dlc[slot]
+        return (
+            seq,
+            self.ts_us[slot],
+            self.ids[slot],
+            self.flags[slot],
+            dlc,
+            bytes(self.payload[slot * 8 : slot * 8 + min(dlc, 8)]),
+        )
+
+    def raw_text(self, seq: int) -> str:
+        if self.raw is None:
+            return ''
+        return self.raw[self.slot(seq)]
+
+    def seqs(self, reverse: bool = False) -> range:
+        if reverse:
+            return range(self.last_seq, self.first_seq - 1, -1)
+        return range(self.first_seq, self.last_seq + 1)
+
+    def rows(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[FrameRow]:
+        start = self.first_seq if start is None else max(start, self.first_seq)
+        stop = self.last_seq + 1 if stop is None else min(stop, self.last_seq + 1)
+        for seq in range(start, stop):
+            yield self.row(seq)
+
+    def _segments(self, start_seq: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Physical (start, stop) slot ranges from ``start_seq`` on, in logical order."""
+        size = len(self.ids)
+        skip = 0 if start_seq is None else min(max(start_seq - self.first_seq, 0), size)
+        if size < self.capacity:
+            return [(skip, size)]
+        first = self._head + skip
+        if first >= size:
+            return [(first - size, self._head)]
+        if self._head == 0:
+            return [(first, size)]
+        return [(first, size), (0, self._head)]
+
+    def column(self, name: str, start_seq: Optional[int] = None) -> array:
+        """Copy of a column (``ts_us``, ``ids``, ``flags``, ``dlc``, ``channels``) oldest first."""
+        source: array = getattr(self, name)
+        segments = self._segments(start_seq)
+        start, stop = segments[0]
+        out = source[start:stop]
+        for start, stop in segments[1:]:
+            out.extend(source[start:stop])
+        return out
+
+    def column_bytes(self, name: str, start_seq: Optional[int] = None) -> bytes:
+        """Single-byte column (``flags``/``dlc``/``channels``) as bytes, oldest first."""
+        return self.column(name, start_seq).tobytes()
+
+    def payload_byte(self, index: int, start_seq: Optional[int] = None) -> bytes:
+        """Byte ``index`` of every payload, oldest first, via a strided slice."""
+        if not 0 <= index < 8:
+            raise IndexError('payload byte index must be 0..7')
+        out = bytearray()
+        for start, stop in self._segments(start_seq):
+            out += self.payload[start * 8 + index : stop * 8 : 8]
+        return bytes(out)
+
+    def snapshot(self) -> 'StoreSnapshot':
+        """Copy of the live frames in logical order, safe to read from another thread."""
+        payload = bytearray()
+        for start, stop in self._segments():
+            payload += self.payload[start * 8 : stop * 8]
+        return StoreSnapshot(
+            self.first_seq,
+            self.column('ts_us'),
+            self.column('ids'),
+            self.column('flags'),
+            self.column('dlc'),
+            self.column('channels'),
+            bytes(payload),
+        )
+
+    def payloads(self, seqs: Iterable[int]) -> bytes:
+        """Full 8-byte payload slots of ``seqs`` concatenated (zero padded past the DLC)."""
+        payload = self.payload
+        return b''.join([payload[slot * 8 : slot * 8 + 8] for slot in map(self.slot, seqs)])
+
+
+class StoreSnapshot:
+    """Frozen copy of a :class:`FrameStore`'s columns, oldest frame first."""
+
+    __slots__ = ('first_seq', 'ts_us', 'ids', 'flags', 'dlc', 'channels', 'payload')
+
+    def __init__(
+        self,
+        first_seq: int,
+        ts_us: array,
+        ids: array,
+        flags: array,
+        dlc: array,
+        channels: array,
+        payload: bytes,
+    ) -> None:
+        self.first_seq = first_seq
+        self.ts_us = ts_us
+        self.ids = ids
+        self.flags = flags
+        self.dlc = dlc
+        self.channels = channels
+        self.payload = payload
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def sorted_page(groups: Dict[int, Tuple[array, int]], start: int, stop: int, descending: bool) -> List[int]:
+    """Entries ``start:stop`` ordered by (key, seq), from per-key sorted sequences.
+
+    Whole groups before the page are skipped by their length, so the cost
+    depends on the number of keys and the page size, not on the history.
+    """
+    out: List[int] = []
+    skip = start
+    need = stop - start
+    for key in sorted(groups, reverse=descending):
+        if need <= 0:
+            break
+        seqs, offset = groups[key]
+        count = len(seqs) - offset
+        if skip >= count:
+            skip -= count
+            continue
+        if descending:
+            hi = len(seqs) - skip
+            lo = max(hi - need, offset)
+            chunk = seqs[lo:hi].tolist()
+            chunk.reverse()
+        else:
+            lo = offset + skip
+            chunk = seqs[lo : lo + need].tolist()
+        out.extend(chunk)
+        need -= len(chunk)
+        skip = 0
+    return out
+
+
+def _index_evict(index: Dict[int, array], offsets: Dict[int, int], key: int) -> None:
+    """Forget the oldest index entry of a key whose slot is overwritten."""
+    offset = offsets.get(key)
+    if offset is None:
+        return
+    seqs = index[key]
+    offset += 1
+    if offset >= len(seqs):
+        del index[key]
+        del offsets[key]
+        return
+    if offset >= _INDEX_COMPACT_MIN and offset * 2 >= len(seqs):
+        del seqs[:offset]
+        offset = 0
+    offsets[key] = offset
+
+
+__all__ = ['FLAG_EXT', 'FLAG_RTR', 'FrameRow', 'FrameStore', 'StoreSnapshot', 'sorted_page']
@@ -2,12 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+from datetime import datetime
 from typing import Any, Dict, List
 
-from nicegui import events, ui
+from nicegui import events, run, ui
 
+from analysis import metrics
+from capture import formats, recorder, replay, triggers
+from gui import hub, profiler
 from gui import state as st
-from gui.components import make_can_table, make_identifier_chart, make_text_console
+from gui.components import (
+    make_can_table,
+    make_identifier_chart,
+    make_load_gauge,
+    make_signal_chart,
+    make_text_console,
+    make_trace_table,
+)
 from usb_serial import serial_handler
 
 
@@ -29,8 +42,11 @@ def build_home() -> None:
 
     with ui.column().classes('w-full max-w-full gap-4 px-4 pb-6 dark:bg-slate-950 dark:text-gray-100').style('margin-top: 12px;'):
         _build_connection_card()
+        _build_replay_card()
+        _build_trigger_card()
         _build_filters_and_actions()
         _build_data_section()
+        _build_signal_plot_card()
         _build_log_section()
 
 
@@ -81,6 +97,17 @@ def _build_connection_card() -> None:
                 if ok:
                     st.set_connection_state(False, msg)
 
+            async def add_channel(_: Any = None) -> None:
+                port = port_select.value
+                baud = int(baud_input.value or 0)
+                if not port:
+                    ui.notify('Select a port to add', color='negative')
+                    return
+                name = (name_input.value or '').strip() or None
+                ok, msg = serial_handler.add_channel(port, baud if baud > 0 else 921600, name)
+                ui.notify(msg, color='positive' if ok else 'negative')
+                st.append_log(msg)
+
             ui.button('Refresh', on_click=refresh_ports).props('outline')
             ui.button('Connect', on_click=connect).props('color=primary')
             ui.button('Disconnect', on_click=disconnect).props('color=secondary outline')
@@ -88,28 +115,460 @@ def _build_connection_card() -> None:
             # Populate ports on load
             ui.timer(0.1, refresh_ports, once=True)
 
+        with ui.row().classes('w-full items-end gap-3 flex-wrap'):
+            name_input = ui.input('Channel name', placeholder='e.g. powertrain').classes('min-w-[180px]')
+            ui.button('Add channel', on_click=add_channel).props('outline')
+            remove_select = ui.select(options={}, label='Channel').classes('min-w-[160px]')
+
+            def remove_channel() -> None:
+                if remove_select.value is None:
+                    return
+                ok, msg = serial_handler.remove_channel(int(remove_select.value))
+                ui.notify(msg, color='positive' if ok else 'warning')
+                st.append_log(msg)
+
+            ui.button('Remove channel', on_click=remove_channel).props('flat color=warning')
+            ui.switch(
+                'Merge channels by time',
+                value=st.merge_channels(),
+                on_change=lambda e: st.set_merge_channels(bool(e.value)),
+            ).props('dense color=primary')
+            ui.switch(
+                'Decode in separate process',
+                value=serial_handler.process_decode_enabled(),
+                on_change=lambda e: serial_handler.set_process_decode(bool(e.value)),
+            ).props('dense color=primary').tooltip('Applies to connections opened afterwards')
+            ui.switch(
+                'Collect metrics',
+                value=metrics.enabled(),
+                on_change=lambda e: metrics.enable(bool(e.value)),
+            ).props('dense color=primary').tooltip('Timings and counters served at /metrics')
+            profile_seconds = ui.number(label='Profile (s)', value=profiler.DEFAULT_SECONDS, min=1, format='%.0f')
+            profile_seconds.classes('w-28')
+
+            async def profile() -> None:
+                seconds = float(profile_seconds.value or profiler.DEFAULT_SECONDS)
+                try:
+                    session = profiler.start(seconds)
+                except (RuntimeError, ValueError) as exc:
+                    ui.notify(str(exc), color='warning')
+                    return
+                profile_button.disable()
+                ui.notify(f'Profiling the pipeline for {session.seconds:.0f} s')
+                try:
+                    while profiler.running():
+                        await asyncio.sleep(0.25)
+                finally:
+                    profile_button.enable()
+                report = profiler.last_report() or {}
+                if 'error' in report:
+                    ui.notify(f"Profile not saved: {report['error']}", color='negative')
+                    return
+                slowest = ', '.join(f"{row['stage']} {row['total_ms']:.0f} ms" for row in report.get('stages', [])[:3])
+                msg = f"Profile saved to {report.get('folded')} ({slowest or 'no stage ran'})"
+                ui.notify(msg, color='positive')
+                st.append_log(msg)
+
+            profile_button = ui.button('Profile', on_click=profile).props('outline')
+        _build_channel_table(remove_select)
+
+
+def _build_channel_table(remove_select: ui.select) -> None:
+    columns = [
+        {'name': 'channel', 'label': 'Ch', 'field': 'channel', 'align': 'right'},
+        {'name': 'name', 'label': 'Name', 'field': 'name', 'align': 'left'},
+        {'name': 'port', 'label': 'Port', 'field': 'port', 'align': 'left'},
+        {'name': 'mode', 'label': 'Reader', 'field': 'mode', 'align': 'left'},
+        {'name': 'frames', 'label': 'Frames', 'field': 'frames', 'align': 'right'},
+        {'name': 'fps', 'label': 'Frames/s (1 s)', 'field': 'fps', 'align': 'right'},
+        {'name': 'load', 'label': 'Load (1 s)', 'field': 'load', 'align': 'right'},
+    ]
+    table = ui.table(columns=columns, rows=[], row_key='channel').classes('w-full text-sm').props('dense flat')
+
+    def refresh(_: Any = None) -> None:
+        summaries = st.channel_summaries()
+        readers = {info['channel']: info for info in serial_handler.channels()}
+        rows = []
+        for channel in sorted(set(readers) | set(summaries)):
+            info = readers.get(channel, {})
+            summary = summaries.get(channel)
+            rows.append(
+                {
+                    'channel': channel,
+                    'name': info.get('name', '—'),
+                    'port': info.get('port', '—'),
+                    'mode': info.get('mode', 'closed'),
+                    'frames': f"{summary['total_frames']:,}" if summary else '0',
+                    'fps': f"{summary['frames_per_s'][1]:,.0f}" if summary else '0',
+                    'load': f"{summary['bus_load'][1] * 100.0:.1f}%" if summary else '—',
+                }
+            )
+        table.rows = rows
+        table.update()
+        remove_select.options = {channel: f"{info['name']} ({info['port']})" for channel, info in readers.items()}
+        if remove_select.value not in readers:
+            remove_select.value = None
+        remove_select.update()
+
+    ui.timer(1.0, refresh)
+
+
+def _build_replay_card() -> None:
+    with ui.card().classes('w-full max-w-full dark:bg-slate-900 dark:text-gray-100'):
+        ui.label('Capture Replay').classes('text-md font-medium')
+        ui.separator()
+        with ui.row().classes('w-full items-end gap-3 flex-wrap'):
+            path_input = ui.input(
+                'Capture file or folder (.boltcap, .log, .asc, .csv, .pcapng)',
+                value='captures',
+            ).classes('min-w-[360px]')
+            speed_select = ui.select(
+                options={1.0: 'Real time', 0.5: '0.5×', 2.0: '2×', 10.0: '10×', 0.0: 'Max speed'},
+                value=1.0,
+                label='Speed',
+            ).classes('min-w-[140px]')
+            offset_input = ui.number(label='Start at (s)', value=0, min=0, format='%.3f')
+
+            def _on_finish(rp: replay.Replayer) -> None:
+                # Runs on the replay thread; route the message through the reader queue
+                stats = rp.stats()
+                serial_handler.push_jtag_line(
+                    f"[Replay] Finished: {stats['frames_sent']} frames in {stats['elapsed_s']}s"
+                    f" ({stats['frames_per_s']} frames/s)"
+                    + (f" – error: {stats['error']}" if stats['error'] else '')
+                )
+
+            def start() -> None:
+                source = (path_input.value or '').strip()
+                try:
+                    replay.start_replay(
+                        source,
+                        speed=float(speed_select.value or 0.0),
+                        on_finish=_on_finish,
+                        start_offset_s=float(offset_input.value or 0),
+                    )
+                except (OSError, ValueError) as exc:
+                    ui.notify(f'Replay failed: {exc}', color='negative')
+                    return
+                msg = f'Replaying {source}'
+                ui.notify(msg, color='positive')
+                st.append_log(msg)
+
+            def stop() -> None:
+                stats = replay.stop_replay()
+                if stats is not None:
+                    ui.notify(f"Replay stopped after {stats['frames_sent']} frames")
+
+            ui.button('Replay', on_click=start).props('color=primary')
+            ui.button('Stop', on_click=stop).props('color=secondary outline')
+
+
+def _build_trigger_card() -> None:
+    engine = triggers.engine()
+    with ui.card().classes('w-full max-w-full dark:bg-slate-900 dark:text-gray-100'):
+        ui.label('Triggered Capture').classes('text-md font-medium')
+        ui.separator()
+        with ui.row().classes('w-full items-end gap-3 flex-wrap'):
+            kind_select = ui.select(
+                options={
+                    triggers.ID: 'Identifier',
+                    triggers.PATTERN: 'Data pattern',
+                    triggers.DLC_CHANGE: 'DLC change',
+                    triggers.MISSING: 'Missing frame',
+                    triggers.LOG: 'Error log line',
+                },
+                value=triggers.ID,
+                label='Trigger on',
+            ).classes('min-w-[160px]')
+            id_input = ui.input('ID', placeholder='0x120').classes('w-28')
+            pattern_input = ui.input('Pattern', placeholder='12 34').classes('w-32')
+            mask_input = ui.input('Mask', placeholder='FF F0').classes('w-32')
+            timeout_input = ui.number(label='Timeout (ms)', value=100, min=1, format='%.0f').classes('w-28')
+            holdoff_input = ui.number(
+                label='Holdoff (s)', value=triggers.DEFAULT_HOLDOFF_S, min=0, format='%.1f'
+            ).classes('w-28')
+            rearm_switch = ui.switch('Re-arm', value=True).props('dense color=primary')
+
+            def add() -> None:
+                spec = {
+                    'kind': kind_select.value,
+                    'id': (id_input.value or '').strip() or None,
+                    'pattern': (pattern_input.value or '').strip() or None,
+                    'mask': (mask_input.value or '').strip() or None,
+                    'timeout_ms': timeout_input.value if kind_select.value == triggers.MISSING else 0,
+                    'holdoff_s': holdoff_input.value or 0,
+                    'rearm': bool(rearm_switch.value),
+                }
+                try:
+                    trigger = triggers.add_trigger(spec)
+                except ValueError as exc:
+                    ui.notify(f'Trigger not added: {exc}', color='warning')
+                    return
+                msg = f'Trigger {trigger.name} armed'
+                ui.notify(msg, color='positive')
+                st.append_log(msg)
+                refresh()
+
+            ui.button('Add trigger', on_click=add).props('color=primary')
+
+        columns = [
+            {'name': 'name', 'label': 'Trigger', 'field': 'name', 'align': 'left'},
+            {'name': 'condition', 'label': 'Condition', 'field': 'condition', 'align': 'left'},
+            {'name': 'state', 'label': 'State', 'field': 'state', 'align': 'left'},
+            {'name': 'fired', 'label': 'Fired', 'field': 'fired'},
+            {'name': 'last', 'label': 'Last reason', 'field': 'last', 'align': 'left'},
+        ]
+        table = ui.table(columns=columns, rows=[], row_key='name').classes('w-full').props('dense flat')
+        with ui.row().classes('w-full items-end gap-3 flex-wrap'):
+            name_select = ui.select(options=[], label='Trigger').classes('min-w-[160px]')
+
+            def _selected() -> Any:
+                return engine.get(name_select.value or '')
+
+            def toggle_armed() -> None:
+                trigger = _selected()
+                if trigger is None:
+                    return
+                if trigger.armed:
+                    trigger.disarm()
+                else:
+                    trigger.arm()
+                refresh()
+
+            def remove() -> None:
+                if name_select.value and triggers.remove_trigger(name_select.value):
+                    st.append_log(f'Trigger {name_select.value} removed')
+                    name_select.value = None
+                refresh()
+
+            ui.button('Arm / Disarm', on_click=toggle_armed).props('outline')
+            ui.button('Remove', on_click=remove).props('flat color=warning')
+            status_label = ui.label('').classes('text-sm text-gray-500')
+
+    def _condition(info: Dict[str, Any]) -> str:
+        parts = [] if info['id'] is None else [f"0x{info['id']:X}"]
+        if info['pattern']:
+            parts.append(f"{info['pattern']} / {info['mask']}")
+        if info['timeout_ms']:
+            parts.append(f"> {info['timeout_ms']:.0f} ms")
+        if info['kind'] == triggers.LOG:
+            parts.append(info['regex'])
+        if info['channel'] is not None:
+            parts.append(f"CH{info['channel']}")
+        return f"{info['kind']} " + ' '.join(parts)
+
+    def refresh() -> None:
+        stats = engine.stats()
+        rows = [
+            {
+                'name': info['name'],
+                'condition': _condition(info),
+                'state': ('armed' if info['armed'] else 'disarmed') + ('' if info['rearm'] else ', single'),
+                'fired': info['fired'],
+                'last': info['last_reason'] or '—',
+            }
+            for info in stats['triggers']
+        ]
+        if rows != table.rows:
+            table.rows = rows
+            table.update()
+        names = [row['name'] for row in rows]
+        if names != name_select.options:
+            name_select.options = names
+            name_select.update()
+        capturing = stats['capturing']
+        saved = [entry for entry in stats['captures'] if entry['saved']]
+        status = f"{stats['buffered']:,} of {stats['pre_frames']:,} frames buffered"
+        if capturing:
+            status += f" · capturing for {capturing['trigger']} ({capturing['post_frames']:,} frames)"
+        elif saved:
+            status += f" · last capture {saved[-1]['path']}"
+        status_label.set_text(status)
+
+    ui.timer(1.0, refresh)
+
 
 def _build_filters_and_actions() -> None:
     with ui.row().classes('w-full items-center gap-3 flex-wrap dark:text-gray-100'):
-        filter_input = ui.input('Filter by ID, payload, or text').classes('min-w-[220px]')
+        filter_input = ui.input(
+            'Filter (text or expression)',
+            placeholder='id in [0x100..0x1FF] and data[2] & 0xF0 == 0x30',
+        ).classes('min-w-[360px]')
 
         def _on_filter(e: events.ValueChangeEventArguments) -> None:
-            st.set_filter(e.value or '')
+            st.set_client_filter(e.value or '')
 
         filter_input.on('update:model-value', _on_filter)
 
+        dbc_input = ui.input('DBC file', placeholder='vehicle.dbc').classes('min-w-[220px]')
+
+        def _load_dbc() -> None:
+            path = (dbc_input.value or '').strip()
+            if not path:
+                st.clear_dbc()
+                ui.notify('DBC decoding disabled')
+                return
+            try:
+                count = st.load_dbc(path)
+            except (OSError, ValueError) as exc:
+                ui.notify(f'Failed to load DBC: {exc}', color='negative')
+                return
+            msg = f'Loaded {count} messages from {path}'
+            ui.notify(msg, color='positive')
+            st.append_log(msg)
+
+        ui.button('Load DBC', on_click=_load_dbc).props('outline')
         ui.button('Clear Frames', on_click=st.clear_frames).props('flat color=warning')
         ui.button('Clear Log', on_click=st.clear_log).props('flat color=warning')
+        log_stats = st.log_stats()
+        ui.number(
+            label='Log lines/s',
+            value=log_stats['max_lines_per_s'],
+            min=0,
+            format='%.0f',
+            on_change=lambda e: st.set_log_rate(float(e.value or 0)),
+        ).classes('w-28').tooltip(f"0 shows every line; the full log is written to {log_stats['log_file']}")
+        ui.number(
+            label='Renders/s',
+            value=1.0 / st.render_interval(),
+            min=0.1,
+            max=60,
+            format='%.0f',
+            on_change=lambda e: st.set_render_rate(float(e.value or 10)),
+        ).classes('w-28').tooltip('How often tables, charts and the log are pushed to every open tab')
+
+        def _toggle_recording() -> None:
+            if recorder.active_recorder() is None:
+                try:
+                    rec = recorder.start_recording()
+                except OSError as exc:
+                    ui.notify(f'Failed to start recording: {exc}', color='negative')
+                    return
+                msg = f'Recording to {rec.current_path}'
+                record_button.set_text('Stop Recording')
+            else:
+                stats = recorder.stop_recording() or {}
+                msg = f"Recording stopped: {stats.get('frames_written', 0)} frames written"
+                if stats.get('frames_dropped'):
+                    msg += f", {stats['frames_dropped']} dropped"
+                if stats.get('failed'):
+                    msg += f" (writer failed: {stats['error']})"
+                record_button.set_text('Start Recording')
+            ui.notify(msg)
+            st.append_log(msg)
+
+        label = 'Stop Recording' if recorder.active_recorder() else 'Start Recording'
+        record_button = ui.button(label, on_click=_toggle_recording).props('flat color=primary')
+
+    _build_export_row()
+
+
+def _build_export_row() -> None:
+    subscription = hub.current()
+    with ui.row().classes('w-full items-end gap-3 flex-wrap dark:text-gray-100'):
+        format_select = ui.select(
+            options={'candump': 'candump log', 'asc': 'Vector ASC', 'csv': 'CSV', 'pcapng': 'pcapng', 'boltcap': 'Bolt capture'},
+            value='candump',
+            label='Export format',
+        ).classes('min-w-[160px]')
+        start_input = ui.number(label='From (ms)', format='%.3f')
+        end_input = ui.number(label='To (ms)', format='%.3f')
+        filtered_toggle = ui.checkbox('Filtered frames only', value=False)
+
+        async def export() -> None:
+            fmt = format_select.value or 'candump'
+            os.makedirs('exports', exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            path = os.path.join('exports', f'bolt-{stamp}{formats.FORMAT_EXTENSIONS[fmt]}')
+            # Snapshot on the loop; the worker thread only reads the copy
+            chunks = st.iter_history(
+                start_ms=start_input.value,
+                end_ms=end_input.value,
+                filtered=bool(filtered_toggle.value),
+                filter_text=subscription.filter_text,
+            )
+            try:
+                count = await run.io_bound(formats.write_frames, path, chunks, fmt)
+            except (OSError, ValueError) as exc:
+                ui.notify(f'Export failed: {exc}', color='negative')
+                return
+            msg = f'Exported {count} frames to {path}'
+            ui.notify(msg, color='positive')
+            st.append_log(msg)
+            ui.download(path)
+
+        ui.button('Export', on_click=export).props('outline')
 
 
 def _build_data_section() -> None:
+    subscription = hub.current()
+
+    def query(page: int, rows_per_page: int, sort_by: Any, descending: bool) -> Any:
+        # Tables refresh outside this client's context; use its own filter
+        return st.query_frames(page, rows_per_page, sort_by, descending, filter_text=subscription.filter_text)
+
     with ui.row().classes('w-full items-stretch gap-4 flex-wrap'):
         with ui.column().classes('grow min-w-[340px] gap-2'):
-            table, update_table = make_can_table()
-            st.register_table_updater(update_table)
+            with ui.tabs().classes('w-full') as tabs:
+                log_tab = ui.tab('Log')
+                trace_tab = ui.tab('Trace')
+            with ui.tab_panels(tabs, value=log_tab).classes('w-full dark:bg-slate-900'):
+                with ui.tab_panel(log_tab):
+                    table, update_table = make_can_table(query)
+                    st.register_table_updater(update_table)
+                with ui.tab_panel(trace_tab):
+                    trace_table, update_trace = make_trace_table()
+                    st.register_trace_updater(update_trace)
         with ui.column().classes('basis-[360px] grow gap-2'):
             chart, update_chart = make_identifier_chart()
             st.register_chart_updater(update_chart)
+            gauge, update_load = make_load_gauge()
+            st.register_load_updater(update_load)
+            ui.select(
+                {125_000: '125 kbit/s', 250_000: '250 kbit/s', 500_000: '500 kbit/s', 1_000_000: '1 Mbit/s'},
+                value=st.bus_bitrate(),
+                label='CAN bitrate',
+                on_change=lambda e: st.set_bus_bitrate(int(e.value)),
+            ).classes('w-40 self-center')
+
+
+def _build_signal_plot_card() -> None:
+    with ui.card().classes('w-full max-w-full dark:bg-slate-900 dark:text-gray-100'):
+        ui.label('Signal Plot').classes('text-md font-medium')
+        ui.separator()
+        with ui.row().classes('w-full items-end gap-3 flex-wrap'):
+            signal_select = ui.select(options={}, label='Signal (load a DBC first)', with_input=True).classes(
+                'min-w-[320px]'
+            )
+            mode_select = ui.select({'lttb': 'LTTB', 'minmax': 'Min/max'}, value='lttb', label='Downsampling').classes(
+                'min-w-[140px]'
+            )
+
+            def refresh_signals(_: Any = None) -> None:
+                signal_select.options = {
+                    f"{row['id']}:{row['signal']}": f"{row['message']}.{row['signal']}"
+                    + (f" [{row['unit']}]" if row['unit'] else '')
+                    for row in st.signal_catalog()
+                }
+                signal_select.update()
+
+            def add() -> None:
+                if not signal_select.value:
+                    ui.notify('Select a signal to plot', color='warning')
+                    return
+                identifier, name = str(signal_select.value).split(':', 1)
+                try:
+                    st.add_signal_plot(int(identifier), name, mode=mode_select.value or 'lttb')
+                except (KeyError, ValueError) as exc:
+                    ui.notify(str(exc), color='negative')
+
+            signal_select.on('focus', refresh_signals)
+            ui.button('Plot', on_click=add).props('color=primary')
+            ui.button('Reset zoom', on_click=lambda: st.set_plot_view(None, None)).props('outline')
+            ui.button('Clear plot', on_click=st.clear_signal_plots).props('flat color=warning')
+
+        _, update_plot = make_signal_chart(st.set_plot_view)
+        st.register_plot_updater(update_plot)
 
 
 def _build_log_section() -> None:
@@ -0,0 +1,134 @@
+"""Per-client view subscriptions for the Bolt dashboard.
+
+Every browser tab is its own NiceGUI client with its own table, trace,
+chart, gauge, plot and log. Each client gets a :class:`Subscription` the
+first time one of its views registers (see the ``register_*`` functions in
+``gui.state``); the subscription holds the client's view callbacks and its
+table filter, and is dropped when the client is deleted, so closed tabs no
+longer receive updates.
+
+``gui.state`` computes each view's data once per render tick and hands the
+same result to every subscribed view with :func:`fan_out`.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from nicegui import ui
+
+# Key used outside a page (scripts, benchmarks, tests)
+LOCAL = 'local'
+
+_SUBSCRIPTIONS: Dict[Any, 'Subscription'] = {}
+_unsubscribe_listeners: List[Callable[['Subscription'], None]] = []
+
+
+class Subscription:
+    """The views and settings of one connected client."""
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+        self.created = time.monotonic()
+        self.views: Dict[str, Callable[..., None]] = {}
+        self.filter_text = ''
+        self.log_writer: Optional[Callable[[str], None]] = None
+        self.log_clearer: Optional[Callable[[], None]] = None
+        self.connection_labels: List[Any] = []
+        self.dark_mode: Optional[Any] = None
+        self.render_timer: Optional[Any] = None
+        self.failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'client': str(self.key),
+            'views': sorted(self.views),
+            'filter': self.filter_text,
+            'age_s': round(time.monotonic() - self.created, 1),
+            'failures': self.failures,
+        }
+
+
+def _current_client() -> Optional[Any]:
+    try:
+        return ui.context.client
+    except Exception:
+        return None
+
+
+def current() -> Subscription:
+    """The subscription of the client whose page or event is being handled."""
+    client = _current_client()
+    key = getattr(client, 'id', None) if client is not None else None
+    if key is None:
+        key = LOCAL
+    subscription = _SUBSCRIPTIONS.get(key)
+    if subscription is None:
+        subscription = _SUBSCRIPTIONS[key] = Subscription(key)
+        if key != LOCAL:
+            # on_delete fires once the client is gone for good (NiceGUI 2);
+            # older versions only offer on_disconnect
+            register = getattr(client, 'on_delete', None) or getattr(client, 'on_disconnect', None)
+            if register is not None:
+                register(lambda: unsubscribe(key))
+    return subscription
+
+
+def unsubscribe(key: Any) -> None:
+    subscription = _SUBSCRIPTIONS.pop(key, None)
+    if subscription is None:
+        return
+    for listener in list(_unsubscribe_listeners):
+        try:
+            listener(subscription)
+        except Exception:
+            pass
+
+
+def on_unsubscribe(listener: Callable[[Subscription], None]) -> None:
+    _unsubscribe_listeners.append(listener)
+
+
+def subscriptions() -> List[Subscription]:
+    return list(_SUBSCRIPTIONS.values())
+
+
+def has_view(name: str) -> bool:
+    return any(name in subscription.views for subscription in _SUBSCRIPTIONS.values())
+
+
+def fan_out(name: str, *args: Any) -> int:
+    """Call every client's ``name`` view with ``args``; returns how many ran.
+
+    One client's failing view (e.g. an element already deleted) does not
+    stop the others.
+    """
+    delivered = 0
+    for subscription in list(_SUBSCRIPTIONS.values()):
+        view = subscription.views.get(name)
+        if view is None:
+            continue
+        try:
+            view(*args)
+            delivered += 1
+        except Exception:
+            subscription.failures += 1
+    return delivered
+
+
+def subscription_stats() -> List[Dict[str, Any]]:
+    return [subscription.stats() for subscription in _SUBSCRIPTIONS.values()]
+
+
+__all__ = [
+    'LOCAL',
+    'Subscription',
+    'current',
+    'fan_out',
+    'has_view',
+    'on_unsubscribe',
+    'subscription_stats',
+    'subscriptions',
+    'unsubscribe',
+]
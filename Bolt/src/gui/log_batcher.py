@@ -0,0 +1,261 @@
+"""Batching, collapsing and rate limiting for the monitor log.
+
+Every non-frame line from the sniffers ends up in the monitor log, and a
+noisy bus (bus-error alerts, drop reports, a chatty task) can produce
+thousands of them a second. :class:`LogBatcher` sits between
+``state.append_log`` and the browser:
+
+- lines are collected and handed to the views once per render tick;
+- a run of lines that only differ in their numbers (timestamps, counters,
+  identifiers) is shown once, as its latest line with a repeat count;
+- at most ``max_lines_per_s`` lines reach the views; whatever is over the
+  budget is replaced by one line saying how many were left out. That notice
+  counts against the budget too, and unused budget carries over between
+  ticks, so a cap below the render rate still lets lines through.
+
+Nothing is lost: every line, uncollapsed, goes to a :class:`RotatingLogFile`,
+written by a background thread so adding a line never waits on the disk.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+DEFAULT_MAX_LINES_PER_S = 50.0
+DEFAULT_LOG_PATH = os.path.join('logs', 'bolt-monitor.log')
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+# Distinct runs kept between ticks; older ones are counted as suppressed
+_MAX_PENDING = 2000
+# Unwritten file lines that wake the file writer early
+_FILE_FLUSH_LINES = 512
+# The file writer wakes up at least this often
+_FILE_FLUSH_INTERVAL_S = 0.5
+
+# Numbers (decimal or 0x-hex) do not make two lines different
+_NUMBER = re.compile(r'0[xX][0-9A-Fa-f]+|\d+')
+
+
+def line_template(line: str) -> str:
+    return _NUMBER.sub('#', line)
+
+
+class RotatingLogFile:
+    """Append lines to ``path``; past ``max_bytes`` it becomes ``path.1`` and so on."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS) -> None:
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.backups = max(int(backups), 0)
+        self.bytes_written = 0
+        self.last_error: Optional[str] = None
+        self._file: Optional[Any] = None
+        self._size = 0
+
+    def write_lines(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        data = '\n'.join(lines) + '\n'
+        try:
+            if self._file is None:
+                self._open()
+            elif self.max_bytes and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+        except OSError as exc:
+            self.last_error = str(exc)
+            self.close()
+            return
+        self._size += len(data)
+        self.bytes_written += len(data)
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8', errors='replace')
+        self._size = self._file.tell()
+
+    def _rotate(self) -> None:
+        self.close()
+        if self.backups:
+            for index in range(self.backups - 1, 0, -1):
+                source = f'{self.path}.{index}'
+                if os.path.exists(source):
+                    os.replace(source, f'{self.path}.{index + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+class LogBatcher:
+    """Collect log lines from any thread; :meth:`flush` returns what to show."""
+
+    def __init__(
+        self,
+        max_lines_per_s: float = DEFAULT_MAX_LINES_PER_S,
+        log_file: Optional[RotatingLogFile] = None,
+    ) -> None:
+        self.max_lines_per_s = float(max_lines_per_s)
+        self.log_file = log_file
+        self.lines_in = 0
+        self.lines_shown = 0
+        self.lines_collapsed = 0
+        self.lines_suppressed = 0
+        # [template, latest line, count]
+        self._pending: List[List[Any]] = []
+        self._file_lines: List[str] = []
+        self._lock = threading.Lock()
+        # Held while lines are handed to the file, so writes keep their order
+        self._file_lock = threading.Lock()
+        self._file_wake = threading.Event()
+        self._file_writer: Optional[threading.Thread] = None
+        self._tokens = self._burst()
+        self._last_flush: Optional[float] = None
+        # Lines left out whose notice did not fit in the budget yet
+        self._untold = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def set_rate(self, max_lines_per_s: float) -> None:
+        """Lines per second the views receive at most (0 turns the cap off)."""
+        self.max_lines_per_s = max(float(max_lines_per_s), 0.0)
+        self._tokens = min(self._tokens, self._burst())
+        if not self.max_lines_per_s:
+            self._untold = 0
+
+    def _burst(self) -> float:
+        # At least one whole line, or a cap under 1 line/s would never show one
+        return max(self.max_lines_per_s, 1.0) if self.max_lines_per_s else 0.0
+
+    def set_log_file(self, log_file: Optional[RotatingLogFile]) -> None:
+        """Finish writing to the current file, then write to ``log_file`` (None: nowhere)."""
+        with self._file_lock:
+            self._write_file()
+            if self.log_file is not None:
+                self.log_file.close()
+            self.log_file = log_file
+
+    def add(self, line: str) -> None:
+        template = line_template(line)
+        with self._lock:
+            self.lines_in += 1
+            if self.log_file is not None:
+                self._file_lines.append(line)
+                if self._file_writer is None:
+                    self._start_file_writer()
+                elif len(self._file_lines) >= _FILE_FLUSH_LINES:
+                    self._file_wake.set()
+            pending = self._pending
+            if pending and pending[-1][0] == template:
+                run = pending[-1]
+                run[1] = line
+                run[2] += 1
+                self.lines_collapsed += 1
+                return
+            pending.append([template, line, 1])
+            if len(pending) > _MAX_PENDING:
+                dropped = pending.pop(0)
+                self.lines_suppressed += dropped[2]
+
+    def flush(self, now: Optional[float] = None) -> List[str]:
+        """Lines for the views since the last call, collapsed and within the rate cap."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            runs, self._pending = self._pending, []
+            if self._last_flush is not None and self.max_lines_per_s:
+                # Fractions carry over: 5 lines/s at 10 ticks/s is one line every other tick
+                self._tokens = min(self._tokens + (now - self._last_flush) * self.max_lines_per_s, self._burst())
+            self._last_flush = now
+        if not runs and not self._untold:
+            return []
+        budget = len(runs) + 1 if not self.max_lines_per_s else int(self._tokens)
+        shown = runs[:budget]
+        left_out = sum(count for _, _, count in runs[len(shown) :])
+        self.lines_suppressed += left_out
+        untold = self._untold + left_out
+        out = [line if count == 1 else f'{line}  [x{count}]' for _, line, count in shown]
+        if untold and (budget > len(out) or out):
+            where = f'; full log in {self.log_file.path}' if self.log_file is not None else ''
+            notice = f'... {untold} log lines not shown (over {self.max_lines_per_s:g} lines/s{where})'
+            if budget > len(out):
+                out.append(notice)
+            else:
+                # No slot left for the notice: it rides on the last line shown
+                out[-1] = f'{out[-1]}  {notice}'
+            untold = 0
+        self._untold = untold
+        if self.max_lines_per_s:
+            self._tokens -= len(out)
+        self.lines_shown += len(out)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending = []
+            self._untold = 0
+
+    def close(self) -> None:
+        """Write what is left to the log file and close it (it reopens on the next line)."""
+        with self._file_lock:
+            self._write_file()
+            if self.log_file is not None:
+                self.log_file.close()
+
+    def _start_file_writer(self) -> None:
+        self._file_writer = threading.Thread(target=self._file_writer_loop, name='log-file-writer', daemon=True)
+        self._file_writer.start()
+
+    def _file_writer_loop(self) -> None:
+        while True:
+            self._file_wake.wait(_FILE_FLUSH_INTERVAL_S)
+            self._file_wake.clear()
+            with self._file_lock:
+                self._write_file()
+
+    def _write_file(self) -> None:
+        # Called with _file_lock held; the disk write happens outside _lock
+        with self._lock:
+            lines, self._file_lines = self._file_lines, []
+            log_file = self.log_file
+        if lines and log_file is not None:
+            log_file.write_lines(lines)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_lines_per_s': self.max_lines_per_s,
+            'pending': self.pending,
+            'lines_in': self.lines_in,
+            'lines_shown': self.lines_shown,
+            'lines_collapsed': self.lines_collapsed,
+            'lines_suppressed': self.lines_suppressed,
+            'log_file': self.log_file.path if self.log_file is not None else None,
+            'log_file_error': self.log_file.last_error if self.log_file is not None else None,
+        }
+
+
+__all__ = [
+    'DEFAULT_BACKUPS',
+    'DEFAULT_LOG_PATH',
+    'DEFAULT_MAX_BYTES',
+    'DEFAULT_MAX_LINES_PER_S',
+    'LogBatcher',
+    'RotatingLogFile',
+    'line_template',
+]
@@ -0,0 +1,320 @@
+"""On-demand per-stage profiler for the ingestion and render pipeline.
+
+A session wraps the pipeline stages in :data:`STAGES` with timing wrappers
+for a fixed number of seconds and then puts the original functions back, so
+nothing is measured (and nothing is wrapped) outside a session. Stages are
+swapped where their callers look them up — module attributes, the
+``StreamDecoder`` class and the render scheduler's registered views — so a
+session can start and stop while sniffers are connected.
+
+Each call records its inclusive time and, per stack of nested stages, its
+self time. :func:`stop` writes two files to ``profiles/``:
+
+    bolt-profile-<stamp>.folded   collapsed stacks, "thread;stage;stage <us>",
+                                  for flamegraph.pl, speedscope or inferno
+    bolt-profile-<stamp>.txt      summary table, slowest stages first
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from gui import state as st
+from jtag import data_processor
+from usb_serial import framing
+
+# Stage name -> where it is looked up: (owner, attribute); owner "scheduler" means a registered view
+STAGES: Dict[str, Tuple[Tuple[Any, str], ...]] = {
+    # The serial reader's work per read (framing and fast-path parsing)
+    'decode': ((framing.StreamDecoder, 'feed'),),
+    'process_line': ((data_processor, 'process_line'),),
+    'process_frames': ((data_processor, 'process_frames'),),
+    'append_can_frame': ((st, 'append_can_frame'),),
+    'append_frames': ((st, 'append_frames'),),
+    'push_table_update': ((st, '_push_table_update'), ('scheduler', 'table')),
+    'push_chart_update': ((st, '_push_chart_update'), ('scheduler', 'chart')),
+}
+
+DEFAULT_SECONDS = 10.0
+MAX_SECONDS = 600.0
+# Durations kept per stage for percentiles (reservoir sampled beyond this)
+_MAX_SAMPLES = 100_000
+
+_LOCK = threading.Lock()
+_session: Optional['ProfileSession'] = None
+_last_report: Optional[Dict[str, Any]] = None
+
+
+class _StageStats:
+    __slots__ = ('calls', 'total_ns', 'self_ns', 'max_ns', 'samples')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        self.self_ns = 0
+        self.max_ns = 0
+        self.samples: List[int] = []
+
+
+class ProfileSession:
+    """One profiling run: the installed wrappers and what they recorded."""
+
+    def __init__(self, seconds: float, stages: Sequence[str], directory: str) -> None:
+        self.seconds = seconds
+        self.stages = list(stages)
+        self.directory = directory
+        self.started = time.perf_counter()
+        self.started_at = datetime.now()
+        self.stats: Dict[str, _StageStats] = {name: _StageStats() for name in self.stages}
+        # "thread;stage;stage" -> self time in ns
+        self.stacks: Dict[str, int] = {}
+        self._local = threading.local()
+        self._random = random.Random(0)
+        self._restore: List[Callable[[], None]] = []
+        self._timer: Optional[threading.Timer] = None
+
+    # -- wrapping ----------------------------------------------------------
+
+    def _wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        session = self
+
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            local = session._local
+            stack = getattr(local, 'stack', None)
+            if stack is None:
+                stack = local.stack = [threading.current_thread().name]
+                local.child_ns = [0]
+            stack.append(name)
+            local.child_ns.append(0)
+            started = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - started
+                child = local.child_ns.pop()
+                session._record(name, ';'.join(stack), elapsed, elapsed - child)
+                stack.pop()
+                local.child_ns[-1] += elapsed
+
+        profiled.__wrapped__ = fn  # type: ignore[attr-defined]
+        profiled.__name__ = getattr(fn, '__name__', name)
+        profiled.profile_session = session  # type: ignore[attr-defined]
+        return profiled
+
+    def _record(self, name: str, path: str, elapsed: int, self_ns: int) -> None:
+        with _LOCK:
+            stats = self.stats[name]
+            stats.calls += 1
+            stats.total_ns += elapsed
+            stats.self_ns += self_ns
+            if elapsed > stats.max_ns:
+                stats.max_ns = elapsed
+            if len(stats.samples) < _MAX_SAMPLES:
+                stats.samples.append(elapsed)
+            else:
+                slot = self._random.randrange(stats.calls)
+                if slot < _MAX_SAMPLES:
+                    stats.samples[slot] = elapsed
+            self.stacks[path] = self.stacks.get(path, 0) + self_ns
+
+    def install(self) -> None:
+        for name in self.stages:
+            for owner, attr in STAGES[name]:
+                if owner == 'scheduler':
+                    self._install_view(name, attr)
+                else:
+                    self._install_attr(name, owner, attr)
+
+    def _install_attr(self, name: str, owner: Any, attr: str) -> None:
+        original = getattr(owner, attr)
+        wrapper = self._wrap(name, original)
+        setattr(owner, attr, wrapper)
+
+        def restore() -> None:
+            if getattr(owner, attr, None) is wrapper:
+                setattr(owner, attr, original)
+
+        self._restore.append(restore)
+
+    def _install_view(self, name: str, view: str) -> None:
+        scheduler = st._scheduler
+        original = scheduler.renderer(view)
+        if original is None:
+            return
+        wrapper = self._wrap(name, original)
+        scheduler.replace_renderer(view, wrapper)
+
+        def restore() -> None:
+            if scheduler.renderer(view) is wrapper:
+                scheduler.replace_renderer(view, original)
+
+        self._restore.append(restore)
+
+    def uninstall(self) -> None:
+        while self._restore:
+            self._restore.pop()()
+        # A view registered mid-session may still hold a module-level wrapper
+        scheduler = st._scheduler
+        for name in self.stages:
+            for owner, attr in STAGES[name]:
+                if owner != 'scheduler':
+                    continue
+                current = scheduler.renderer(attr)
+                if getattr(current, 'profile_session', None) is self:
+                    scheduler.replace_renderer(attr, current.__wrapped__)
+
+    # -- results -----------------------------------------------------------
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per stage that ran, largest total time first."""
+        rows = []
+        with _LOCK:
+            items = [(name, stats, sorted(stats.samples)) for name, stats in self.stats.items() if stats.calls]
+        for name, stats, samples in items:
+            rows.append(
+                {
+                    'stage': name,
+                    'calls': stats.calls,
+                    'total_ms': round(stats.total_ns / 1e6, 3),
+                    'self_ms': round(stats.self_ns / 1e6, 3),
+                    'mean_us': round(stats.total_ns / stats.calls / 1e3, 3),
+                    'p50_us': round(_percentile(samples, 0.50) / 1e3, 3),
+                    'p99_us': round(_percentile(samples, 0.99) / 1e3, 3),
+                    'max_us': round(stats.max_ns / 1e3, 3),
+                }
+            )
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def collapsed(self) -> str:
+        with _LOCK:
+            stacks = sorted(self.stacks.items())
+        return ''.join(f'{path} {max(ns // 1000, 1)}\n' for path, ns in stacks if ns > 0)
+
+    def write(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        rows = self.summary()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = self.started_at.strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.directory, f'bolt-profile-{stamp}')
+        with open(base + '.folded', 'w', encoding='utf-8') as fh:
+            fh.write(self.collapsed())
+        with open(base + '.txt', 'w', encoding='utf-8') as fh:
+            fh.write(format_summary(rows, elapsed))
+        return {
+            'started': self.started_at.isoformat(timespec='seconds'),
+            'seconds': round(elapsed, 3),
+            'stages': rows,
+            'folded': base + '.folded',
+            'summary': base + '.txt',
+        }
+
+
+def _percentile(samples: Sequence[int], fraction: float) -> int:
+    if not samples:
+        return 0
+    return samples[min(int(fraction * len(samples)), len(samples) - 1)]
+
+
+def format_summary(rows: Sequence[Dict[str, Any]], seconds: float) -> str:
+    header = (
+        f"{'stage':<20}{'calls':>10}{'total ms':>12}{'self ms':>12}"
+        f"{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'max us':>11}"
+    )
+    lines = [f'Bolt pipeline profile, {seconds:.1f} s', '', header, '-' * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['stage']:<20}{row['calls']:>10,}{row['total_ms']:>12.1f}{row['self_ms']:>12.1f}"
+            f"{row['mean_us']:>10.1f}{row['p50_us']:>10.1f}{row['p99_us']:>10.1f}{row['max_us']:>11.1f}"
+        )
+    if not rows:
+        lines.append('(no stage ran)')
+    return '\n'.join(lines) + '\n'
+
+
+def start(
+    seconds: float = DEFAULT_SECONDS, stages: Optional[Sequence[str]] = None, directory: str = 'profiles'
+) -> ProfileSession:
+    """Start a session that stops itself after ``seconds``.
+
+    Raises ``RuntimeError`` if one is already running and ``ValueError`` for
+    unknown stage names.
+    """
+    global _session
+    names = list(stages) if stages else list(STAGES)
+    unknown = [name for name in names if name not in STAGES]
+    if unknown:
+        raise ValueError(f"unknown stage(s): {', '.join(unknown)}")
+    seconds = min(max(float(seconds), 0.1), MAX_SECONDS)
+    with _LOCK:
+        if _session is not None:
+            raise RuntimeError('a profiling session is already running')
+        session = _session = ProfileSession(seconds, names, directory)
+    session.install()
+    timer = session._timer = threading.Timer(seconds, _stop_session, args=(session,))
+    timer.daemon = True
+    timer.start()
+    return session
+
+
+def stop() -> Optional[Dict[str, Any]]:
+    """End the running session now; returns its report (or the last one)."""
+    session = _session
+    if session is None:
+        return _last_report
+    return _stop_session(session)
+
+
+def _stop_session(session: ProfileSession) -> Optional[Dict[str, Any]]:
+    global _session, _last_report
+    with _LOCK:
+        if _session is not session:
+            return _last_report
+        _session = None
+    if session._timer is not None:
+        session._timer.cancel()
+    session.uninstall()
+    try:
+        report = session.write()
+    except OSError as exc:
+        report = {'error': str(exc), 'stages': session.summary()}
+    _last_report = report
+    return report
+
+
+def running() -> bool:
+    return _session is not None
+
+
+def status() -> Dict[str, Any]:
+    session = _session
+    if session is None:
+        return {'running': False, 'last': _last_report}
+    return {
+        'running': True,
+        'elapsed_s': round(time.perf_counter() - session.started, 1),
+        'seconds': session.seconds,
+        'stages': session.stages,
+    }
+
+
+def last_report() -> Optional[Dict[str, Any]]:
+    return _last_report
+
+
+__all__ = [
+    'DEFAULT_SECONDS',
+    'STAGES',
+    'ProfileSession',
+    'format_summary',
+    'last_report',
+    'running',
+    'start',
+    'status',
+    'stop',
+]
@@ -0,0 +1,127 @@
+"""Frame-rate capped render scheduler for the Bolt dashboard views."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from analysis import metrics
+
+# Default cap for pushing view updates to the browser
+DEFAULT_MAX_HZ = 10.0
+
+
+@dataclass
+class ViewStats:
+    renders: int = 0
+    coalesced: int = 0
+    last_ms: float = 0.0
+    max_ms: float = 0.0
+    total_ms: float = 0.0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.renders if self.renders else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'renders': self.renders,
+            'coalesced': self.coalesced,
+            'last_ms': round(self.last_ms, 3),
+            'avg_ms': round(self.avg_ms, 3),
+            'max_ms': round(self.max_ms, 3),
+        }
+
+
+class RenderScheduler:
+    """Coalesce view invalidations into at most one render per view per tick.
+
+    State mutations call :meth:`mark_dirty`; the UI timer calls :meth:`tick`
+    which renders every dirty view once, no more often than ``max_hz``.
+    Invalidations that arrive while a view is already dirty are counted as
+    coalesced.
+    """
+
+    def __init__(self, max_hz: float = DEFAULT_MAX_HZ) -> None:
+        self._renderers: Dict[str, Callable[[], None]] = {}
+        self._dirty: Dict[str, bool] = {}
+        self._stats: Dict[str, ViewStats] = {}
+        self._last_tick: Optional[float] = None
+        self.max_hz = DEFAULT_MAX_HZ
+        self.set_max_hz(max_hz)
+
+    def set_max_hz(self, max_hz: float) -> None:
+        self.max_hz = max(0.1, float(max_hz))
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.max_hz
+
+    def register(self, name: str, render: Callable[[], None]) -> None:
+        self._renderers[name] = render
+        self._dirty.setdefault(name, False)
+        self._stats.setdefault(name, ViewStats())
+
+    def renderer(self, name: str) -> Optional[Callable[[], None]]:
+        return self._renderers.get(name)
+
+    def replace_renderer(self, name: str, render: Callable[[], None]) -> None:
+        """Swap a registered view's render function (e.g. for profiling)."""
+        if name in self._renderers:
+            self._renderers[name] = render
+
+    def mark_dirty(self, name: str) -> None:
+        if self._dirty.get(name):
+            self._stats[name].coalesced += 1
+            return
+        if name in self._renderers:
+            self._dirty[name] = True
+
+    def is_dirty(self, name: str) -> bool:
+        return bool(self._dirty.get(name))
+
+    def render_now(self, name: str) -> None:
+        """Render a single view immediately (e.g. when it first attaches)."""
+        render = self._renderers.get(name)
+        if render is None:
+            return
+        self._dirty[name] = False
+        stats = self._stats[name]
+        started = time.perf_counter()
+        try:
+            render()
+        except Exception:
+            pass
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        stats.renders += 1
+        stats.last_ms = elapsed_ms
+        stats.total_ms += elapsed_ms
+        if elapsed_ms > stats.max_ms:
+            stats.max_ms = elapsed_ms
+        if metrics.ENABLED:
+            metrics.RENDER_SECONDS.observe(elapsed_ms / 1000.0, name)
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """Render dirty views if the frame-rate cap allows. Returns renders done."""
+        now = time.monotonic() if now is None else now
+        # Allow a little timer jitter before skipping a tick
+        if self._last_tick is not None and now - self._last_tick < self.interval * 0.9:
+            return 0
+        self._last_tick = now
+        rendered = 0
+        for name, dirty in list(self._dirty.items()):
+            if dirty:
+                self.render_now(name)
+                rendered += 1
+        return rendered
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        for name in self._stats:
+            self._stats[name] = ViewStats()
+
+
+__all__ = ['DEFAULT_MAX_HZ', 'RenderScheduler', 'ViewStats']
@@ -2,15 +2,42 @@
 
 from __future__ import annotations
 
+import heapq
 import time
-from collections import Counter, deque
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from nicegui.elements.dark_mode import DarkMode
 
-# Maximum number of frames kept in memory and displayed in the table
-_MAX_FRAMES = 500
+from analysis.bus_stats import DEFAULT_BITRATE, BusStats
+from analysis import dbc, metrics
+from analysis.dbc import DbcDatabase, DbcMessage
+from analysis.timeseries import SignalPlot
+
+from gui import hub
+from gui.filters import compile_filter
+from gui.frame_store import FLAG_EXT, FLAG_RTR, FrameStore, StoreSnapshot, sorted_page
+from gui.log_batcher import (
+    DEFAULT_BACKUPS as DEFAULT_LOG_BACKUPS,
+    DEFAULT_LOG_PATH,
+    DEFAULT_MAX_BYTES as DEFAULT_LOG_MAX_BYTES,
+    DEFAULT_MAX_LINES_PER_S,
+    LogBatcher,
+    RotatingLogFile,
+)
+from gui.render import DEFAULT_MAX_HZ, RenderScheduler
+from gui.trace import TraceTable
+
+# Maximum number of frames kept in memory
+_MAX_FRAMES = 1_000_000
+# Upper bound for one table page (Quasar sends 0 for "All")
+_MAX_PAGE_ROWS = 500
+# Keep the raw JSON line per frame (only used by the free-text filter)
+_KEEP_RAW_TEXT = False
 # Maximum number of log lines kept in the console
 _MAX_LOG_LINES = 400
 
@@ -26,6 +53,7 @@ class CanFrame:
     dlc: int
     data_bytes: List[int]
     raw: str
+    channel: int = 0
 
     @property
     def id_hex(self) -> str:
@@ -48,54 +76,109 @@ class CanFrame:
         return ', '.join(flags) if flags else '—'
 
 
-_frame_history: Deque[CanFrame] = deque(maxlen=_MAX_FRAMES)
-_frame_seq: int = 0
+_frame_store = FrameStore(_MAX_FRAMES, keep_raw=_KEEP_RAW_TEXT)
 _start_ts_us: Optional[int] = None
 _last_frame_monotonic: Optional[float] = None
+# Filter used where no client is involved (API, scripts); clients keep their own
 _filter_text: str = ''
-_id_counts: Counter[int] = Counter()
+# Bus statistics per channel (one sniffer per bus)
+_bus_stats: Dict[int, BusStats] = {}
+_bus_bitrate: int = DEFAULT_BITRATE
+# Added to a channel's device timestamps to put it on the shared timeline
+_channel_offset_us: Dict[int, int] = {}
+# Order the table by timestamp across channels instead of by arrival
+_merge_channels: bool = True
+_dbc: Optional[DbcDatabase] = None
+# Identifier -> compiled message; identifiers without an entry are never decoded
+_decoders: Dict[int, DbcMessage] = {}
+# Plotted signals, and the same plots grouped by identifier for per-frame dispatch
+_plots: Dict[Tuple[int, str], SignalPlot] = {}
+_plotted_ids: Dict[int, List[SignalPlot]] = {}
+_plot_view_ms: Optional[Tuple[float, float]] = None
+_trace = TraceTable()
+# Per filter text: sorted sequence numbers matching it, extended incrementally
+# ('groups' splits them per channel, identifier or DLC for the merged and sorted views). Clients with the
+# same filter share one entry.
+_filter_caches: Dict[str, Dict[str, Any]] = {}
 
-_table_updater: Optional[Callable[[List[Dict[str, Any]]], None]] = None
-_chart_updater: Optional[Callable[[List[str], List[int]], None]] = None
-_log_writer: Optional[Callable[[str], None]] = None
-_log_clearer: Optional[Callable[[], None]] = None
-_connection_labels: List[Any] = []
 _connection_state: Dict[str, Any] = {
     'connected': False,
     'message': 'Disconnected',
 }
 _log_buffer: Deque[str] = deque(maxlen=_MAX_LOG_LINES)
-_dark_mode_controller: Optional[DarkMode] = None
+# Log lines reach the consoles once per render tick, collapsed and rate capped;
+# the full log goes to a rotating file
+_log_batcher = LogBatcher(DEFAULT_MAX_LINES_PER_S, RotatingLogFile(DEFAULT_LOG_PATH))
+# Firmware sequence numbers (u16, see binary_codec) and drop accounting
+_SEQ_MASK = 0xFFFF
+_last_seq: Dict[int, int] = {}
+_seq_gaps: Dict[int, int] = {}
+_seq_resets: Dict[int, int] = {}
+_device_status: Dict[int, Dict[str, int]] = {}
+_corrupt_lines: int = 0
+_drop_sources: Dict[str, Callable[[], Dict[str, int]]] = {}
+# Frames appended before the last clear, so the metrics total never goes back
+_frames_before_clear: int = 0
+# Device-to-host clock offset per channel: [previous window min, window min, window start]
+_CLOCK_WINDOW_S = 10.0
+_clock_offsets: Dict[int, List[float]] = {}
+_latency_seq: int = 0
 _dark_mode_enabled: bool = True
+_scheduler = RenderScheduler(DEFAULT_MAX_HZ)
+
+
+def register_table_updater(fn: Callable[[], None]) -> None:
+    """Attach the current client's table; it pulls its page via :func:`query_frames`."""
+    _register_view('table', fn, _push_table_update)
+
+
+def register_chart_updater(fn: Callable[[List[str], List[int], List[float]], None]) -> None:
+    _register_view('chart', fn, _push_chart_update)
+
+
+def register_load_updater(fn: Callable[[Dict[str, Any]], None]) -> None:
+    _register_view('load', fn, _push_load_update)
 
 
-def register_table_updater(fn: Callable[[List[Dict[str, Any]]], None]) -> None:
-    global _table_updater
-    _table_updater = fn
-    _push_table_update()
+def register_trace_updater(fn: Callable[[List[Dict[str, Any]]], None]) -> None:
+    _register_view('trace', fn, _push_trace_update)
 
 
-def register_chart_updater(fn: Callable[[List[str], List[int]], None]) -> None:
-    global _chart_updater
-    _chart_updater = fn
-    _push_chart_update()
+def register_plot_updater(fn: Callable[[Dict[str, Any]], None]) -> None:
+    _register_view('plot', fn, _push_plot_update)
+
+
+def _register_view(name: str, fn: Callable[..., None], push: Callable[[], None]) -> None:
+    hub.current().views[name] = fn
+    _scheduler.register(name, push)
+    # Only the new view is filled now; the others are already up to date
+    try:
+        fn(*_VIEW_DATA[name]())
+    except Exception:
+        pass
 
 
 def register_log(write: Callable[[str], None], clear: Callable[[], None]) -> None:
-    global _log_writer, _log_clearer
-    _log_writer = write
-    _log_clearer = clear
-    # Flush existing backlog into the UI when the logger attaches
-    if _log_writer:
-        for line in _log_buffer:
-            _log_writer(line)
+    _scheduler.register('log', _push_log_update)
+    # Consoles already open get the pending lines first, then the new one the backlog
+    _push_log_update()
+    subscription = hub.current()
+    subscription.log_writer = write
+    subscription.log_clearer = clear
+    if _log_buffer:
+        write('\n'.join(_log_buffer))
 
 
 def register_connection_indicator(label: Any) -> None:
-    _connection_labels.append(label)
+    hub.current().connection_labels.append(label)
     _apply_connection_state()
 
 
+def client_filter() -> str:
+    """The current client's table filter."""
+    return hub.current().filter_text
+
+
 def set_connection_state(connected: bool, message: str) -> None:
     _connection_state['connected'] = bool(connected)
     _connection_state['message'] = str(message)
@@ -105,7 +188,8 @@ def set_connection_state(connected: bool, message: str) -> None:
 def _apply_connection_state() -> None:
     color = '#10B981' if _connection_state['connected'] else '#EF4444'
     text = _connection_state['message']
-    for label in list(_connection_labels):
+    labels = [label for subscription in hub.subscriptions() for label in subscription.connection_labels]
+    for label in labels:
         try:
             label.set_text(text)
             label.style(f'color: {color}')
@@ -118,12 +202,17 @@ def _apply_connection_state() -> None:
 
 
 def _apply_dark_mode() -> None:
-    if not _dark_mode_controller:
-        return
-    if _dark_mode_enabled:
-        _dark_mode_controller.enable()
-    else:
-        _dark_mode_controller.disable()
+    for subscription in hub.subscriptions():
+        controller = subscription.dark_mode
+        if controller is None:
+            continue
+        try:
+            if _dark_mode_enabled:
+                controller.enable()
+            else:
+                controller.disable()
+        except Exception:
+            continue
 
 
 def seconds_since_last_frame() -> Optional[float]:
@@ -133,57 +222,374 @@ def seconds_since_last_frame() -> Optional[float]:
 
 
 def append_can_frame(frame: Dict[str, Any]) -> None:
-    global _frame_seq, _start_ts_us, _last_frame_monotonic
-
     try:
         ts_us = int(frame.get('ts_us') or frame.get('timestamp_us') or 0)
     except Exception:
         ts_us = 0
     if ts_us < 0:
         ts_us = 0
-    if _start_ts_us is None and ts_us:
-        _start_ts_us = ts_us
-    base_ts = _start_ts_us or ts_us or 0
-    relative_ms = float(ts_us - base_ts) / 1000.0 if base_ts else 0.0
 
     try:
         identifier = int(frame.get('id') or 0)
     except Exception:
         identifier = 0
-    extended = bool(frame.get('ext'))
-    rtr = bool(frame.get('rtr'))
+    flags = 0
+    if frame.get('ext'):
+        flags |= FLAG_EXT
+    if frame.get('rtr'):
+        flags |= FLAG_RTR
     try:
         dlc = int(frame.get('dlc') or 0)
     except Exception:
         dlc = 0
 
-    data_bytes = _coerce_data_bytes(frame.get('data'), dlc)
-    raw = str(frame.get('raw') or frame.get('raw_line') or frame.get('raw_text') or '')
+    payload = bytes(_coerce_data_bytes(frame.get('data'), dlc))
+    raw = ''
+    if _KEEP_RAW_TEXT:
+        raw = str(frame.get('raw') or frame.get('raw_line') or frame.get('raw_text') or '')
+    try:
+        channel = min(max(int(frame.get('channel') or 0), 0), 0xFF)
+    except Exception:
+        channel = 0
+    seq = frame.get('seq')
+    if seq is not None:
+        try:
+            _track_seq(channel, int(seq) & _SEQ_MASK)
+        except (TypeError, ValueError):
+            pass
+    append_frame(ts_us, identifier, flags, dlc, payload, raw, channel)
+
+
+def append_frame(
+    ts_us: int, identifier: int, flags: int, dlc: int, payload: bytes, raw: str = '', channel: int = 0
+) -> None:
+    """Store one frame whose fields are already typed (no coercion).
+
+    Used by the binary decoder and the fast-path line parser; anything else
+    should go through :func:`append_can_frame`.
+    """
+    _store_frame(ts_us, identifier, flags, dlc, payload, raw, channel)
+    _mark_frames_dirty()
+
+
+def append_frames(frames: Iterable[Dict[str, Any]]) -> None:
+    """Store a decoded batch, marking the views dirty once for all of it.
+
+    Frames with a ``bytes`` payload (binary batches, fast-parsed lines) are
+    stored as they are; anything else is coerced like :func:`append_can_frame`.
+    """
+    store = _store_frame
+    stored = False
+    for frame in frames:
+        data = frame.get('data')
+        if isinstance(data, bytes):
+            flags = (FLAG_EXT if frame['ext'] else 0) | (FLAG_RTR if frame['rtr'] else 0)
+            raw = ''
+            if _KEEP_RAW_TEXT:
+                raw = frame.get('raw') or ''
+                if isinstance(raw, bytes):
+                    raw = raw.decode('utf-8', 'replace')
+            channel = frame.get('channel', 0)
+            seq = frame.get('seq')
+            if seq is not None:
+                _track_seq(channel, seq)
+            store(frame['ts_us'], frame['id'], flags, frame['dlc'], data, raw, channel)
+            stored = True
+        else:
+            append_can_frame(frame)
+    if stored:
+        _mark_frames_dirty()
+
+
+def _track_seq(channel: int, seq: int) -> None:
+    """Count the frames missing between a channel's consecutive sequence numbers.
+
+    A number at or behind the previous one (more than half the range back)
+    means the sniffer restarted; that is counted as a reset, not a gap.
+    """
+    last = _last_seq.get(channel)
+    _last_seq[channel] = seq
+    if last is None:
+        return
+    gap = (seq - last - 1) & _SEQ_MASK
+    if not gap:
+        return
+    if gap <= _SEQ_MASK >> 1:
+        _seq_gaps[channel] = _seq_gaps.get(channel, 0) + gap
+    else:
+        _seq_resets[channel] = _seq_resets.get(channel, 0) + 1
+
+
+def update_device_status(channel: int, status: Dict[str, Any]) -> None:
+    """Keep the latest drop counters a sniffer reported in its status line."""
+    current = _device_status.setdefault(channel, {})
+    for key in ('oracle_dropped', 'twai_rx_missed', 'twai_rx_overrun', 'queue_waiting', 'next_seq'):
+        try:
+            current[key] = int(status.get(key) or 0)
+        except (TypeError, ValueError):
+            continue
+    current['updated'] = int(time.time())
+
+
+def count_corrupt_line() -> None:
+    """Note a line that claimed to be a frame but could not be parsed."""
+    global _corrupt_lines
+    _corrupt_lines += 1
+
+
+def register_drop_source(name: str, counters: Callable[[], Dict[str, int]]) -> None:
+    """Add a component's drop counters (e.g. the serial reader queue) to :func:`drop_counters`."""
+    _drop_sources[name] = counters
+
+
+def drop_counters() -> Dict[str, Any]:
+    """Every place frames can be lost, from the CAN controller to the views.
+
+    ``device`` holds each sniffer's own counters (TWAI RX FIFO misses and
+    overruns, frames its USB queue dropped), ``sequence`` the frames missing
+    from each channel's sequence numbers since the last clear (anything lost
+    between the sniffer's queue and the frame store, transport included) and
+    the remaining keys the host-side sources registered with
+    :func:`register_drop_source`.
+    """
+    device = {channel: dict(status) for channel, status in sorted(_device_status.items())}
+    out: Dict[str, Any] = {
+        'device': device,
+        'sequence': {
+            channel: {'gaps': _seq_gaps.get(channel, 0), 'resets': _seq_resets.get(channel, 0)}
+            for channel in sorted(_last_seq)
+        },
+        'corrupt_lines': _corrupt_lines,
+    }
+    totals = {
+        'twai_rx_missed': sum(status.get('twai_rx_missed', 0) for status in device.values()),
+        'twai_rx_overrun': sum(status.get('twai_rx_overrun', 0) for status in device.values()),
+        'oracle_queue': sum(status.get('oracle_dropped', 0) for status in device.values()),
+        'sequence_gaps': sum(_seq_gaps.values()),
+    }
+    for name, source in list(_drop_sources.items()):
+        try:
+            counters = source()
+        except Exception:
+            continue
+        out[name] = counters
+    out['totals'] = totals
+    return out
+
+
+def _store_frame(
+    ts_us: int, identifier: int, flags: int, dlc: int, payload: bytes, raw: str = '', channel: int = 0
+) -> None:
+    global _start_ts_us
+
+    if _start_ts_us is None and ts_us:
+        _start_ts_us = ts_us
+    if channel not in _channel_offset_us:
+        _align_channel(channel, ts_us)
+    _frame_store.append(
+        ts_us,
+        identifier & 0xFFFFFFFF,
+        flags,
+        min(max(dlc, 0), 0xFF),
+        payload,
+        raw,
+        channel,
+    )
+    _trace.update(ts_us, identifier, flags, dlc, payload, channel)
+    stats = _bus_stats.get(channel)
+    if stats is None:
+        stats = _bus_stats[channel] = BusStats(_bus_bitrate)
+    stats.update(ts_us, identifier, bool(flags & FLAG_EXT), dlc, bool(flags & FLAG_RTR))
+    plots = _plotted_ids.get(identifier)
+    if plots:
+        values = _decoders[identifier].decode(payload)
+        for plot in plots:
+            plot.add(ts_us, values.get(plot.name))
+        _scheduler.mark_dirty('plot')
+
+
+def _align_channel(channel: int, ts_us: int) -> None:
+    """Place a channel's first frame next to the newest frame already stored.
+
+    Every sniffer counts microseconds from its own boot, so device timestamps
+    of different channels are not comparable. The first channel keeps its
+    clock; each later one is offset so that its first frame lines up with
+    the latest frame received from any other channel.
+    """
+    offset = 0
+    store = _frame_store
+    if _channel_offset_us and len(store):
+        last = store.last_seq
+        reference = store.ts_us[store.slot(last)] + _channel_offset_us.get(store.channel(last), 0)
+        offset = reference - ts_us
+    _channel_offset_us[channel] = offset
+
+
+def _mark_frames_dirty() -> None:
+    global _last_frame_monotonic
+
+    _last_frame_monotonic = time.monotonic()
+    _scheduler.mark_dirty('table')
+    _scheduler.mark_dirty('chart')
+    _scheduler.mark_dirty('trace')
+    _scheduler.mark_dirty('load')
+    if metrics.ENABLED:
+        _note_frame_clock(_last_frame_monotonic)
+
+
+def _newest_frame() -> Optional[Tuple[int, int, int]]:
+    """(seq, device ts_us, channel) of the newest stored frame."""
+    seq = _frame_store.last_seq
+    if seq < _frame_store.first_seq:
+        return None
+    slot = _frame_store.slot(seq)
+    return seq, _frame_store.ts_us[slot], _frame_store.channels[slot]
+
+
+def _note_frame_clock(now: float) -> None:
+    """Track how far each channel's device clock is behind the host's.
+
+    Device timestamps count from the sniffer's boot, so latency is measured
+    against the smallest host-minus-device difference seen (the fastest
+    frame). The minimum is kept over two 10 s windows so clock drift between
+    sniffer and host does not accumulate.
+    """
+    newest = _newest_frame()
+    if newest is None or not newest[1]:
+        return
+    _, ts_us, channel = newest
+    offset = now * 1e6 - ts_us
+    entry = _clock_offsets.get(channel)
+    if entry is None:
+        _clock_offsets[channel] = [offset, offset, now]
+    elif now - entry[2] >= _CLOCK_WINDOW_S:
+        _clock_offsets[channel] = [entry[1], offset, now]
+    elif offset < entry[1]:
+        entry[1] = offset
+
+
+def _observe_frame_latency() -> None:
+    """Record device-timestamp-to-render latency of the newest frame, once per frame."""
+    global _latency_seq
+    newest = _newest_frame()
+    if newest is None or newest[0] == _latency_seq:
+        return
+    seq, ts_us, channel = newest
+    _latency_seq = seq
+    entry = _clock_offsets.get(channel)
+    if entry is None or not ts_us:
+        return
+    latency_us = time.monotonic() * 1e6 - ts_us - min(entry[0], entry[1])
+    metrics.FRAME_TO_RENDER_SECONDS.observe(max(latency_us, 0.0) / 1e6)
+
+
+def _frames_appended() -> int:
+    return _frames_before_clear + _frame_store.total
 
-    _frame_seq += 1
-    can_frame = CanFrame(
-        seq=_frame_seq,
+
+def _frame_at(seq: int) -> CanFrame:
+    """Materialise a stored frame; only done for rows that are displayed."""
+    _, ts_us, identifier, flags, dlc, payload = _frame_store.row(seq)
+    channel = _frame_store.channel(seq)
+    base_ts = _start_ts_us or ts_us or 0
+    aligned_ts = ts_us + _channel_offset_us.get(channel, 0)
+    relative_ms = float(aligned_ts - base_ts) / 1000.0 if base_ts else 0.0
+    return CanFrame(
+        seq=seq,
         ts_us=ts_us,
         relative_ms=relative_ms,
         identifier=identifier,
-        extended=extended,
-        rtr=rtr,
+        extended=bool(flags & FLAG_EXT),
+        rtr=bool(flags & FLAG_RTR),
         dlc=dlc,
-        data_bytes=data_bytes,
-        raw=raw,
+        data_bytes=list(payload),
+        raw=_frame_store.raw_text(seq),
+        channel=channel,
     )
 
-    _frame_history.append(can_frame)
-    _id_counts[identifier] += 1
-    _last_frame_monotonic = time.monotonic()
-    _push_table_update()
-    _push_chart_update()
+
+def iter_history(
+    start_ms: Optional[float] = None,
+    end_ms: Optional[float] = None,
+    filtered: bool = False,
+    chunk_size: int = 4096,
+    filter_text: Optional[str] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Stored frames oldest first, in chunks, for export.
+
+    ``start_ms``/``end_ms`` use the table's time column (ms since the first
+    frame); ``filtered`` restricts the output to ``filter_text`` (by default
+    the filter set with :func:`set_filter`).
+
+    Call this on the event loop: the frames and the filter matches are
+    copied here, and the returned iterator only reads that copy, so it can
+    be consumed by a worker thread while new frames keep arriving.
+    """
+    base_ts = _start_ts_us or 0
+    low = None if start_ms is None else base_ts + int(start_ms * 1000)
+    high = None if end_ms is None else base_ts + int(end_ms * 1000)
+    snapshot = _frame_store.snapshot()
+    # The time column puts every channel on the shared timeline
+    offsets = dict(_channel_offset_us)
+    seqs: Optional[array] = None
+    if filtered:
+        cache = _filter_cache_for(_filter_text if filter_text is None else filter_text)
+        if cache is not None:
+            seqs = array('Q', _filtered_seqs(cache))
+    return _history_chunks(snapshot, seqs, offsets, low, high, chunk_size)
+
+
+def _history_chunks(
+    snapshot: StoreSnapshot,
+    seqs: Optional[array],
+    offsets: Dict[int, int],
+    low: Optional[int],
+    high: Optional[int],
+    chunk_size: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    positions: Iterable[int]
+    if seqs is None:
+        positions = range(len(snapshot))
+    else:
+        positions = (seq - snapshot.first_seq for seq in seqs)
+    ts_column, ids, flags_column, dlc_column = snapshot.ts_us, snapshot.ids, snapshot.flags, snapshot.dlc
+    channels, payload = snapshot.channels, snapshot.payload
+    chunk: List[Dict[str, Any]] = []
+    ranged = low is not None or high is not None
+    for index in positions:
+        ts_us = ts_column[index]
+        if ranged:
+            aligned = ts_us + offsets.get(channels[index], 0)
+            if (low is not None and aligned < low) or (high is not None and aligned > high):
+                continue
+        flags = flags_column[index]
+        dlc = dlc_column[index]
+        chunk.append(
+            {
+                'id': ids[index],
+                'ts_us': ts_us,
+                'dlc': dlc,
+                'ext': bool(flags & FLAG_EXT),
+                'rtr': bool(flags & FLAG_RTR),
+                'data': payload[index * 8 : index * 8 + min(dlc, 8)],
+                'channel': channels[index],
+            }
+        )
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def frame_count() -> int:
+    return len(_frame_store)
 
 
 def _coerce_data_bytes(raw: Any, dlc: int) -> List[int]:
     if raw is None:
         return []
-    if isinstance(raw, (bytes, bytearray)):
+    if isinstance(raw, (bytes, bytearray, memoryview)):
         values = list(raw)
     elif isinstance(raw, Iterable) and not isinstance(raw, (str, dict)):
         try:
@@ -204,14 +610,32 @@ def _coerce_data_bytes(raw: Any, dlc: int) -> List[int]:
 
 
 def set_filter(text: str) -> None:
+    """Set the default filter: an expression (see gui.filters) or free text.
+
+    It applies to :func:`query_frames` and :func:`iter_history` calls that
+    do not name a filter; dashboard tables use :func:`set_client_filter`.
+    """
     global _filter_text
-    _filter_text = text.strip().lower()
-    _push_table_update()
+    _filter_text = text.strip()
+    _prune_filter_caches()
+    _scheduler.mark_dirty('table')
+
+
+def set_client_filter(text: str) -> None:
+    """Set the current client's table filter and refresh only that table."""
+    subscription = hub.current()
+    subscription.filter_text = text.strip()
+    _prune_filter_caches()
+    table = subscription.views.get('table')
+    if table is not None:
+        try:
+            table()
+        except Exception:
+            pass
 
 
 def register_dark_mode_controller(controller: DarkMode) -> None:
-    global _dark_mode_controller
-    _dark_mode_controller = controller
+    hub.current().dark_mode = controller
     _apply_dark_mode()
 
 
@@ -231,14 +655,27 @@ def dark_mode_enabled() -> bool:
 
 
 def clear_frames() -> None:
-    global _frame_seq, _start_ts_us, _last_frame_monotonic
-    _frame_history.clear()
-    _id_counts.clear()
-    _frame_seq = 0
+    global _start_ts_us, _last_frame_monotonic, _frames_before_clear, _latency_seq
+    _frames_before_clear += _frame_store.total
+    _latency_seq = 0
+    _frame_store.clear()
+    _bus_stats.clear()
+    _channel_offset_us.clear()
+    for plot in _plots.values():
+        plot.series.clear()
+        plot.envelope.clear()
+    _trace.clear()
+    _filter_caches.clear()
+    _last_seq.clear()
+    _seq_gaps.clear()
+    _seq_resets.clear()
     _start_ts_us = None
     _last_frame_monotonic = None
-    _push_table_update()
-    _push_chart_update()
+    _scheduler.mark_dirty('table')
+    _scheduler.mark_dirty('chart')
+    _scheduler.mark_dirty('trace')
+    _scheduler.mark_dirty('load')
+    _scheduler.mark_dirty('plot')
 
 
 def append_log(text: str) -> None:
@@ -246,100 +683,645 @@ def append_log(text: str) -> None:
         return
     lines = str(text).splitlines() or ['']
     for line in lines:
-        entry = line.rstrip('\r')
-        _log_buffer.append(entry)
-        if len(_log_buffer) > _MAX_LOG_LINES:
-            # deque already caps length, but pop left to be explicit
-            try:
-                _log_buffer.popleft()
-            except Exception:
-                pass
-        if _log_writer:
-            try:
-                _log_writer(entry)
-            except Exception:
-                continue
+        _log_batcher.add(line.rstrip('\r'))
+    _scheduler.mark_dirty('log')
+
+
+def _drain_log() -> List[str]:
+    lines = _log_batcher.flush()
+    _log_buffer.extend(lines)
+    return lines
+
+
+def _push_log_update() -> None:
+    lines = _drain_log()
+    if not lines:
+        return
+    text = '\n'.join(lines)
+    for subscription in hub.subscriptions():
+        if subscription.log_writer is None:
+            continue
+        try:
+            subscription.log_writer(text)
+        except Exception:
+            subscription.failures += 1
+
+
+def set_log_rate(max_lines_per_s: float) -> None:
+    """Cap the lines per second sent to the log consoles (0 for no cap)."""
+    _log_batcher.set_rate(max_lines_per_s)
+
+
+def set_log_file(path: Optional[str], max_bytes: Optional[int] = None, backups: Optional[int] = None) -> None:
+    """Write the full log to ``path`` (rotated at ``max_bytes``), or nowhere for ``None``."""
+    if path is None:
+        _log_batcher.set_log_file(None)
+        return
+    _log_batcher.set_log_file(
+        RotatingLogFile(
+            path,
+            DEFAULT_LOG_MAX_BYTES if max_bytes is None else max_bytes,
+            DEFAULT_LOG_BACKUPS if backups is None else backups,
+        )
+    )
+
+
+def log_stats() -> Dict[str, Any]:
+    """Lines logged, shown, collapsed into repeats and left out by the rate cap."""
+    return _log_batcher.stats()
+
+
+def render_tick() -> int:
+    """Push pending view updates; called from the UI timer."""
+    return _scheduler.tick()
+
+
+def render_interval() -> float:
+    return _scheduler.interval
+
+
+def register_render_timer(timer: Any) -> None:
+    """The current client's render timer; :func:`set_render_rate` retimes it."""
+    hub.current().render_timer = timer
+
+
+def set_render_rate(max_hz: float) -> None:
+    """Render at most ``max_hz`` times per second, in every open client."""
+    _scheduler.set_max_hz(max_hz)
+    for subscription in hub.subscriptions():
+        if subscription.render_timer is not None:
+            subscription.render_timer.interval = _scheduler.interval
+
+
+def render_stats() -> Dict[str, Dict[str, float]]:
+    """Per-view render counts, coalesced updates and render durations."""
+    return _scheduler.stats()
 
 
 def clear_log() -> None:
+    _log_batcher.clear()
     _log_buffer.clear()
-    if _log_clearer:
+    for subscription in hub.subscriptions():
+        if subscription.log_clearer is None:
+            continue
         try:
-            _log_clearer()
+            subscription.log_clearer()
         except Exception:
-            pass
+            subscription.failures += 1
 
 
 def top_identifier_stats(limit: int = 12) -> List[tuple[str, int]]:
-    common = _id_counts.most_common(limit)
-    return [(f"0x{id_:08X}", count) for id_, count in common]
+    return [(_identifier_label(row), row['count']) for row in identifier_timing(limit)]
+
+
+def identifier_timing(limit: int = 12) -> List[Dict[str, Any]]:
+    """Busiest identifiers with channel, count, mean period and jitter (ms)."""
+    ranked = heapq.nlargest(
+        limit,
+        ((channel, id_, timing) for channel, stats in _bus_stats.items() for id_, timing in stats.top_ids(limit)),
+        key=lambda item: item[2].count,
+    )
+    return [
+        {
+            'channel': channel,
+            'id': id_,
+            'count': timing.count,
+            'period_ms': timing.mean_us / 1000.0,
+            'jitter_ms': timing.jitter_us / 1000.0,
+        }
+        for channel, id_, timing in ranked
+    ]
+
+
+def _identifier_label(row: Dict[str, Any]) -> str:
+    label = f"0x{row['id']:08X}"
+    if len(_bus_stats) > 1:
+        return f"CH{row['channel']} {label}"
+    return label
+
+
+def bus_summary() -> Dict[str, Any]:
+    """Frame rates over 1 s/10 s/60 s and the estimated bus load.
+
+    With several channels the rates are summed and the load is that of the
+    busiest channel; :func:`channel_summaries` has the per-channel numbers.
+    """
+    summaries = list(channel_summaries().values())
+    if not summaries:
+        return BusStats(_bus_bitrate).summary()
+    if len(summaries) == 1:
+        return summaries[0]
+    first = summaries[0]
+    return {
+        'bitrate': _bus_bitrate,
+        'total_frames': sum(summary['total_frames'] for summary in summaries),
+        'frames_per_s': {
+            window: sum(summary['frames_per_s'][window] for summary in summaries) for window in first['frames_per_s']
+        },
+        'bus_load': {
+            window: max(summary['bus_load'][window] for summary in summaries) for window in first['bus_load']
+        },
+        'ids': sum(summary['ids'] for summary in summaries),
+        'channels': len(summaries),
+    }
+
+
+def refresh_bus_load() -> None:
+    """Re-render the load view without new frames, so a quiet bus reads 0."""
+    if _bus_stats:
+        _scheduler.mark_dirty('load')
+
+
+def channel_summaries() -> Dict[int, Dict[str, Any]]:
+    """:meth:`BusStats.summary` per channel, plus the channel's frames in the store."""
+    out: Dict[int, Dict[str, Any]] = {}
+    now = time.monotonic()
+    for channel in sorted(_bus_stats):
+        summary = _bus_stats[channel].summary(now)
+        summary['stored_frames'] = _frame_store.channel_count(channel)
+        out[channel] = summary
+    return out
+
+
+def bus_bitrate() -> int:
+    return _bus_bitrate
+
+
+def set_bus_bitrate(bitrate: int, channel: Optional[int] = None) -> None:
+    """Bitrate used for the load estimate, for one channel or all of them."""
+    global _bus_bitrate
+    if channel is None:
+        if bitrate <= 0:
+            raise ValueError('bitrate must be positive')
+        _bus_bitrate = int(bitrate)
+        for stats in _bus_stats.values():
+            stats.set_bitrate(bitrate)
+    else:
+        stats = _bus_stats.get(channel)
+        if stats is None:
+            stats = _bus_stats[channel] = BusStats(_bus_bitrate)
+        stats.set_bitrate(bitrate)
+    _scheduler.mark_dirty('load')
+
+
+def set_merge_channels(enabled: bool) -> None:
+    """Order the table by timestamp across channels (True) or by arrival."""
+    global _merge_channels
+    _merge_channels = bool(enabled)
+    _scheduler.mark_dirty('table')
+
+
+def merge_channels() -> bool:
+    return _merge_channels
 
 
 def _push_table_update() -> None:
-    if not _table_updater:
+    # Each table pulls its own page back through query_frames(); clients
+    # with the same filter share its cached matches
+    _prune_filter_caches()
+    hub.fan_out('table')
+    if metrics.ENABLED:
+        _observe_frame_latency()
+
+
+def query_frames(
+    page: int = 1,
+    rows_per_page: int = 20,
+    sort_by: Optional[str] = None,
+    descending: bool = True,
+    filter_text: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Return one formatted table page and the total number of matches.
+
+    Frames are kept in arrival order, so the default (time) order maps a page
+    straight onto sequence numbers. The other sort columns have an index per
+    value (identifier, DLC, channel) kept as frames arrive, so a sorted page
+    walks those in key order instead of sorting the history. ``filter_text``
+    defaults to the filter set with :func:`set_filter`.
+    """
+    cache = _filter_cache_for(_filter_text if filter_text is None else filter_text)
+    seqs = _filtered_seqs(cache)
+    total = len(seqs)
+    if rows_per_page <= 0 or rows_per_page > _MAX_PAGE_ROWS:
+        rows_per_page = _MAX_PAGE_ROWS
+    start = max(0, (max(page, 1) - 1) * rows_per_page)
+    stop = min(start + rows_per_page, total)
+    if start >= stop:
+        return [], total
+
+    column = _SORT_COLUMNS.get(sort_by or '')
+    if column is None and _merge_channels and len(_frame_store.present_channels()) > 1:
+        picked = _merged_page(start, stop, descending, cache)
+    elif column is None:
+        if descending:
+            picked = [seqs[total - 1 - i] for i in range(start, stop)]
+        else:
+            picked = [seqs[i] for i in range(start, stop)]
+    else:
+        if cache is None:
+            groups = _frame_store.index_groups(column)
+        else:
+            groups = {key: (group, 0) for key, group in _filtered_groups(cache, column).items()}
+        picked = sorted_page(groups, start, stop, descending)
+    rows = []
+    for seq in picked:
+        frame = _frame_at(seq)
+        row = _table_row(frame)
+        message = _decoders.get(frame.identifier)
+        if message is not None:
+            row['signals'] = _format_signals(message, bytes(frame.data_bytes))
+        rows.append(row)
+    return rows, total
+
+
+def load_dbc(path: str) -> int:
+    """Load a DBC file for signal decoding; returns the number of messages."""
+    global _dbc
+    database = dbc.load_dbc(path)
+    _dbc = database
+    _decoders.clear()
+    _decoders.update(database.messages)
+    clear_signal_plots()
+    _scheduler.mark_dirty('table')
+    return len(database)
+
+
+def clear_dbc() -> None:
+    global _dbc
+    _dbc = None
+    _decoders.clear()
+    clear_signal_plots()
+    _scheduler.mark_dirty('table')
+
+
+def dbc_loaded() -> bool:
+    return _dbc is not None
+
+
+def signal_catalog() -> List[Dict[str, Any]]:
+    """Decodable signals: message name, identifier, signal name and unit."""
+    out: List[Dict[str, Any]] = []
+    for identifier in sorted(_decoders):
+        message = _decoders[identifier]
+        for signal in message.signals:
+            out.append({'id': identifier, 'message': message.name, 'signal': signal.name, 'unit': signal.unit})
+    return out
+
+
+def decode_signals(
+    identifier: int,
+    start_seq: Optional[int] = None,
+    names: Optional[Sequence[str]] = None,
+) -> Dict[str, List[Any]]:
+    """Decode every stored frame of one identifier in a single batch.
+
+    Returns ``{'seq': [...], 'ts_us': [...], <signal>: [...]}`` column lists.
+    ``names`` restricts the result to some signals. Unknown identifiers
+    return an empty dict.
+    """
+    message = _decoders.get(identifier)
+    if message is None:
+        return {}
+    seqs = _frame_store.id_seqs(identifier, start_seq)
+    store = _frame_store
+    ts_column = store.ts_us
+    columns: Dict[str, List[Any]] = {
+        'seq': list(seqs),
+        'ts_us': [ts_column[slot] for slot in map(store.slot, seqs)],
+    }
+    decoded = message.decode_many(store.payloads(seqs))
+    for name, values in decoded.items():
+        if names is None or name in names:
+            columns[name] = values
+    return columns
+
+
+def add_signal_plot(identifier: int, name: str, mode: str = 'lttb') -> SignalPlot:
+    """Start plotting a decoded signal, backfilled from the stored history."""
+    message = _decoders.get(identifier)
+    signal = message.signal(name) if message is not None else None
+    if message is None or signal is None:
+        raise KeyError(f'unknown signal {name!r} for identifier 0x{identifier:X}')
+    key = (identifier, name)
+    plot = _plots.get(key)
+    if plot is None:
+        plot = SignalPlot(name, unit=signal.unit, mode=mode)
+        columns = decode_signals(identifier, names=[name])
+        plot.extend(columns.get('ts_us', []), columns.get(name, []))
+        _plots[key] = plot
+        _plotted_ids.setdefault(identifier, []).append(plot)
+        _apply_plot_view(plot)
+    _scheduler.mark_dirty('plot')
+    return plot
+
+
+def remove_signal_plot(identifier: int, name: str) -> None:
+    plot = _plots.pop((identifier, name), None)
+    if plot is None:
         return
-    rows: List[Dict[str, Any]] = []
-    for frame in reversed(_frame_history):
-        if _filter_text and not _matches_filter(frame):
-            continue
-        rows.append(
+    plots = _plotted_ids.get(identifier, [])
+    plots.remove(plot)
+    if not plots:
+        _plotted_ids.pop(identifier, None)
+    _scheduler.mark_dirty('plot')
+
+
+def clear_signal_plots() -> None:
+    _plots.clear()
+    _plotted_ids.clear()
+    _scheduler.mark_dirty('plot')
+
+
+def set_plot_view(start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> None:
+    """Zoom the signal plot (ms since the first frame); ``None`` shows everything."""
+    global _plot_view_ms
+    _plot_view_ms = None if start_ms is None or end_ms is None else (float(start_ms), float(end_ms))
+    for plot in _plots.values():
+        _apply_plot_view(plot)
+    _scheduler.mark_dirty('plot')
+
+
+def set_plot_width(width_px: int) -> None:
+    """Chart width in pixels; plots are downsampled to about this many points."""
+    for plot in _plots.values():
+        plot.set_width(width_px)
+    _scheduler.mark_dirty('plot')
+
+
+def _apply_plot_view(plot: SignalPlot) -> None:
+    if _plot_view_ms is None:
+        plot.set_view(None, None)
+        return
+    base_ts = _start_ts_us or 0
+    plot.set_view(base_ts + int(_plot_view_ms[0] * 1000), base_ts + int(_plot_view_ms[1] * 1000))
+
+
+def signal_plot_data() -> Dict[str, Any]:
+    """Downsampled series for the signal chart, x in ms since the first frame."""
+    base_ts = _start_ts_us or 0
+    series: List[Dict[str, Any]] = []
+    first: Optional[int] = None
+    last: Optional[int] = None
+    for plot in _plots.values():
+        if plot.series.first_ts is not None:
+            first = plot.series.first_ts if first is None else min(first, plot.series.first_ts)
+            last = plot.series.last_ts if last is None else max(last, plot.series.last_ts)
+        series.append(
             {
-                'seq': frame.seq,
-                'timestamp': f"{frame.relative_ms:,.3f}",
-                'id_hex': frame.id_hex,
-                'id_dec': frame.identifier,
-                'dlc': frame.dlc,
-                'data': ' '.join(frame.data_hex_pairs) if frame.data_hex_pairs else '—',
-                'flags': frame.flags_label,
+                'name': f'{plot.name} ({plot.unit})' if plot.unit else plot.name,
+                'points': [[(ts - base_ts) / 1000.0, value] for ts, value in plot.points()],
             }
         )
-    try:
-        _table_updater(rows)
-    except Exception:
-        pass
+    return {
+        'series': series,
+        'range_ms': None if first is None or last is None else ((first - base_ts) / 1000.0, (last - base_ts) / 1000.0),
+        'view_ms': _plot_view_ms,
+    }
 
 
-def _push_chart_update() -> None:
-    if not _chart_updater:
+def _format_signals(message: DbcMessage, payload: bytes) -> str:
+    values = message.decode(payload)
+    parts = []
+    for signal in message.signals:
+        if signal.name in values:
+            parts.append(f"{signal.name}={signal.format(values[signal.name])}")
+    return f"{message.name}: " + ', '.join(parts)
+
+
+def _merged_page(start: int, stop: int, descending: bool, cache: Optional[Dict[str, Any]]) -> List[int]:
+    """Rows ``start:stop`` of the filtered frames in timestamp order across channels.
+
+    Each channel's frames are already in device-time order, so the page is a
+    lazy k-way merge of the per-channel sequences on aligned timestamps; only
+    the first ``stop`` entries are ever visited.
+    """
+    if cache is None:
+        # The store's live per-channel index, read in place rather than copied
+        lanes = _frame_store.index_groups('channels')
+    else:
+        lanes = {channel: (seqs, 0) for channel, seqs in _filtered_groups(cache, 'channels').items()}
+    streams = [
+        _timeline(seqs, first, _channel_offset_us.get(channel, 0), descending)
+        for channel, (seqs, first) in lanes.items()
+    ]
+    merged = heapq.merge(*streams, reverse=descending)
+    return [seq for _, seq in islice(merged, start, stop)]
+
+
+def _timeline(seqs: Sequence[int], first: int, offset_us: int, descending: bool) -> Iterator[Tuple[int, int]]:
+    """(aligned timestamp, seq) for ``seqs[first:]``, newest first when ``descending``."""
+    store = _frame_store
+    ts_column = store.ts_us
+    slot = store.slot
+    positions = range(len(seqs) - 1, first - 1, -1) if descending else range(first, len(seqs))
+    for position in positions:
+        seq = seqs[position]
+        yield ts_column[slot(seq)] + offset_us, seq
+
+
+def _filtered_groups(cache: Dict[str, Any], column: str) -> Dict[int, array]:
+    """The filter matches split by ``column`` value, extended as new matches arrive."""
+    seqs = _filtered_seqs(cache)
+    upto, groups = cache['groups'].setdefault(column, [0, {}])
+    first = _frame_store.first_seq
+    for group in groups.values():
+        evicted = bisect_left(group, first)
+        if evicted:
+            del group[:evicted]
+    store = _frame_store
+    values = getattr(store, column)
+    slot = store.slot
+    for seq in seqs[bisect_right(seqs, upto) :]:
+        value = values[slot(seq)]
+        group = groups.get(value)
+        if group is None:
+            group = groups[value] = array('Q')
+        group.append(seq)
+    if seqs:
+        cache['groups'][column][0] = seqs[-1]
+    return groups
+
+
+# Table columns that can be sorted by, and the frame store index behind each
+# ('timestamp' and unsorted both follow arrival order)
+_SORT_COLUMNS = {'id_hex': 'ids', 'id_dec': 'ids', 'dlc': 'dlc', 'channel': 'channels'}
+
+
+def _filter_cache_for(text: str) -> Optional[Dict[str, Any]]:
+    """The shared match cache for ``text``; None when it filters nothing out."""
+    cache = _filter_caches.get(text)
+    if cache is None:
+        compiled = compile_filter(text)
+        if compiled is None:
+            return None
+        cache = _filter_caches[text] = {'filter': compiled}
+        _reset_filter_cache(cache)
+    return cache
+
+
+def _filtered_seqs(cache: Optional[Dict[str, Any]] = None) -> Sequence[int]:
+    if cache is None:
+        return _frame_store.seqs()
+    seqs: array = cache['seqs']
+    # Drop matches that have been overwritten in the ring buffer
+    evicted = bisect_left(seqs, _frame_store.first_seq)
+    if evicted:
+        del seqs[:evicted]
+    last = _frame_store.last_seq
+    if last > cache['upto']:
+        seqs.extend(cache['filter'].scan(_frame_store, cache['upto'] + 1, _start_ts_us or 0, _channel_offset_us))
+        cache['upto'] = last
+    return seqs
+
+
+def _reset_filter_cache(cache: Dict[str, Any]) -> None:
+    cache['seqs'] = array('Q')
+    cache['upto'] = 0
+    # column -> [last seq split up, {value: seqs}]
+    cache['groups'] = {}
+
+
+def _prune_filter_caches(_: Any = None) -> None:
+    """Forget cached matches of filters that no client uses any more."""
+    in_use = {_filter_text}
+    in_use.update(subscription.filter_text for subscription in hub.subscriptions())
+    for text in [text for text in _filter_caches if text not in in_use]:
+        del _filter_caches[text]
+
+
+def _table_row(frame: CanFrame) -> Dict[str, Any]:
+    return {
+        'seq': frame.seq,
+        'timestamp': f"{frame.relative_ms:,.3f}",
+        'channel': frame.channel,
+        'id_hex': frame.id_hex,
+        'id_dec': frame.identifier,
+        'dlc': frame.dlc,
+        'data': ' '.join(frame.data_hex_pairs) if frame.data_hex_pairs else '—',
+        'flags': frame.flags_label,
+        'signals': '',
+    }
+
+
+def _trace_data() -> Tuple[List[Dict[str, Any]]]:
+    return (_trace.rows(),)
+
+
+def _chart_data() -> Tuple[List[str], List[int], List[float]]:
+    stats = identifier_timing()
+    labels = [_identifier_label(row) for row in stats]
+    values = [row['count'] for row in stats]
+    periods = [round(row['period_ms'], 3) for row in stats]
+    return labels, values, periods
+
+
+def _plot_data() -> Tuple[Dict[str, Any]]:
+    return (signal_plot_data(),)
+
+
+def _load_data() -> Tuple[Dict[str, Any]]:
+    return (bus_summary(),)
+
+
+# What each view is called with; computed once per tick for all clients
+_VIEW_DATA: Dict[str, Callable[[], Tuple[Any, ...]]] = {
+    'table': tuple,
+    'trace': _trace_data,
+    'chart': _chart_data,
+    'plot': _plot_data,
+    'load': _load_data,
+}
+
+
+def _push_view(name: str) -> None:
+    if not hub.has_view(name):
         return
-    stats = top_identifier_stats()
-    labels = [label for label, _ in stats]
-    values = [count for _, count in stats]
     try:
-        _chart_updater(labels, values)
+        data = _VIEW_DATA[name]()
     except Exception:
-        pass
+        return
+    hub.fan_out(name, *data)
 
 
-def _matches_filter(frame: CanFrame) -> bool:
-    if not _filter_text:
-        return True
-    haystack = [
-        frame.id_hex.lower(),
-        str(frame.identifier),
-        ' '.join(frame.data_hex_pairs).lower(),
-        frame.flags_label.lower(),
-        frame.raw.lower(),
-    ]
-    token = _filter_text
-    return any(token in fragment for fragment in haystack)
+def _push_trace_update() -> None:
+    _push_view('trace')
+
+
+def _push_chart_update() -> None:
+    _push_view('chart')
+
+
+def _push_plot_update() -> None:
+    _push_view('plot')
+
+
+def _push_load_update() -> None:
+    _push_view('load')
+
+
+hub.on_unsubscribe(_prune_filter_caches)
+metrics.collected(
+    'bolt_frames_appended_total', 'Frames appended to the frame store.', _frames_appended, kind='counter'
+)
+metrics.collected('bolt_frames_stored', 'Frames currently held in the frame store.', frame_count)
 
 
 __all__ = [
+    'add_signal_plot',
     'append_can_frame',
+    'append_frame',
+    'append_frames',
     'append_log',
+    'bus_bitrate',
+    'bus_summary',
+    'channel_summaries',
     'clear_frames',
+    'clear_dbc',
     'clear_log',
+    'clear_signal_plots',
+    'client_filter',
+    'count_corrupt_line',
     'dark_mode_enabled',
+    'dbc_loaded',
+    'decode_signals',
+    'drop_counters',
+    'frame_count',
+    'identifier_timing',
+    'iter_history',
+    'load_dbc',
+    'log_stats',
+    'merge_channels',
     'register_chart_updater',
     'register_connection_indicator',
     'register_dark_mode_controller',
+    'register_drop_source',
+    'register_load_updater',
     'register_log',
+    'register_plot_updater',
+    'register_render_timer',
+    'remove_signal_plot',
+    'query_frames',
     'register_table_updater',
+    'register_trace_updater',
+    'refresh_bus_load',
+    'render_interval',
+    'render_stats',
+    'render_tick',
     'seconds_since_last_frame',
+    'set_bus_bitrate',
+    'set_client_filter',
     'set_connection_state',
     'set_dark_mode',
     'set_filter',
+    'set_log_file',
+    'set_log_rate',
+    'set_merge_channels',
+    'set_plot_view',
+    'set_plot_width',
+    'set_render_rate',
+    'signal_catalog',
+    'signal_plot_data',
     'toggle_dark_mode',
     'top_identifier_stats',
+    'update_device_status',
 ]
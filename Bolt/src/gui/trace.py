@@ -0,0 +1,134 @@
+"""Per-identifier trace view: one row per CAN ID, updated in O(1) per frame."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from gui.frame_store import FLAG_EXT, FLAG_RTR
+
+
+class TraceEntry:
+    __slots__ = (
+        'identifier',
+        'channel',
+        'flags',
+        'dlc',
+        'payload',
+        'count',
+        'last_ts_us',
+        'last_cycle_us',
+        'min_cycle_us',
+        'max_cycle_us',
+        'previous',
+    )
+
+    def __init__(self, identifier: int, channel: int = 0) -> None:
+        self.identifier = identifier
+        self.channel = channel
+        self.flags = 0
+        self.dlc = 0
+        self.payload = b''
+        self.count = 0
+        self.last_ts_us = 0
+        self.last_cycle_us: Optional[int] = None
+        self.min_cycle_us: Optional[int] = None
+        self.max_cycle_us: Optional[int] = None
+        # Payload of the frame before the latest one (None until there is one)
+        self.previous: Optional[bytes] = None
+
+    @property
+    def changed(self) -> int:
+        """Bit i set when payload byte i differs from the previous frame.
+
+        Worked out when a row is displayed rather than for every frame.
+        """
+        payload = self.payload
+        previous = self.previous
+        if previous is None:
+            return (1 << len(payload)) - 1
+        if payload == previous:
+            return 0
+        changed = 0
+        for i, value in enumerate(payload):
+            if i >= len(previous) or previous[i] != value:
+                changed |= 1 << i
+        return changed
+
+
+class TraceTable:
+    """Latest payload, count and cycle-time statistics per identifier.
+
+    Entries are kept per channel: the same ID on two buses is two rows.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, TraceEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def update(self, ts_us: int, identifier: int, flags: int, dlc: int, payload: bytes, channel: int = 0) -> None:
+        key = identifier | channel << 32 if channel else identifier
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = TraceEntry(identifier, channel)
+        else:
+            cycle = ts_us - entry.last_ts_us
+            if cycle >= 0:
+                entry.last_cycle_us = cycle
+                if entry.min_cycle_us is None or cycle < entry.min_cycle_us:
+                    entry.min_cycle_us = cycle
+                if entry.max_cycle_us is None or cycle > entry.max_cycle_us:
+                    entry.max_cycle_us = cycle
+            entry.previous = entry.payload
+        entry.flags = flags
+        entry.dlc = dlc
+        entry.payload = payload
+        entry.count += 1
+        entry.last_ts_us = ts_us
+
+    def entry(self, identifier: int, channel: int = 0) -> Optional[TraceEntry]:
+        return self._entries.get(identifier | channel << 32 if channel else identifier)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Display rows ordered by channel, then identifier."""
+        out: List[Dict[str, Any]] = []
+        for key in sorted(self._entries):
+            entry = self._entries[key]
+            identifier = entry.identifier
+            width = 8 if entry.flags & FLAG_EXT else 3
+            flags = []
+            if entry.flags & FLAG_EXT:
+                flags.append('EXT')
+            if entry.flags & FLAG_RTR:
+                flags.append('RTR')
+            changed = entry.changed
+            out.append(
+                {
+                    'key': key,
+                    'channel': entry.channel,
+                    'id': identifier,
+                    'id_hex': f"0x{identifier:0{width}X}",
+                    'flags': ', '.join(flags) if flags else '—',
+                    'dlc': entry.dlc,
+                    'bytes': [f"{b:02X}" for b in entry.payload],
+                    'changed': [i for i in range(len(entry.payload)) if changed >> i & 1],
+                    'count': entry.count,
+                    'cycle_ms': _ms(entry.last_cycle_us),
+                    'min_ms': _ms(entry.min_cycle_us),
+                    'max_ms': _ms(entry.max_cycle_us),
+                }
+            )
+        return out
+
+
+def _ms(value_us: Optional[int]) -> str:
+    if value_us is None:
+        return '—'
+    return f"{value_us / 1000.0:,.3f}"
+
+
+__all__ = ['TraceEntry', 'TraceTable']
@@ -1,3 +1,3 @@
 """JTAG helpers."""
 
-from .data_processor import process_line  # noqa: F401
+from .data_processor import process_frames, process_item, process_line  # noqa: F401
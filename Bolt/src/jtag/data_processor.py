@@ -3,33 +3,90 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence, Union
 
+from analysis import metrics
+from capture import stream, triggers
+from capture.recorder import active_recorder, record_frame
 from gui import state as st
+from usb_serial.framing import parse_can_line
+
+
+def process_item(item: Union[str, Iterable[Dict[str, Any]], None]) -> None:
+    """Dispatch one item from the serial reader (text line or binary batch)."""
+    if item is None:
+        return
+    if isinstance(item, str):
+        if metrics.ENABLED:
+            started = time.perf_counter()
+            process_line(item)
+            metrics.LINE_PARSE_SECONDS.observe(time.perf_counter() - started)
+        else:
+            process_line(item)
+    else:
+        process_frames(item)
+
+
+def process_frames(frames: Sequence[Dict[str, Any]]) -> None:
+    """Append a decoded batch (binary or fast-parsed lines); frames are already typed."""
+    st.append_frames(frames)
+    recorder = active_recorder()
+    if recorder is not None:
+        recorder.record_many(frames)
+    stream.publish(frames)
+    triggers.offer_frames(frames)
 
 
 def process_line(line: str) -> None:
     """Parse an incoming line from the monitor feed."""
     if line is None:
         return
+    # Lines from secondary sniffers carry their channel (see ChannelLine)
+    channel = getattr(line, 'channel', 0)
     text = line.strip()
     if not text:
         return
 
+    # Lines in the firmware's own layout skip json.loads and the coercion
+    frame = parse_can_line(text.encode('utf-8', 'replace'), channel)
+    if frame is not None:
+        process_frames((frame,))
+        return
+
     payload = _parse_json(text)
     if payload is None:
-        st.append_log(text)
+        _log(text, channel)
         return
 
     msg_type = str(payload.get('type') or '').lower()
     if msg_type == 'can':
         frame = _coerce_can_frame(payload, raw=text)
         if frame is None:
-            st.append_log(text)
+            st.count_corrupt_line()
+            _log(text, channel)
             return
+        frame['channel'] = channel
         st.append_can_frame(frame)
+        record_frame(frame)
+        stream.publish((frame,))
+        triggers.offer_frames((frame,))
+    elif msg_type == 'status':
+        # Periodic drop counters from the sniffer (Oracle_FormatStatus)
+        st.update_device_status(channel, payload)
+        _log(
+            'Sniffer drops: queue {}, RX missed {}, RX overrun {}'.format(
+                payload.get('oracle_dropped', 0), payload.get('twai_rx_missed', 0), payload.get('twai_rx_overrun', 0)
+            ),
+            channel,
+        )
     else:
-        st.append_log(text)
+        _log(text, channel)
+
+
+def _log(text: str, channel: int) -> None:
+    st.append_log(f'[CH{channel}] {text}' if channel else text)
+    triggers.offer_line(text, channel)
 
 
 def _parse_json(text: str) -> Optional[Dict[str, Any]]:
@@ -56,7 +113,7 @@ def _coerce_can_frame(payload: Dict[str, Any], *, raw: str) -> Optional[Dict[str
     rtr = bool(payload.get('rtr') or payload.get('remote'))
     data = payload.get('data')
 
-    return {
+    frame = {
         'id': identifier,
         'ts_us': ts_us,
         'dlc': dlc,
@@ -65,6 +122,10 @@ def _coerce_can_frame(payload: Dict[str, Any], *, raw: str) -> Optional[Dict[str
         'data': data,
         'raw': raw,
     }
+    seq = _coerce_int(payload.get('seq'))
+    if seq is not None:
+        frame['seq'] = seq & 0xFFFF
+    return frame
 
 
 def _coerce_int(value: Any) -> Optional[int]:
@@ -86,4 +147,4 @@ def _coerce_int(value: Any) -> Optional[int]:
         return None
 
 
-__all__ = ['process_line']
+__all__ = ['process_frames', 'process_item', 'process_line']
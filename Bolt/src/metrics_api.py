@@ -0,0 +1,109 @@
+"""Prometheus metrics for the Bolt host pipeline.
+
+``GET /metrics`` returns every metric in the Prometheus text format. Queue
+depths, stored frames and drop counters are always reported; the hot-path
+counters and histograms (bytes read, lines framed, parse and render times,
+frame-to-render latency) only fill while collection is on. Switch it with
+*Collect metrics* in the dashboard or::
+
+    POST /api/metrics   {"enabled": true, "reset": false}
+
+See ``analysis.metrics`` for what is measured where. Per-call profiling of
+the pipeline stages (``gui.profiler``) is started and read back here too::
+
+    POST /api/profile        {"seconds": 10, "stages": [...]}  (stages optional)
+    POST /api/profile/stop   end early; returns the report
+    GET  /api/profile        running session or the last report
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from nicegui import app
+from fastapi import Body, Response
+
+from analysis import metrics
+from capture import stream
+from gui import profiler
+from gui import state as st
+from usb_serial.serial_handler import channels, pending_count
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _queue_depth() -> Dict[str, int]:
+    readers = channels()
+    return {
+        'reader': pending_count(),
+        'decoder_ring': sum(info.get('ring_pending', 0) for info in readers),
+        'stream_clients': sum(client.pending for client in stream.clients()),
+    }
+
+
+def _dropped_frames() -> Dict[str, int]:
+    """``state.drop_counters`` flattened to one number per drop point."""
+    counters = st.drop_counters()
+    out: Dict[str, int] = dict(counters['totals'])
+    out['corrupt_lines'] = counters['corrupt_lines']
+    for source in ('host', 'stream', 'recorder'):
+        for name, value in (counters.get(source) or {}).items():
+            out[name if source == 'host' else f'{source}_{name}'] = value
+    return out
+
+
+def _metrics_endpoint() -> Response:
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+def _settings_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    if 'enabled' in payload:
+        metrics.enable(bool(payload['enabled']))
+    if payload.get('reset'):
+        metrics.reset()
+    return {'ok': True, 'enabled': metrics.enabled()}
+
+
+def _profile_start_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    try:
+        seconds = float(payload.get('seconds', profiler.DEFAULT_SECONDS))
+        profiler.start(seconds, payload.get('stages') or None)
+    except (TypeError, ValueError, RuntimeError) as e:
+        return {'ok': False, 'message': str(e), **profiler.status()}
+    return {'ok': True, **profiler.status()}
+
+
+def _profile_stop_endpoint() -> Dict[str, Any]:
+    return {'ok': True, 'report': profiler.stop()}
+
+
+def _profile_status_endpoint() -> Dict[str, Any]:
+    return profiler.status()
+
+
+def register():
+    metrics.collected('bolt_queue_depth', 'Items waiting between pipeline stages.', _queue_depth, label='queue')
+    metrics.collected(
+        'bolt_dropped_total', 'Frames (or lines) lost, by drop point.', _dropped_frames, kind='counter', label='point'
+    )
+    # Avoid duplicate registration if reloads occur
+    try:
+        app.add_api_route('/metrics', _metrics_endpoint, methods=['GET'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/metrics', _settings_endpoint, methods=['POST'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/profile', _profile_start_endpoint, methods=['POST'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/profile/stop', _profile_stop_endpoint, methods=['POST'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/profile', _profile_status_endpoint, methods=['GET'])
+    except Exception:
+        pass
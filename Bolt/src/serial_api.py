@@ -1,7 +1,18 @@
 from typing import Any, Dict
 from nicegui import app
 from fastapi import Body
-from usb_serial.serial_handler import list_ports, connect, is_connected, selected_port
+from gui import state as st
+from usb_serial.serial_handler import (
+    add_channel,
+    channels,
+    connect,
+    is_connected,
+    list_ports,
+    queue_stats,
+    remove_channel,
+    selected_port,
+    set_queue_policy,
+)
 
 
 def _ports_endpoint() -> Dict[str, Any]:
@@ -17,10 +28,52 @@ def _connect_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
     baud = int(payload.get("baud", 115200))
     if not port:
         return {"ok": False, "message": "Missing 'port'"}
-    ok, msg = connect(port, baud)
+    process = payload.get("process")
+    ok, msg = connect(port, baud, process=None if process is None else bool(process))
     return {"ok": ok, "message": msg, "connected": is_connected(), "selected": selected_port()}
 
 
+def _channels_endpoint() -> Dict[str, Any]:
+    return {"channels": channels()}
+
+
+def _add_channel_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    port = str(payload.get("port", "")).strip()
+    baud = int(payload.get("baud", 115200))
+    name = str(payload.get("name") or "").strip() or None
+    if not port:
+        return {"ok": False, "message": "Missing 'port'"}
+    process = payload.get("process")
+    ok, msg = add_channel(port, baud, name, process=None if process is None else bool(process))
+    return {"ok": ok, "message": msg, "channels": channels()}
+
+
+def _remove_channel_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    try:
+        index = int(payload.get("channel"))
+    except (TypeError, ValueError):
+        return {"ok": False, "message": "Missing 'channel'"}
+    ok, msg = remove_channel(index)
+    return {"ok": ok, "message": msg, "channels": channels()}
+
+
+def _drops_endpoint() -> Dict[str, Any]:
+    return {"drops": st.drop_counters(), "queue": queue_stats()}
+
+
+def _queue_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    policy = payload.get("policy")
+    maxsize = payload.get("maxsize")
+    try:
+        set_queue_policy(
+            None if policy is None else str(policy),
+            None if maxsize is None else int(maxsize),
+        )
+    except (TypeError, ValueError) as e:
+        return {"ok": False, "message": str(e), "queue": queue_stats()}
+    return {"ok": True, "message": "Queue updated", "queue": queue_stats()}
+
+
 def register():
     # Avoid duplicate registration if reloads occur
     try:
@@ -31,4 +84,23 @@ def register():
         app.add_api_route('/api/serial/connect', _connect_endpoint, methods=['POST'])
     except Exception:
         pass
-
+    try:
+        app.add_api_route('/api/serial/channels', _channels_endpoint, methods=['GET'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/serial/channels', _add_channel_endpoint, methods=['POST'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/serial/channels/remove', _remove_channel_endpoint, methods=['POST'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/serial/drops', _drops_endpoint, methods=['GET'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/serial/queue', _queue_endpoint, methods=['POST'])
+    except Exception:
+        pass
@@ -0,0 +1,195 @@
+"""WebSocket frame streaming for automation clients.
+
+Connect to ``/api/stream`` and frames arrive in batches. Options go in the
+query string and the filter can be changed later by sending a JSON text
+message::
+
+    ws://127.0.0.1:8075/api/stream?ids=0x100,0x200&ranges=0x700-0x7FF&format=json
+
+    ids, ranges, channels   server-side filter (see capture.stream.StreamFilter)
+    format                  json (default), msgpack (needs the msgpack package)
+                            or binary (binary_codec batches, no channel)
+    policy                  drop_oldest (default) or disconnect
+    buffer                  frames buffered per client (default 10000)
+    batch                   max frames per message (default 1000)
+    interval_ms             max time frames wait before sending (default 50)
+
+    -> {"type": "filter", "ids": [...], "ranges": [[lo, hi]], "channels": [...]}
+    -> {"type": "stats"}
+
+JSON and msgpack messages look like ``{"type": "frames", "dropped": n,
+"frames": [{"ts_us", "id", "ext", "rtr", "dlc", "data", "channel"}]}`` with
+``data`` as hex (JSON) or bytes (msgpack); ``dropped`` is the client's total
+so far. Overflowing a ``disconnect`` client closes it with code 1013.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from nicegui import app
+from fastapi import WebSocket, WebSocketDisconnect
+
+from capture import stream
+from usb_serial import binary_codec
+
+try:
+    import msgpack
+except ImportError:  # optional, only needed for format=msgpack
+    msgpack = None
+
+FORMATS = ('json', 'msgpack', 'binary')
+_DEFAULT_BATCH = 1000
+_MAX_BATCH = 0xFFFF
+_DEFAULT_INTERVAL_MS = 50
+# Close codes: policy violation (bad options), try again later (overflow)
+_CLOSE_BAD_REQUEST = 1008
+_CLOSE_OVERFLOW = 1013
+
+
+def _payload(data: Any) -> bytes:
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    if isinstance(data, str):
+        try:
+            return bytes.fromhex(data.replace(' ', ''))
+        except ValueError:
+            return b''
+    if isinstance(data, (list, tuple)):
+        return bytes(int(b) & 0xFF for b in data)
+    return b''
+
+
+def _frame_out(frame: Dict[str, Any], hex_data: bool) -> Dict[str, Any]:
+    data = _payload(frame.get('data'))
+    return {
+        'ts_us': frame.get('ts_us', 0),
+        'id': frame.get('id', 0),
+        'ext': bool(frame.get('ext')),
+        'rtr': bool(frame.get('rtr')),
+        'dlc': frame.get('dlc', len(data)),
+        'data': data.hex().upper() if hex_data else data,
+        'channel': frame.get('channel', 0),
+    }
+
+
+def _encode(fmt: str, frames: List[Dict[str, Any]], dropped: int) -> Any:
+    if fmt == 'binary':
+        return binary_codec.encode_batch(
+            {**frame, 'data': _payload(frame.get('data'))} for frame in frames
+        )
+    message = {
+        'type': 'frames',
+        'dropped': dropped,
+        'frames': [_frame_out(frame, fmt == 'json') for frame in frames],
+    }
+    if fmt == 'msgpack':
+        return msgpack.packb(message, use_bin_type=True)
+    return json.dumps(message, separators=(',', ':'))
+
+
+def _int_option(params: Dict[str, str], name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer") from None
+    return min(max(value, lo), hi)
+
+
+async def _send(websocket: WebSocket, data: Any) -> None:
+    if isinstance(data, bytes):
+        await websocket.send_bytes(data)
+    else:
+        await websocket.send_text(data)
+
+
+async def _stream_endpoint(websocket: WebSocket) -> None:
+    await websocket.accept()
+    params = dict(websocket.query_params)
+    try:
+        fmt = params.get('format', 'json')
+        if fmt not in FORMATS:
+            raise ValueError(f"'format' must be one of {', '.join(FORMATS)}")
+        if fmt == 'msgpack' and msgpack is None:
+            raise ValueError('msgpack is not installed on the server')
+        batch = _int_option(params, 'batch', _DEFAULT_BATCH, 1, _MAX_BATCH)
+        interval = _int_option(params, 'interval_ms', _DEFAULT_INTERVAL_MS, 1, 10_000) / 1000.0
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        client = stream.StreamClient(
+            stream.StreamFilter.from_spec(params),
+            max_buffer=_int_option(params, 'buffer', stream.DEFAULT_BUFFER, 1, stream.MAX_BUFFER),
+            policy=params.get('policy', stream.DROP_OLDEST),
+            wake_at=batch,
+            on_ready=lambda: loop.call_soon_threadsafe(wake.set),
+            name=websocket.client.host if websocket.client else '',
+        )
+    except ValueError as exc:
+        await websocket.send_text(json.dumps({'type': 'error', 'message': str(exc)}))
+        await websocket.close(code=_CLOSE_BAD_REQUEST, reason=str(exc)[:120])
+        return
+
+    stream.add_client(client)
+    receiver = asyncio.create_task(_receive_commands(websocket, client))
+    try:
+        while not receiver.done():
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            if client.overflowed:
+                await websocket.send_text(json.dumps({'type': 'overflow', **client.stats()}))
+                await websocket.close(code=_CLOSE_OVERFLOW, reason='client buffer overflow')
+                break
+            while client.pending:
+                frames = client.take(batch)
+                await _send(websocket, _encode(fmt, frames, client.dropped))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        stream.remove_client(client)
+        receiver.cancel()
+
+
+async def _receive_commands(websocket: WebSocket, client: stream.StreamClient) -> None:
+    """Apply filter changes and answer stats requests until the socket closes."""
+    while True:
+        try:
+            text = await websocket.receive_text()
+        except (WebSocketDisconnect, RuntimeError, KeyError):
+            return
+        try:
+            command = json.loads(text)
+            kind = command.get('type')
+            if kind == 'filter':
+                client.set_filter(stream.StreamFilter.from_spec(command))
+                reply: Dict[str, Any] = {'type': 'filter', **client.filter.describe()}
+            elif kind == 'stats':
+                reply = {'type': 'stats', **client.stats()}
+            else:
+                reply = {'type': 'error', 'message': f'unknown command {kind!r}'}
+        except (ValueError, TypeError, AttributeError) as exc:
+            reply = {'type': 'error', 'message': str(exc)}
+        try:
+            await websocket.send_text(json.dumps(reply))
+        except (WebSocketDisconnect, RuntimeError):
+            return
+
+
+def _clients_endpoint() -> Dict[str, Any]:
+    return {'clients': stream.client_stats()}
+
+
+def register():
+    # Avoid duplicate registration if reloads occur
+    try:
+        app.add_api_websocket_route('/api/stream', _stream_endpoint)
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/stream/clients', _clients_endpoint, methods=['GET'])
+    except Exception:
+        pass
@@ -0,0 +1,90 @@
+"""HTTP control of triggered captures (see ``capture.triggers``).
+
+    GET  /api/triggers                   triggers, capture windows and saved captures
+    POST /api/triggers                   {"kind": "pattern", "id": "0x120", "pattern": "12 34", ...}
+    POST /api/triggers/remove            {"name": ...}
+    POST /api/triggers/arm               {"name": ..., "armed": true}
+    POST /api/triggers/config            {"pre_frames", "post_ms", "post_frames", "directory"}
+
+The handlers are ``async`` so FastAPI runs them on the event loop, the
+thread that feeds frames to the (unlocked) trigger engine.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from nicegui import app
+from fastapi import Body
+
+from capture import triggers
+
+
+async def _list_endpoint() -> Dict[str, Any]:
+    return triggers.engine().stats()
+
+
+async def _add_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    try:
+        trigger = triggers.add_trigger(payload)
+    except ValueError as e:
+        return {'ok': False, 'message': str(e)}
+    return {'ok': True, 'trigger': trigger.describe()}
+
+
+async def _remove_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    name = str(payload.get('name', ''))
+    if not triggers.remove_trigger(name):
+        return {'ok': False, 'message': f'No trigger named {name!r}'}
+    return {'ok': True}
+
+
+async def _arm_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    trigger = triggers.engine().get(str(payload.get('name', '')))
+    if trigger is None:
+        return {'ok': False, 'message': f"No trigger named {payload.get('name')!r}"}
+    if payload.get('armed', True):
+        trigger.arm()
+    else:
+        trigger.disarm()
+    return {'ok': True, 'trigger': trigger.describe()}
+
+
+async def _config_endpoint(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    engine = triggers.engine()
+    if engine.capturing:
+        return {'ok': False, 'message': 'A capture is running'}
+    try:
+        engine.configure(
+            pre_frames=payload.get('pre_frames'),
+            post_ms=payload.get('post_ms'),
+            post_frames=payload.get('post_frames'),
+            directory=payload.get('directory'),
+        )
+    except (TypeError, ValueError) as e:
+        return {'ok': False, 'message': str(e)}
+    return {'ok': True, **engine.stats()}
+
+
+def register():
+    # Avoid duplicate registration if reloads occur
+    try:
+        app.add_api_route('/api/triggers', _list_endpoint, methods=['GET'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/triggers', _add_endpoint, methods=['POST'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/triggers/remove', _remove_endpoint, methods=['POST'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/triggers/arm', _arm_endpoint, methods=['POST'])
+    except Exception:
+        pass
+    try:
+        app.add_api_route('/api/triggers/config', _config_endpoint, methods=['POST'])
+    except Exception:
+        pass
@@ -1,3 +1,13 @@
 """Serial helpers for Bolt."""
 
-from .serial_handler import connect, disconnect, list_ports  # noqa: F401
+from .serial_handler import (  # noqa: F401
+    add_channel,
+    channels,
+    connect,
+    disconnect,
+    list_ports,
+    remove_channel,
+    queue_stats,
+    set_process_decode,
+    set_queue_policy,
+)
@@ -0,0 +1,301 @@
+"""Event-loop native serial reader.
+
+Instead of a thread filling a queue that the UI polls, the reader delivers
+decoded batches straight to a callback on the asyncio event loop. On POSIX
+the port's file descriptor is watched with ``loop.add_reader`` and drained
+with one non-blocking bulk read per wake-up. Where the port has no usable
+descriptor (Windows) a thread performs bulk ``in_waiting`` reads and hands
+batches to the loop with ``call_soon_threadsafe``.
+
+Items are held for at most ``latency_s`` so that a busy stream is delivered
+in a few large batches rather than one callback per read; every item
+collected is delivered, there is no per-batch cap. In thread mode at most
+``_MAX_IN_FLIGHT`` batches may wait for a stalled loop; further batches are
+dropped and counted rather than queued without limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import sys
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from .framing import StreamDecoder, StreamItem
+
+# Default time items may wait before delivery
+DEFAULT_LATENCY_S = 0.01
+# Deliver early once this many items are waiting
+_MAX_PENDING_ITEMS = 4096
+# Flush a partial line after this much silence
+_IDLE_FLUSH_S = 0.5
+# Upper bound for a single bulk read
+_MAX_READ = 65536
+# Batches handed to the loop but not yet delivered (thread mode)
+_MAX_IN_FLIGHT = 256
+# How long stop() waits for the loop to let go of the port
+_STOP_TIMEOUT_S = 1.0
+
+
+class AsyncSerialReader:
+    """Read ``ser`` on ``loop`` and call ``on_items(items)`` there.
+
+    ``on_error(exc)`` is called on the loop if the port fails (unplugged
+    device); the reader stops itself first. Items are tagged with ``channel``
+    (see :class:`~usb_serial.framing.StreamDecoder`).
+    """
+
+    def __init__(
+        self,
+        ser: Any,
+        on_items: Callable[[List[StreamItem]], None],
+        loop: asyncio.AbstractEventLoop,
+        latency_s: float = DEFAULT_LATENCY_S,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        channel: int = 0,
+    ) -> None:
+        self.ser = ser
+        self.on_items = on_items
+        self.loop = loop
+        self.latency_s = max(float(latency_s), 0.0)
+        self.on_error = on_error
+
+        self.decoder = StreamDecoder(channel=channel)
+        self.bytes_read = 0
+        self.batches_delivered = 0
+        self.items_delivered = 0
+        self.items_dropped = 0
+        self.frames_dropped = 0
+
+        # Written by the reader thread and the loop respectively, so no lock
+        self._handed_over = 0
+        self._landed = 0
+        self._pending: List[StreamItem] = []
+        self._deliver_handle: Optional[asyncio.TimerHandle] = None
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self._fd: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def mode(self) -> str:
+        if self._fd is not None:
+            return 'fd'
+        if self._thread is not None:
+            return 'thread'
+        return 'stopped'
+
+    # -- lifecycle -------------------------------------------------------
+
+    def start(self) -> None:
+        """Start reading; safe to call from any thread."""
+        self._stop.clear()
+        fd = self._fileno()
+        if fd is None:
+            self._thread = threading.Thread(target=self._thread_loop, name='serial-async-reader', daemon=True)
+            self._thread.start()
+        else:
+            self._call_in_loop(self._start_fd, fd)
+
+    def stop(self) -> None:
+        """Stop reading and deliver what is left; safe to call from any thread.
+
+        Returns once the loop no longer watches the port, so it may be closed.
+        """
+        self._stop.set()
+        if self._fd is not None:
+            self._call_in_loop(self._stop_fd, wait=True)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def set_latency(self, latency_s: float) -> None:
+        self.latency_s = max(float(latency_s), 0.0)
+
+    def stats(self) -> dict:
+        return {
+            'mode': self.mode,
+            'latency_s': self.latency_s,
+            'bytes_read': self.bytes_read,
+            'batches_delivered': self.batches_delivered,
+            'items_delivered': self.items_delivered,
+            'items_dropped': self.items_dropped,
+            'frames_dropped': self.frames_dropped,
+        }
+
+    def _fileno(self) -> Optional[int]:
+        # Windows loops (Proactor) cannot watch serial handles
+        if sys.platform == 'win32':
+            return None
+        try:
+            fd = self.ser.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+        return fd if isinstance(fd, int) and fd >= 0 else None
+
+    def _call_in_loop(self, fn: Callable[..., None], *args: Any, wait: bool = False) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            fn(*args)
+        elif not wait:
+            self.loop.call_soon_threadsafe(fn, *args)
+        elif self.loop.is_closed() or not self.loop.is_running():
+            # Nobody is polling the selector, so it is safe to touch from here
+            fn(*args)
+        else:
+            done: concurrent.futures.Future = concurrent.futures.Future()
+
+            def call() -> None:
+                try:
+                    fn(*args)
+                finally:
+                    done.set_result(None)
+
+            try:
+                self.loop.call_soon_threadsafe(call)
+            except RuntimeError:
+                # The loop closed in the meantime
+                fn(*args)
+                return
+            try:
+                done.result(timeout=_STOP_TIMEOUT_S)
+            except concurrent.futures.TimeoutError:
+                pass
+
+    # -- fd mode (runs on the loop) -------------------------------------
+
+    def _start_fd(self, fd: int) -> None:
+        if self._stop.is_set():
+            return
+        # Reads only happen when data is ready, so never block in read()
+        self.ser.timeout = 0
+        self._fd = fd
+        self.loop.add_reader(fd, self._on_readable)
+
+    def _stop_fd(self) -> None:
+        if self._fd is not None:
+            try:
+                self.loop.remove_reader(self._fd)
+            except Exception:
+                pass
+            self._fd = None
+        self._cancel_timers()
+        self._collect(self.decoder.flush())
+        self._deliver()
+
+    def _on_readable(self) -> None:
+        # A wake-up already queued when stop() was called; the port may be closing
+        if self._stop.is_set():
+            return
+        try:
+            waiting = self.ser.in_waiting
+            chunk = self.ser.read(min(max(waiting, 1), _MAX_READ))
+        except Exception as exc:
+            self._fail(exc)
+            return
+        if not chunk:
+            # Readable with no data: the other end went away
+            self._fail(OSError('serial port closed'))
+            return
+        self.bytes_read += len(chunk)
+        self._collect(self.decoder.feed(chunk))
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+        self._idle_handle = self.loop.call_later(_IDLE_FLUSH_S, self._idle_flush)
+
+    def _idle_flush(self) -> None:
+        self._idle_handle = None
+        if self.decoder.pending:
+            self._collect(self.decoder.flush())
+
+    def _collect(self, items: List[StreamItem]) -> None:
+        if not items:
+            return
+        self._pending.extend(items)
+        if self.latency_s <= 0 or len(self._pending) >= _MAX_PENDING_ITEMS:
+            self._deliver()
+        elif self._deliver_handle is None:
+            self._deliver_handle = self.loop.call_later(self.latency_s, self._deliver)
+
+    def _deliver(self) -> None:
+        if self._deliver_handle is not None:
+            self._deliver_handle.cancel()
+            self._deliver_handle = None
+        items, self._pending = self._pending, []
+        if not items:
+            return
+        self.batches_delivered += 1
+        self.items_delivered += len(items)
+        self.on_items(items)
+
+    def _cancel_timers(self) -> None:
+        for handle in (self._deliver_handle, self._idle_handle):
+            if handle is not None:
+                handle.cancel()
+        self._deliver_handle = self._idle_handle = None
+
+    def _fail(self, exc: BaseException) -> None:
+        self._stop.set()
+        self._stop_fd()
+        if self.on_error:
+            self.on_error(exc)
+
+    # -- thread mode -----------------------------------------------------
+
+    def _thread_loop(self) -> None:
+        # Block at most one latency period so batches still go out on time
+        self.ser.timeout = max(self.latency_s, 0.001)
+        last_data = time.monotonic()
+        first_pending: Optional[float] = None
+        batch: List[StreamItem] = []
+        while not self._stop.is_set():
+            try:
+                chunk = self.ser.read(min(max(self.ser.in_waiting, 1), _MAX_READ))
+            except Exception as exc:
+                self._stop.set()
+                if self.on_error:
+                    self.loop.call_soon_threadsafe(self.on_error, exc)
+                break
+            now = time.monotonic()
+            if chunk:
+                self.bytes_read += len(chunk)
+                last_data = now
+                items = self.decoder.feed(chunk)
+            elif self.decoder.pending and now - last_data > _IDLE_FLUSH_S:
+                items = self.decoder.flush()
+            else:
+                items = []
+            if items:
+                if not batch:
+                    first_pending = now
+                batch.extend(items)
+            if batch and (
+                first_pending is None or now - first_pending >= self.latency_s or len(batch) >= _MAX_PENDING_ITEMS
+            ):
+                self._hand_over(batch)
+                batch, first_pending = [], None
+        batch.extend(self.decoder.flush())
+        if batch:
+            self._hand_over(batch)
+
+    def _hand_over(self, batch: List[StreamItem]) -> None:
+        if self._handed_over - self._landed >= _MAX_IN_FLIGHT:
+            self.items_dropped += len(batch)
+            self.frames_dropped += sum(len(item) for item in batch if not isinstance(item, str))
+            return
+        self._handed_over += 1
+        self.batches_delivered += 1
+        self.items_delivered += len(batch)
+        self.loop.call_soon_threadsafe(self._delivered, batch)
+
+    def _delivered(self, batch: List[StreamItem]) -> None:
+        self._landed += 1
+        self.on_items(batch)
+
+
+__all__ = ['DEFAULT_LATENCY_S', 'AsyncSerialReader']
@@ -0,0 +1,203 @@
+"""Compact binary CAN record format used by the Oracle firmware.
+
+When ``Oracle_binary_on`` is enabled on the ESP32, frames are no longer sent
+as one JSON line each. Instead the firmware batches several frames into a
+single payload, COBS-encodes it and writes it wrapped in ``0x00`` delimiters::
+
+    0x00 | COBS(header + record * count) | 0x00
+
+    header  = magic (u8, 0xB7) | version (u8) | count (u16 LE)
+    record  = ts_us (u64 LE) | id (u32 LE) | flags (u8) | dlc (u8) | data (8 bytes) | seq (u16 LE)
+
+``flags`` bit 0 marks an extended identifier and bit 1 a remote frame.
+``seq`` counts every frame the firmware received, including the ones it had
+to drop, so gaps in it show the host how many frames were lost (it wraps at
+65536). Version 1 records (22 bytes, no ``seq``) are still decoded. The
+encoder in this module mirrors ``Oracle_EncodeBinaryRecord`` in
+``main/Oracle/Oracle_parsing.c`` and exists so the host decoder can be
+exercised without hardware.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, Iterable, List
+
+MAGIC = 0xB7
+VERSION = 2
+DELIMITER = 0x00
+
+FLAG_EXT = 0x01
+FLAG_RTR = 0x02
+
+_HEADER = struct.Struct('<BBH')
+_RECORD = struct.Struct('<QIBB8sH')
+_RECORD_V1 = struct.Struct('<QIBB8s')
+
+HEADER_SIZE = _HEADER.size
+RECORD_SIZE = _RECORD.size
+SEQ_MODULO = 0x10000
+# Upper bound for frames per batch; matches ORACLE_BATCH_MAX in firmware.
+MAX_BATCH = 32
+
+
+def cobs_encode(data: bytes) -> bytes:
+    """Consistent Overhead Byte Stuffing; the result contains no zero bytes."""
+    out = bytearray()
+    code_index = 0
+    out.append(0)
+    code = 1
+    for byte in data:
+        if byte == 0:
+            out[code_index] = code
+            code_index = len(out)
+            out.append(0)
+            code = 1
+            continue
+        out.append(byte)
+        code += 1
+        if code == 0xFF:
+            out[code_index] = code
+            code_index = len(out)
+            out.append(0)
+            code = 1
+    out[code_index] = code
+    return bytes(out)
+
+
+def cobs_decode(data: bytes) -> bytes:
+    """Reverse :func:`cobs_encode`. Raises ``ValueError`` on malformed input."""
+    out = bytearray()
+    index = 0
+    length = len(data)
+    while index < length:
+        code = data[index]
+        if code == 0:
+            raise ValueError('zero byte inside COBS block')
+        end = index + code
+        if end > length:
+            raise ValueError('truncated COBS block')
+        block = data[index + 1 : end]
+        if 0 in block:
+            raise ValueError('zero byte inside COBS block')
+        out += block
+        index = end
+        if code != 0xFF and index < length:
+            out.append(0)
+    return bytes(out)
+
+
+def encode_batch(frames: Iterable[Dict[str, Any]], version: int = VERSION) -> bytes:
+    """Pack frame dicts into a raw (un-framed) batch payload.
+
+    Frames without a ``seq`` are numbered 0 in version 2 records.
+    """
+    if version not in (1, VERSION):
+        raise ValueError(f'unsupported batch version {version}')
+    records: List[bytes] = []
+    for frame in frames:
+        flags = 0
+        if frame.get('ext'):
+            flags |= FLAG_EXT
+        if frame.get('rtr'):
+            flags |= FLAG_RTR
+        data = bytes(frame.get('data') or b'')[:8]
+        dlc = int(frame.get('dlc', len(data)) or 0)
+        fields = (
+            int(frame.get('ts_us') or 0),
+            int(frame.get('id') or 0) & 0xFFFFFFFF,
+            flags,
+            min(max(dlc, 0), 8),
+            data.ljust(8, b'\x00'),
+        )
+        if version == 1:
+            records.append(_RECORD_V1.pack(*fields))
+        else:
+            records.append(_RECORD.pack(*fields, int(frame.get('seq') or 0) % SEQ_MODULO))
+    if len(records) > 0xFFFF:
+        raise ValueError('too many frames for a single batch')
+    return _HEADER.pack(MAGIC, version, len(records)) + b''.join(records)
+
+
+def encode_packet(frames: Iterable[Dict[str, Any]], version: int = VERSION) -> bytes:
+    """Encode a batch exactly as the firmware writes it to USB."""
+    return b'\x00' + cobs_encode(encode_batch(frames, version)) + b'\x00'
+
+
+def decode_batch(payload: bytes) -> List[Dict[str, Any]]:
+    """Decode a raw batch payload into frame dicts.
+
+    The dicts use the same keys as the JSON path in ``jtag.data_processor``
+    so they can be handed straight to ``gui.state.append_can_frame``.
+    """
+    if len(payload) < HEADER_SIZE:
+        raise ValueError('batch shorter than header')
+    magic, version, count = _HEADER.unpack_from(payload)
+    if magic != MAGIC:
+        raise ValueError(f'bad magic 0x{magic:02X}')
+    if version == 1:
+        return _decode_v1(memoryview(payload)[HEADER_SIZE:], count)
+    if version != VERSION:
+        raise ValueError(f'unsupported batch version {version}')
+    body = memoryview(payload)[HEADER_SIZE:]
+    if len(body) != count * RECORD_SIZE:
+        raise ValueError('batch length does not match record count')
+
+    frames: List[Dict[str, Any]] = []
+    append = frames.append
+    for ts_us, identifier, flags, dlc, data, seq in _RECORD.iter_unpack(body):
+        if dlc > 8:
+            dlc = 8
+        append(
+            {
+                'id': identifier,
+                'ts_us': ts_us,
+                'dlc': dlc,
+                'ext': bool(flags & FLAG_EXT),
+                'rtr': bool(flags & FLAG_RTR),
+                'data': b'' if flags & FLAG_RTR else data[:dlc],
+                'raw': '',
+                'seq': seq,
+            }
+        )
+    return frames
+
+
+def _decode_v1(body: memoryview, count: int) -> List[Dict[str, Any]]:
+    if len(body) != count * _RECORD_V1.size:
+        raise ValueError('batch length does not match record count')
+    frames: List[Dict[str, Any]] = []
+    append = frames.append
+    for ts_us, identifier, flags, dlc, data in _RECORD_V1.iter_unpack(body):
+        if dlc > 8:
+            dlc = 8
+        append(
+            {
+                'id': identifier,
+                'ts_us': ts_us,
+                'dlc': dlc,
+                'ext': bool(flags & FLAG_EXT),
+                'rtr': bool(flags & FLAG_RTR),
+                'data': b'' if flags & FLAG_RTR else data[:dlc],
+                'raw': '',
+            }
+        )
+    return frames
+
+
+def decode_packet(block: bytes) -> List[Dict[str, Any]]:
+    """Decode one COBS block (delimiters already stripped)."""
+    return decode_batch(cobs_decode(block))
+
+
+__all__ = [
+    'DELIMITER',
+    'MAX_BATCH',
+    'SEQ_MODULO',
+    'cobs_decode',
+    'cobs_encode',
+    'decode_batch',
+    'decode_packet',
+    'encode_batch',
+    'encode_packet',
+]
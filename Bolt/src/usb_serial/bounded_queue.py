@@ -0,0 +1,114 @@
+"""Bounded queue between the serial readers and the UI.
+
+When the UI stalls (a long render, a blocked event loop) the readers keep
+producing. :class:`BoundedQueue` caps how many items may wait and applies an
+overflow policy instead of letting memory grow:
+
+    drop_oldest   discard the oldest waiting item (default; the newest
+                  traffic is usually the interesting part)
+    drop_newest   discard the item being added
+    block         make the reader wait up to ``block_timeout`` seconds, which
+                  pushes back into the OS and device buffers, then drop it
+
+Items are text lines or frame batches; every discarded item is counted, and
+for batches so are the frames in it.
+"""
+
+from __future__ import annotations
+
+import queue
+from typing import Any, Dict, Optional
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# Items (lines or batches) that may wait by default
+DEFAULT_MAXSIZE = 20_000
+DEFAULT_BLOCK_TIMEOUT_S = 1.0
+
+
+class BoundedQueue(queue.Queue):
+    """``queue.Queue`` whose ``put`` never grows it past ``maxsize``."""
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        policy: str = DROP_OLDEST,
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT_S,
+    ) -> None:
+        super().__init__(max(int(maxsize), 1))
+        self.policy = DROP_OLDEST
+        self.block_timeout = float(block_timeout)
+        self.items_dropped = 0
+        self.frames_dropped = 0
+        self.high_water = 0
+        self.configure(policy=policy)
+
+    def configure(self, maxsize: Optional[int] = None, policy: Optional[str] = None) -> None:
+        if policy is not None:
+            if policy not in POLICIES:
+                raise ValueError(f'policy must be one of {", ".join(POLICIES)}')
+            self.policy = policy
+        if maxsize is not None:
+            with self.mutex:
+                self.maxsize = max(int(maxsize), 1)
+                self.not_full.notify_all()
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        if self.policy == BLOCK:
+            try:
+                super().put(item, True, self.block_timeout)
+            except queue.Full:
+                self._count_drop(item)
+            else:
+                self._note_size()
+            return
+        with self.not_full:
+            if self._qsize() >= self.maxsize:
+                if self.policy == DROP_NEWEST:
+                    self._count_drop(item)
+                    return
+                self._count_drop(self._get())
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+        self._note_size()
+
+    def _note_size(self) -> None:
+        size = self._qsize()
+        if size > self.high_water:
+            self.high_water = size
+
+    def _count_drop(self, item: Any) -> None:
+        self.items_dropped += 1
+        if not isinstance(item, str):
+            try:
+                self.frames_dropped += len(item)
+            except TypeError:
+                pass
+
+    def reset_stats(self) -> None:
+        self.items_dropped = self.frames_dropped = 0
+        self.high_water = self._qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'policy': self.policy,
+            'maxsize': self.maxsize,
+            'pending': self.qsize(),
+            'high_water': self.high_water,
+            'items_dropped': self.items_dropped,
+            'frames_dropped': self.frames_dropped,
+        }
+
+
+__all__ = [
+    'BLOCK',
+    'DEFAULT_MAXSIZE',
+    'DROP_NEWEST',
+    'DROP_OLDEST',
+    'POLICIES',
+    'BoundedQueue',
+]
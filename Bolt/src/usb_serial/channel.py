@@ -0,0 +1,202 @@
+"""One sniffer connection: its serial port and the reader pipeline behind it.
+
+Bolt can watch several CAN buses at once, one ESP32 sniffer per bus. Each
+sniffer is a :class:`SerialChannel` with its own port, :class:`StreamDecoder`
+and reader, and everything it produces is tagged with the channel number
+(frames carry ``channel``, text lines are :class:`ChannelLine`). Channels
+never share a buffer or a lock, so adding one adds an independent pipeline.
+With ``process=True`` the port is read and decoded by a child process
+instead (see :mod:`usb_serial.decode_process`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import serial
+
+from .async_reader import DEFAULT_LATENCY_S, AsyncSerialReader
+from .decode_process import ProcessReader
+from .framing import StreamDecoder, StreamItem
+
+# Flush a partial line after this much silence (thread reader)
+_IDLE_FLUSH_S = 0.5
+
+
+def read_loop(ser: Any, stop: threading.Event, emit: Callable[[List[StreamItem]], None], channel: int = 0) -> None:
+    """Blocking reader: ``ser.read`` until ``stop`` is set, decoded items go to ``emit``."""
+    decoder = StreamDecoder(channel=channel)
+    last_activity = time.monotonic()
+    while not stop.is_set():
+        try:
+            if not (ser and ser.is_open):
+                time.sleep(0.2)
+                continue
+            # Read available bytes (timeout driven)
+            chunk = ser.read(256)
+            if not chunk:
+                # If we have buffered data but no terminator, flush occasionally
+                if decoder.pending and (time.monotonic() - last_activity) > _IDLE_FLUSH_S:
+                    emit(decoder.flush())
+                continue
+
+            last_activity = time.monotonic()
+            # Text lines and binary batches are detected per stream
+            emit(decoder.feed(chunk))
+        except Exception:
+            # Be resilient: small backoff on errors
+            time.sleep(0.1)
+    # Flush remaining buffer on stop
+    emit(decoder.flush())
+
+
+class SerialChannel:
+    """A sniffer on ``port`` whose items are tagged with ``index``.
+
+    With an event loop (``start(loop=...)``) the port is read by an
+    :class:`AsyncSerialReader` that hands batches to ``on_items``; otherwise
+    a reader thread puts items on ``out_queue``. With ``process`` the port
+    belongs to a :class:`ProcessReader` child and only decoded items are
+    delivered here, by either route.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        port: str,
+        baudrate: int = 115200,
+        name: Optional[str] = None,
+        process: bool = False,
+    ) -> None:
+        if not 0 <= index <= 0xFF:
+            raise ValueError('channel index must be 0..255')
+        self.index = index
+        self.port = port
+        self.baudrate = int(baudrate)
+        self.name = name or f'CH{index}'
+        self.process = process
+        self.ser: Optional[serial.Serial] = None
+        self._decoder: Optional[ProcessReader] = None
+        self.opened_at: Optional[float] = None
+        self._reader: Optional[AsyncSerialReader] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def is_open(self) -> bool:
+        if self._decoder is not None:
+            return self._decoder.is_alive
+        try:
+            return bool(self.ser and self.ser.is_open)
+        except Exception:
+            return False
+
+    def open(self, timeout: float = 1.0) -> None:
+        """Open the port; raises ``serial.SerialException`` on failure.
+
+        In process mode the child opens it and failures raise ``OSError``.
+        """
+        if self.process:
+            decoder = ProcessReader(self.port, self.baudrate, self.index)
+            decoder.open()
+            self._decoder = decoder
+            self.opened_at = time.time()
+            return
+        ser = serial.Serial(port=self.port, baudrate=self.baudrate, timeout=timeout)
+        if not ser.is_open:
+            ser.open()
+        self.ser = ser
+        self.opened_at = time.time()
+
+    def start(
+        self,
+        out_queue: "queue.Queue[StreamItem]",
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        on_items: Optional[Callable[[List[StreamItem]], None]] = None,
+        latency_s: float = DEFAULT_LATENCY_S,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> None:
+        if self._decoder is not None:
+            self._decoder.start(out_queue, loop, on_items, latency_s, on_error)
+            return
+        if self._reader or (self._thread and self._thread.is_alive()):
+            return
+        if loop is not None and on_items is not None and self.ser is not None:
+            self._reader = AsyncSerialReader(
+                self.ser, on_items, loop, latency_s, on_error=on_error, channel=self.index
+            )
+            self._reader.start()
+            return
+        self._stop.clear()
+
+        def emit(items: List[StreamItem]) -> None:
+            for item in items:
+                out_queue.put(item)
+
+        self._thread = threading.Thread(
+            target=read_loop,
+            args=(self.ser, self._stop, emit, self.index),
+            name=f'serial-reader-{self.index}',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the reader (best-effort); the port stays open."""
+        if self._decoder is not None:
+            self._decoder.stop()
+        if self._reader:
+            self._reader.stop()
+            self._reader = None
+        self._stop.set()
+        try:
+            if self._thread and self._thread.is_alive():
+                self._thread.join(timeout=1.0)
+        except Exception:
+            pass
+        finally:
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        if self._decoder is not None:
+            self._decoder.close()
+            self._decoder = None
+        try:
+            if self.ser and self.ser.is_open:
+                self.ser.close()
+        except Exception:
+            pass
+        self.ser = None
+
+    def set_latency(self, latency_s: float) -> None:
+        if self._reader:
+            self._reader.set_latency(latency_s)
+        if self._decoder is not None:
+            self._decoder.set_latency(latency_s)
+
+    def stats(self) -> Dict[str, Any]:
+        if self._decoder is not None:
+            out = self._decoder.stats()
+        elif self._reader:
+            out = self._reader.stats()
+        else:
+            alive = bool(self._thread and self._thread.is_alive())
+            out = {'mode': 'queue' if alive else 'stopped'}
+        out.update(
+            {
+                'channel': self.index,
+                'name': self.name,
+                'port': self.port,
+                'baudrate': self.baudrate,
+                'connected': self.is_open,
+            }
+        )
+        return out
+
+
+__all__ = ['SerialChannel', 'read_loop']
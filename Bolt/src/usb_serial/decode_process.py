@@ -0,0 +1,321 @@
+"""Read and decode a sniffer in a separate process.
+
+In process mode the serial port is opened by a child process that runs the
+:class:`StreamDecoder` and writes decoded frames into a :class:`FrameRing`
+in shared memory. The UI process only copies records out of the ring, so
+framing and parsing never compete with rendering for the interpreter.
+Text lines (ESP log output, lines in an unknown layout) are rare and go
+through a ``multiprocessing`` queue, each tagged with the number of frames
+the ring had published before it and counted in the ring header once
+queued. The consumer takes every announced line before reading the ring, so
+it can put frames and lines back in the order the child read them.
+
+:class:`ProcessReader` owns the child, the ring and the queue and delivers
+items either to a callback on the event loop or to a plain queue, like
+:class:`~usb_serial.async_reader.AsyncSerialReader` and the reader thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .async_reader import DEFAULT_LATENCY_S
+from .framing import StreamDecoder, StreamItem
+from .shm_ring import DEFAULT_CAPACITY, FrameRing
+
+# Child read timeout; bounds how long shutdown waits for a blocked read
+_READ_TIMEOUT_S = 0.05
+# Flush a partial line after this much silence
+_IDLE_FLUSH_S = 0.5
+# Upper bound for a single bulk read
+_MAX_READ = 65536
+# How long to wait for the child to open the port
+_START_TIMEOUT_S = 10.0
+# How long drain() waits for an announced line still in the queue's pipe
+_LINE_WAIT_S = 0.05
+
+# Spawned children start from a fresh interpreter: no inherited threads or loop
+_CONTEXT = multiprocessing.get_context('spawn')
+
+
+def run_decoder(
+    port: str,
+    baudrate: int,
+    channel: int,
+    ring_name: str,
+    messages: Any,
+    stop: Any,
+) -> None:
+    """Child process entry point: read ``port`` until ``stop`` is set.
+
+    Puts ``('ready', None)`` or ``('error', message)`` on ``messages`` first,
+    then ``('line', frames written before it, text)`` per text line; frames go
+    to the ring named ``ring_name``.
+    """
+    import serial
+
+    try:
+        ser = serial.Serial(port=port, baudrate=baudrate, timeout=_READ_TIMEOUT_S)
+        if not ser.is_open:
+            ser.open()
+    except Exception as exc:
+        messages.put(('error', str(exc)))
+        return
+
+    ring = FrameRing.attach(ring_name)
+    decoder = StreamDecoder(channel=channel)
+    messages.put(('ready', None))
+
+    def emit(items: List[StreamItem]) -> None:
+        for item in items:
+            if isinstance(item, str):
+                messages.put(('line', ring.written, str(item)))
+                ring.count_line()
+            else:
+                ring.write(item)
+
+    last_activity = time.monotonic()
+    try:
+        while not stop.is_set():
+            try:
+                chunk = ser.read(min(max(ser.in_waiting, 1), _MAX_READ))
+            except Exception as exc:
+                messages.put(('error', str(exc)))
+                break
+            if not chunk:
+                if decoder.pending and (time.monotonic() - last_activity) > _IDLE_FLUSH_S:
+                    emit(decoder.flush())
+                continue
+            last_activity = time.monotonic()
+            emit(decoder.feed(chunk))
+        emit(decoder.flush())
+    finally:
+        try:
+            ser.close()
+        except Exception:
+            pass
+        ring.close()
+
+
+class ProcessReader:
+    """A decoder process for one channel and the consumer side of its ring.
+
+    :meth:`open` spawns the child and waits until it has opened the port
+    (raising ``OSError`` with the child's message if it could not).
+    :meth:`start` begins delivering items; :meth:`close` stops the child and
+    frees the shared memory.
+    """
+
+    def __init__(self, port: str, baudrate: int, channel: int = 0, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.port = port
+        self.baudrate = int(baudrate)
+        self.channel = channel
+        self.capacity = capacity
+        self.latency_s = DEFAULT_LATENCY_S
+        self.batches_delivered = 0
+        self.items_delivered = 0
+
+        self._ring: Optional[FrameRing] = None
+        self._process: Optional[Any] = None
+        self._messages: Optional[Any] = None
+        self._stop_child = _CONTEXT.Event()
+        self._emit: Optional[Callable[[List[StreamItem]], None]] = None
+        self._on_error: Optional[Callable[[BaseException], None]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._failed = False
+        # Lines taken from the queue, and those that follow frames not read yet
+        self._lines_taken = 0
+        self._held: List[Any] = []
+
+    @property
+    def is_alive(self) -> bool:
+        return bool(self._process and self._process.is_alive())
+
+    @property
+    def mode(self) -> str:
+        return 'process' if self._emit else 'stopped'
+
+    # -- lifecycle -------------------------------------------------------
+
+    def open(self, timeout: float = _START_TIMEOUT_S) -> None:
+        self._ring = FrameRing.create(self.capacity)
+        self._messages = _CONTEXT.Queue()
+        self._process = _CONTEXT.Process(
+            target=run_decoder,
+            args=(self.port, self.baudrate, self.channel, self._ring.name, self._messages, self._stop_child),
+            name=f'bolt-decoder-{self.channel}',
+            daemon=True,
+        )
+        self._process.start()
+        try:
+            status, message = self._messages.get(timeout=timeout)
+        except queue.Empty:
+            status, message = 'error', 'decoder process did not start'
+        if status != 'ready':
+            self.close()
+            raise OSError(message)
+
+    def start(
+        self,
+        out_queue: "queue.Queue[StreamItem]",
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        on_items: Optional[Callable[[List[StreamItem]], None]] = None,
+        latency_s: float = DEFAULT_LATENCY_S,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> None:
+        if self._emit is not None:
+            return
+        self.latency_s = max(float(latency_s), 0.001)
+        self._on_error = on_error
+        if loop is not None and on_items is not None:
+            self._loop = loop
+            self._emit = on_items
+            loop.call_soon_threadsafe(self._schedule)
+            return
+
+        def emit(items: List[StreamItem]) -> None:
+            for item in items:
+                out_queue.put(item)
+
+        self._emit = emit
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll_loop, name=f'decoder-poll-{self.channel}', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop delivering; the child keeps reading into the ring."""
+        self._emit = None
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._loop = None
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        self._stop_child.set()
+        if self._process is not None:
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout=1.0)
+            self._process = None
+        if self._messages is not None:
+            self._messages.cancel_join_thread()
+            self._messages.close()
+            self._messages = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+    def set_latency(self, latency_s: float) -> None:
+        self.latency_s = max(float(latency_s), 0.001)
+
+    # -- delivery --------------------------------------------------------
+
+    def drain(self) -> List[StreamItem]:
+        """Everything the child produced since the last call, in the order it was read."""
+        ring = self._ring
+        # Every line queued before the frames up to ``head`` were published is
+        # announced by the time head is, so it is taken before those frames
+        head = ring.written if ring is not None else 0
+        announced = ring.lines if ring is not None else 0
+        lines, self._held = self._held, []
+        while self._messages is not None:
+            try:
+                if self._lines_taken < announced:
+                    message = self._messages.get(timeout=_LINE_WAIT_S)
+                else:
+                    message = self._messages.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            if message[0] == 'line':
+                self._lines_taken += 1
+                lines.append(message)
+            else:
+                self._fail(OSError(message[1]))
+        frames: List[Dict[str, Any]] = []
+        first = 0
+        if ring is not None:
+            first = ring.consumed
+            frames = ring.read(max_frames=head - first, channel=self.channel)
+        items: List[StreamItem] = []
+        cut = 0
+        for index, (_, written, text) in enumerate(lines):
+            if written > head:
+                # Follows frames published after ``head``: wait for them
+                self._held = lines[index:]
+                break
+            end = min(max(written - first, cut), len(frames))
+            if end > cut:
+                items.append(frames[cut:end])
+                cut = end
+            items.append(text)
+        if cut < len(frames):
+            items.append(frames[cut:])
+        if not self._failed and self._process is not None and not self._process.is_alive():
+            self._fail(OSError(f'decoder process exited with code {self._process.exitcode}'))
+        return items
+
+    def _deliver(self) -> None:
+        emit = self._emit
+        items = self.drain()
+        if items and emit is not None:
+            self.batches_delivered += 1
+            self.items_delivered += len(items)
+            emit(items)
+
+    def _fail(self, exc: BaseException) -> None:
+        if self._failed:
+            return
+        self._failed = True
+        if self._on_error:
+            self._on_error(exc)
+
+    def _schedule(self) -> None:
+        loop = self._loop
+        if loop is None or self._emit is None:
+            return
+        self._handle = loop.call_later(self.latency_s, self._tick)
+
+    def _tick(self) -> None:
+        self._handle = None
+        try:
+            self._deliver()
+        finally:
+            if not self._failed:
+                self._schedule()
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.latency_s):
+            self._deliver()
+            if self._failed:
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        ring = self._ring
+        return {
+            'mode': self.mode,
+            'pid': self._process.pid if self._process else None,
+            'ring_capacity': self.capacity,
+            'ring_pending': ring.pending if ring else 0,
+            'ring_dropped': ring.dropped if ring else 0,
+            'frames_decoded': ring.written if ring else 0,
+            'batches_delivered': self.batches_delivered,
+            'items_delivered': self.items_delivered,
+            'latency_s': self.latency_s,
+        }
+
+
+__all__ = ['ProcessReader', 'run_decoder']
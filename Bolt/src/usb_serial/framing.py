@@ -0,0 +1,225 @@
+"""Split the raw serial byte stream into text lines and binary batches."""
+
+from __future__ import annotations
+
+import binascii
+import re
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from analysis import metrics
+
+from . import binary_codec
+
+# A decoded item is either a text line or a batch of binary frame dicts.
+StreamItem = Union[str, List[Dict[str, Any]]]
+
+
+class ChannelLine(str):
+    """A text line read on a channel other than 0; ``channel`` says which."""
+
+    channel = 0
+
+
+# Guard against extremely long buffers that never terminate
+_MAX_PENDING = 4096
+
+# Exact layout printed by Oracle_FormatCANFrame (main/Oracle/Oracle_parsing.c)
+_CAN_LINE = re.compile(
+    rb'\{"type":"can","ts_us":(\d+),"id":(\d+),"ext":(true|false),"rtr":(true|false),'
+    rb'"dlc":(\d),"data":"([0-9A-Fa-f]*)"(?:,"seq":(\d+))?\}'
+)
+
+
+def parse_can_line(line: bytes, channel: int = 0) -> Optional[Dict[str, Any]]:
+    """Parse one firmware frame line without the generic JSON decoder.
+
+    Returns None for anything that does not match the firmware's fixed
+    layout byte for byte; callers then fall back to ``json.loads``. The
+    line itself is kept (undecoded) under ``raw``. Lines from older
+    firmware have no ``seq`` and the frame then has none either.
+    """
+    match = _CAN_LINE.fullmatch(line)
+    if match is None:
+        return None
+    ts_us, identifier, ext, rtr, dlc, data, seq = match.groups()
+    try:
+        payload = binascii.unhexlify(data)
+    except binascii.Error:
+        return None
+    dlc = min(int(dlc), 8)
+    frame = {
+        'id': int(identifier),
+        'ts_us': int(ts_us),
+        'dlc': dlc,
+        'ext': ext == b'true',
+        'rtr': rtr == b'true',
+        'data': payload[: dlc or 8],
+        'raw': line,
+        'channel': channel,
+    }
+    if seq is not None:
+        frame['seq'] = int(seq) & 0xFFFF
+    return frame
+
+
+class StreamDecoder:
+    """Incremental decoder that auto-detects JSON lines vs. COBS batches.
+
+    A stream starts in text mode and is split on LF/CR. All complete lines
+    of a chunk are cut off the buffer in one slice (found with ``rfind``) and
+    split in C, so the cost is linear in the chunk size. With
+    ``parse_frames`` (the default) lines in the firmware's exact frame layout
+    are parsed right here and consecutive ones are emitted together as one
+    list of frame dicts, like a binary batch; other lines stay strings.
+
+    The first ``0x00`` byte switches the stream to binary mode for the rest
+    of the connection: it is then split on ``0x00`` and every block that
+    decodes as a batch is emitted as a list of frame dicts. Blocks that do
+    not decode (log lines printed between batches) fall back to text line
+    splitting, so ESP log output keeps reaching the monitor log.
+
+    Frames are tagged with ``channel``; on channels other than 0 text lines
+    are emitted as :class:`ChannelLine` so they keep their origin too.
+    """
+
+    def __init__(self, parse_frames: bool = True, channel: int = 0) -> None:
+        self._buf = bytearray()
+        self.parse_frames = parse_frames
+        self.channel = channel
+        self.binary = False
+        self.batches = 0
+        self.bad_blocks = 0
+        self.fast_lines = 0
+
+    def reset(self) -> None:
+        self._buf.clear()
+        self.binary = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._buf)
+
+    def feed(self, chunk: bytes) -> List[StreamItem]:
+        if metrics.ENABLED:
+            return self._feed_measured(chunk)
+        return self._feed(chunk)
+
+    def _feed_measured(self, chunk: bytes) -> List[StreamItem]:
+        started = time.perf_counter()
+        fast_lines, batches = self.fast_lines, self.batches
+        out = self._feed(chunk)
+        metrics.DECODE_SECONDS.observe(time.perf_counter() - started)
+        label = str(self.channel)
+        metrics.BYTES_READ.inc(len(chunk), label)
+        lines = self.fast_lines - fast_lines + sum(1 for item in out if isinstance(item, str))
+        if lines:
+            metrics.LINES_FRAMED.inc(lines, label)
+        if self.batches != batches:
+            metrics.BATCHES_DECODED.inc(self.batches - batches, label)
+        return out
+
+    def _feed(self, chunk: bytes) -> List[StreamItem]:
+        out: List[StreamItem] = []
+        buf = self._buf
+        buf.extend(chunk)
+
+        if not self.binary:
+            zero = buf.find(b'\x00')
+            if zero < 0:
+                self._split_text(out)
+                return out
+            # Everything before the first delimiter is plain text
+            head = bytes(buf[:zero])
+            del buf[: zero + 1]
+            self.binary = True
+            self._emit_text_block(head, out)
+
+        while True:
+            zero = buf.find(b'\x00')
+            if zero < 0:
+                break
+            block = bytes(buf[:zero])
+            del buf[: zero + 1]
+            if block:
+                self._emit_block(block, out)
+
+        if len(buf) > _MAX_PENDING:
+            self._emit_text_block(bytes(buf), out)
+            buf.clear()
+        return out
+
+    def flush(self) -> List[StreamItem]:
+        """Emit whatever is buffered (used on idle timeout and shutdown)."""
+        out: List[StreamItem] = []
+        if self._buf:
+            block = bytes(self._buf)
+            self._buf.clear()
+            if self.binary:
+                self._emit_block(block, out)
+            else:
+                out.append(self._text(block))
+        return out
+
+    def _emit_block(self, block: bytes, out: List[StreamItem]) -> None:
+        try:
+            frames = binary_codec.decode_packet(block)
+        except ValueError:
+            self.bad_blocks += 1
+            self._emit_text_block(block, out)
+            return
+        self.batches += 1
+        if frames:
+            if self.channel:
+                for frame in frames:
+                    frame['channel'] = self.channel
+            out.append(frames)
+
+    def _emit_text_block(self, block: bytes, out: List[StreamItem]) -> None:
+        frames: Optional[List[Dict[str, Any]]] = None
+        parse = parse_can_line if self.parse_frames else None
+        channel = self.channel
+        for line in block.splitlines():
+            if not line:
+                continue
+            frame = parse(line, channel) if parse else None
+            if frame is None:
+                frames = None
+                out.append(self._text(line))
+                continue
+            if frames is None:
+                frames = []
+                out.append(frames)
+            frames.append(frame)
+            self.fast_lines += 1
+
+    def _split_text(self, out: List[StreamItem]) -> None:
+        buf = self._buf
+        # Cut every complete line off in one go; the tail waits for more data
+        end = max(buf.rfind(b'\n'), buf.rfind(b'\r'))
+        if end >= 0:
+            block = bytes(buf[: end + 1])
+            del buf[: end + 1]
+            self._emit_text_block(block, out)
+
+        if len(buf) > _MAX_PENDING:
+            out.append(self._text(bytes(buf)))
+            buf.clear()
+
+    def _text(self, raw: bytes) -> str:
+        text = _decode_text(raw)
+        if not self.channel:
+            return text
+        line = ChannelLine(text)
+        line.channel = self.channel
+        return line
+
+
+def _decode_text(raw: bytes) -> str:
+    try:
+        return raw.decode(errors="replace")
+    except Exception:
+        return "<binary>"
+
+
+__all__ = ['ChannelLine', 'StreamDecoder', 'StreamItem', 'parse_can_line']
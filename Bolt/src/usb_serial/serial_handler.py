@@ -2,17 +2,29 @@ import serial
 import platform
 import serial.tools.list_ports
 import threading
-import queue
-import time
-from typing import List, Optional, Tuple
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-# Simple serial connection manager for listing and connecting to COM ports.
+from .async_reader import DEFAULT_LATENCY_S
+from .bounded_queue import BoundedQueue
+from .channel import SerialChannel
+from .framing import StreamItem
 
-_SER: Optional[serial.Serial] = None
-_SELECTED_PORT: Optional[str] = None
-_READ_THREAD: Optional[threading.Thread] = None
-_STOP_EVENT: Optional[threading.Event] = None
-_READ_Q: "queue.Queue[str]" = queue.Queue()
+# Simple serial connection manager for listing and connecting to COM ports.
+# Every open sniffer is a channel; connect()/disconnect() manage channel 0.
+
+_CHANNELS: Dict[int, SerialChannel] = {}
+_CHANNELS_LOCK = threading.Lock()
+# Channel numbers taken by connections still being opened (index -> port)
+_OPENING: Dict[int, str] = {}
+# Bounded so a stalled UI cannot grow memory; see set_queue_policy
+_READ_Q: "BoundedQueue" = BoundedQueue()
+# Event-loop delivery (see attach_event_loop); used instead of the thread + queue
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_ON_ITEMS: Optional[Callable[[List[StreamItem]], None]] = None
+_BATCH_LATENCY_S: float = DEFAULT_LATENCY_S
+# Read and decode new connections in a child process (see decode_process)
+_PROCESS_DECODE = False
 
 
 def list_ports() -> List[Tuple[str, str]]:
@@ -22,62 +34,131 @@ def list_ports() -> List[Tuple[str, str]]:
 
 
 def connect(
-    port: str, baudrate: int = 115200, timeout: float = 1.0
+    port: str, baudrate: int = 115200, timeout: float = 1.0, process: Optional[bool] = None
 ) -> Tuple[bool, str]:
-    """Attempt to open the given serial port.
+    """Attempt to open the given serial port as channel 0.
 
     Returns (ok, message). On success keeps a global handle for later use.
+    ``process`` overrides :func:`set_process_decode` for this connection.
     """
-    global _SER, _SELECTED_PORT
-    # Close any previous connection
-    try:
-        if _SER and _SER.is_open:
-            _SER.close()
-    except Exception:
-        pass
-    _SER = None
+    with _CHANNELS_LOCK:
+        if 0 in _OPENING:
+            return False, f"Channel 0 is already being opened ({_OPENING[0]})"
+        if port in _OPENING.values() or any(ch.port == port for i, ch in _CHANNELS.items() if i != 0):
+            return False, f"{port} is already open"
+        # Take channel 0 over in one step, so add_channel cannot reserve it meanwhile
+        previous = _CHANNELS.pop(0, None)
+        _OPENING[0] = port
+    # Close any previous primary connection
+    if previous is not None:
+        previous.close()
+    return _open_channel(0, port, baudrate, None, timeout, process)
+
+
+def add_channel(
+    port: str,
+    baudrate: int = 115200,
+    name: Optional[str] = None,
+    timeout: float = 1.0,
+    process: Optional[bool] = None,
+) -> Tuple[bool, str]:
+    """Open another sniffer on the lowest free channel number."""
+    with _CHANNELS_LOCK:
+        if port in _OPENING.values() or any(ch.port == port for ch in _CHANNELS.values()):
+            return False, f"{port} is already open"
+        index = next((i for i in range(0x100) if i not in _CHANNELS and i not in _OPENING), None)
+        if index is None:
+            return False, "No free channel number (all 256 are in use)"
+        # Held until _open_channel registers or gives up the channel
+        _OPENING[index] = port
+    return _open_channel(index, port, baudrate, name, timeout, process)
+
+
+def remove_channel(index: int) -> Tuple[bool, str]:
+    channel = _close_channel(index)
+    if channel is None:
+        return False, f"No channel {index}"
+    return True, f"Closed {channel.name} ({channel.port})"
+
+
+def channels() -> List[Dict[str, Any]]:
+    """Reader state of every open channel, by channel number."""
+    with _CHANNELS_LOCK:
+        current = sorted(_CHANNELS.items())
+    return [channel.stats() for _, channel in current]
+
+
+def set_process_decode(enabled: bool) -> None:
+    """Read and decode connections opened from now on in a child process."""
+    global _PROCESS_DECODE
+    _PROCESS_DECODE = bool(enabled)
+
+
+def process_decode_enabled() -> bool:
+    return _PROCESS_DECODE
+
 
+def _open_channel(
+    index: int,
+    port: str,
+    baudrate: int,
+    name: Optional[str],
+    timeout: float,
+    process: Optional[bool] = None,
+) -> Tuple[bool, str]:
+    # ``index`` was reserved in _OPENING by the caller
+    if process is None:
+        process = _PROCESS_DECODE
+    channel = SerialChannel(index, port, baudrate, name, process=process)
     try:
-        s = serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
-        if not s.is_open:
-            s.open()
-        _SER = s
-        _SELECTED_PORT = port
-        # Start reader thread now that we are connected
-        try:
-            start_reader()
-        except Exception:
-            pass
-        try:
-            push_jtag_line(f"[Serial] Connected: {port} @ {baudrate}")
-        except Exception:
-            pass
-        return True, f"Connected to {port}"
+        channel.open(timeout)
     except Exception as e:
-        _SELECTED_PORT = None
+        with _CHANNELS_LOCK:
+            _OPENING.pop(index, None)
         return False, f"Failed to connect: {e}"
+    with _CHANNELS_LOCK:
+        _OPENING.pop(index, None)
+        _CHANNELS[index] = channel
+    # Start the reader now that we are connected
+    try:
+        _start_channel(channel)
+    except Exception:
+        pass
+    label = port if index == 0 else f"{channel.name} {port}"
+    suffix = " (decoder process)" if process else ""
+    try:
+        push_jtag_line(f"[Serial] Connected: {label} @ {baudrate}{suffix}")
+    except Exception:
+        pass
+    return True, f"Connected to {label}"
+
+
+def _close_channel(index: int) -> Optional[SerialChannel]:
+    with _CHANNELS_LOCK:
+        channel = _CHANNELS.pop(index, None)
+    if channel is not None:
+        channel.close()
+    return channel
 
 
 def is_connected() -> bool:
-    try:
-        return bool(_SER and _SER.is_open)
-    except Exception:
-        return False
+    with _CHANNELS_LOCK:
+        current = list(_CHANNELS.values())
+    return any(channel.is_open for channel in current)
 
 
 def selected_port() -> Optional[str]:
-    return _SELECTED_PORT
+    channel = _CHANNELS.get(0)
+    return channel.port if channel else None
 
 
 def disconnect() -> Tuple[bool, str]:
-    """Close the serial port and stop reader."""
-    global _SER, _SELECTED_PORT
+    """Close every channel and stop the readers."""
     try:
-        stop_reader()
-        if _SER and _SER.is_open:
-            _SER.close()
-        _SER = None
-        _SELECTED_PORT = None
+        with _CHANNELS_LOCK:
+            indices = list(_CHANNELS)
+        for index in indices:
+            _close_channel(index)
         return True, "Disconnected"
     except Exception as e:
         return False, f"Failed to disconnect: {e}"
@@ -105,99 +186,107 @@ def read_JTAG():
     start_reader()
 
 
-def _reader_loop():
-    global _SER, _STOP_EVENT, _READ_Q
-    buf = bytearray()
-    last_activity = time.monotonic()
+def attach_event_loop(
+    on_items: Callable[[List[StreamItem]], None],
+    latency_s: float = DEFAULT_LATENCY_S,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> None:
+    """Deliver serial batches to ``on_items`` on the event loop from now on.
 
-    def _emit_line(raw: bytes) -> None:
-        try:
-            _READ_Q.put(raw.decode(errors="replace"))
-        except Exception:
-            _READ_Q.put("<binary>")
+    Call from the running loop (e.g. an app startup handler). Connections
+    opened afterwards use an :class:`AsyncSerialReader` instead of the reader
+    thread and queue; ``latency_s`` bounds how long items are held to batch.
+    """
+    global _LOOP, _ON_ITEMS, _BATCH_LATENCY_S
+    _LOOP = loop or asyncio.get_running_loop()
+    _ON_ITEMS = on_items
+    _BATCH_LATENCY_S = float(latency_s)
+
+
+def detach_event_loop() -> None:
+    """Return to the reader thread and queue for connections opened afterwards."""
+    global _LOOP, _ON_ITEMS
+    _LOOP = None
+    _ON_ITEMS = None
 
-    while _STOP_EVENT and not _STOP_EVENT.is_set():
-        try:
-            if not (_SER and _SER.is_open):
-                time.sleep(0.2)
-                continue
-            # Read available bytes (timeout driven)
-            chunk = _SER.read(256)
-            if not chunk:
-                # If we have buffered data but no newline, flush occasionally
-                if buf and (time.monotonic() - last_activity) > 0.5:
-                    _emit_line(bytes(buf))
-                    buf.clear()
-                continue
-
-            buf.extend(chunk)
-            last_activity = time.monotonic()
-
-            # Split on either LF or CR, whichever comes first
-            cursor = 0
-            upper = len(buf)
-            while cursor < upper:
-                b = buf[cursor]
-                if b not in (0x0A, 0x0D):
-                    cursor += 1
-                    continue
-
-                line = buf[:cursor]
-                # Consume newline sequence (handle CRLF gracefully)
-                drop = 1
-                if b == 0x0D and cursor + 1 < upper and buf[cursor + 1] == 0x0A:
-                    drop = 2
-                else:
-                    # Remove stray carriage return that may precede LF
-                    if line.endswith(b"\r"):
-                        line = line[:-1]
-
-                _emit_line(bytes(line))
-
-                # Remove processed bytes + newline terminator
-                del buf[:cursor + drop]
-                upper = len(buf)
-                cursor = 0
-
-            # Guard against extremely long buffers that never newline
-            if len(buf) > 4096:
-                _emit_line(bytes(buf))
-                buf.clear()
-        except Exception:
-            # Be resilient: small backoff on errors
-            time.sleep(0.1)
-    # Flush remaining buffer on stop
-    if buf:
-        _emit_line(bytes(buf))
+
+def set_batch_latency(latency_s: float) -> None:
+    global _BATCH_LATENCY_S
+    _BATCH_LATENCY_S = float(latency_s)
+    with _CHANNELS_LOCK:
+        current = list(_CHANNELS.values())
+    for channel in current:
+        channel.set_latency(latency_s)
+
+
+def reader_stats() -> Dict[str, Any]:
+    """Reader state of channel 0 (see :func:`channels` for all of them)."""
+    channel = _CHANNELS.get(0)
+    if channel is None:
+        return {'mode': 'stopped', 'pending': pending_count()}
+    stats = channel.stats()
+    stats['pending'] = pending_count()
+    return stats
+
+
+def _start_channel(channel: SerialChannel) -> None:
+    def on_error(exc: BaseException) -> None:
+        if _ON_ITEMS:
+            _ON_ITEMS([f"[Serial] {channel.name} reader stopped: {exc}"])
+
+    channel.start(_READ_Q, _LOOP, _ON_ITEMS, _BATCH_LATENCY_S, on_error)
 
 
 def start_reader():
-    """Start background reader thread if not already running."""
-    global _READ_THREAD, _STOP_EVENT
-    if _READ_THREAD and _READ_THREAD.is_alive():
-        return
-    _STOP_EVENT = threading.Event()
-    _READ_THREAD = threading.Thread(target=_reader_loop, name="serial-reader", daemon=True)
-    _READ_THREAD.start()
+    """Start the readers of all channels (event loop if attached, else threads)."""
+    with _CHANNELS_LOCK:
+        current = list(_CHANNELS.values())
+    for channel in current:
+        _start_channel(channel)
 
 
 def stop_reader():
-    """Stop background reader thread (best-effort)."""
-    global _READ_THREAD, _STOP_EVENT
-    try:
-        if _STOP_EVENT:
-            _STOP_EVENT.set()
-        if _READ_THREAD and _READ_THREAD.is_alive():
-            _READ_THREAD.join(timeout=1.0)
-    except Exception:
-        pass
-    finally:
-        _READ_THREAD = None
+    """Stop the readers of all channels (best-effort); ports stay open."""
+    with _CHANNELS_LOCK:
+        current = list(_CHANNELS.values())
+    for channel in current:
+        channel.stop()
+
+
+def set_queue_policy(policy: Optional[str] = None, maxsize: Optional[int] = None) -> None:
+    """Change the overflow policy or size of the reader -> UI queue.
+
+    ``policy`` is one of ``bounded_queue.POLICIES``; raises ``ValueError``
+    otherwise.
+    """
+    _READ_Q.configure(maxsize=maxsize, policy=policy)
+
 
+def queue_stats() -> Dict[str, Any]:
+    """Policy, size, high-water mark and drop counters of the reader queue."""
+    return _READ_Q.stats()
 
-def get_pending_lines(max_items: int = 200) -> List[str]:
-    """Drain up to max_items lines read from the serial/JTAG stream."""
-    out: List[str] = []
+
+def drop_stats() -> Dict[str, int]:
+    """What the host side lost before the UI saw it, by drop point.
+
+    ``host_queue_*`` is the reader queue, ``reader_frames`` batches an
+    event-loop reader could not hand to a stalled loop and ``decoder_ring``
+    full shared-memory rings of decoder processes (open channels only).
+    """
+    with _CHANNELS_LOCK:
+        current = [channel.stats() for channel in _CHANNELS.values()]
+    return {
+        'host_queue_items': _READ_Q.items_dropped,
+        'host_queue_frames': _READ_Q.frames_dropped,
+        'reader_frames': sum(stats.get('frames_dropped', 0) for stats in current),
+        'decoder_ring': sum(stats.get('ring_dropped', 0) for stats in current),
+    }
+
+
+def get_pending_lines(max_items: int = 200) -> List[StreamItem]:
+    """Drain up to max_items lines or binary frame batches from the stream."""
+    out: List[StreamItem] = []
     for _ in range(max_items):
         try:
             out.append(_READ_Q.get_nowait())
@@ -206,6 +295,17 @@ def get_pending_lines(max_items: int = 200) -> List[str]:
     return out
 
 
+def push_frames(frames: List[Dict[str, Any]]) -> None:
+    """Push an already decoded frame batch, as the binary decoder would."""
+    if frames:
+        _READ_Q.put(list(frames))
+
+
+def pending_count() -> int:
+    """Approximate number of lines/batches waiting to be drained."""
+    return _READ_Q.qsize()
+
+
 def push_jtag_line(line: str) -> None:
     """Externally push a line into the JTAG output queue."""
     try:
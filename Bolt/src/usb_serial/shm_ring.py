@@ -0,0 +1,196 @@
+"""Frame ring buffer in shared memory, for a decoder running in another process.
+
+One process writes, one process reads. The block starts with a 64-byte
+header followed by ``capacity`` fixed-size records::
+
+    header  = head (u64) | tail (u64) | capacity (u64) | dropped (u64) | lines (u64) | padding
+    record  = ts_us (u64 LE) | id (u32 LE) | flags (u8) | dlc (u8) | data (8 bytes) | seq (u16 LE)
+
+Records use the binary transport layout (see ``binary_codec``); an extra
+flag bit says whether the frame carried a firmware ``seq``. ``head`` and
+``dropped`` (and ``lines``, the text lines the producer has sent on
+another channel, see ``decode_process``) are only written by the producer
+and ``tail`` only by the consumer, so neither side needs a lock: the producer copies records in
+first and publishes them by advancing ``head``. Frames cross the process
+boundary as plain bytes, nothing is pickled. When the consumer falls behind
+and the ring is full, new frames are dropped and counted.
+"""
+
+from __future__ import annotations
+
+import struct
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence
+
+from .binary_codec import FLAG_EXT, FLAG_RTR
+
+# Frames the ring holds by default (about 1.5 MB)
+DEFAULT_CAPACITY = 65536
+
+_HEADER_SIZE = 64
+_U64 = struct.Struct('<Q')
+_HEAD, _TAIL, _CAPACITY, _DROPPED, _LINES = 0, 8, 16, 24, 32
+_RECORD = struct.Struct('<QIBB8sH')
+# Ring-only flag: the record's seq field is valid
+_FLAG_SEQ = 0x04
+_PAD = b'\x00' * 8
+
+
+class FrameRing:
+    """Single-producer/single-consumer frame ring over ``SharedMemory``.
+
+    Create it with :meth:`create` in the consumer and open it by name with
+    :meth:`attach` in the producer. The creator unlinks the block on
+    :meth:`close`.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self._shm = shm
+        self._buf = shm.buf
+        self._owner = owner
+        self.capacity = _U64.unpack_from(self._buf, _CAPACITY)[0]
+        self._records = self._buf[_HEADER_SIZE : _HEADER_SIZE + self.capacity * _RECORD.size]
+
+    @classmethod
+    def create(cls, capacity: int = DEFAULT_CAPACITY) -> 'FrameRing':
+        capacity = max(int(capacity), 1)
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_SIZE + capacity * _RECORD.size)
+        shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        _U64.pack_into(shm.buf, _CAPACITY, capacity)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'FrameRing':
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def written(self) -> int:
+        """Frames published since the ring was created."""
+        return _U64.unpack_from(self._buf, _HEAD)[0]
+
+    @property
+    def consumed(self) -> int:
+        """Frames taken by the consumer so far (the ring's tail)."""
+        return _U64.unpack_from(self._buf, _TAIL)[0]
+
+    @property
+    def dropped(self) -> int:
+        return _U64.unpack_from(self._buf, _DROPPED)[0]
+
+    @property
+    def pending(self) -> int:
+        return self.written - _U64.unpack_from(self._buf, _TAIL)[0]
+
+    @property
+    def lines(self) -> int:
+        """Text lines the producer announced with :meth:`count_line`."""
+        return _U64.unpack_from(self._buf, _LINES)[0]
+
+    def count_line(self) -> None:
+        """Producer: announce one more text line sent outside the ring."""
+        _U64.pack_into(self._buf, _LINES, self.lines + 1)
+
+    # -- producer ------------------------------------------------------------
+
+    def write(self, frames: Sequence[Dict[str, Any]]) -> int:
+        """Append frame dicts; returns how many fit (the rest are dropped)."""
+        buf = self._buf
+        head = _U64.unpack_from(buf, _HEAD)[0]
+        free = self.capacity - (head - _U64.unpack_from(buf, _TAIL)[0])
+        count = min(len(frames), free)
+        if count < len(frames):
+            _U64.pack_into(buf, _DROPPED, self.dropped + len(frames) - count)
+        if count <= 0:
+            return 0
+        pack = _RECORD.pack
+        records = []
+        for frame in frames[:count]:
+            data = frame.get('data') or b''
+            if isinstance(data, str):
+                try:
+                    data = bytes.fromhex(data)
+                except ValueError:
+                    data = b''
+            flags = (FLAG_EXT if frame.get('ext') else 0) | (FLAG_RTR if frame.get('rtr') else 0)
+            seq = frame.get('seq')
+            if seq is not None:
+                flags |= _FLAG_SEQ
+            records.append(
+                pack(
+                    frame.get('ts_us') or 0,
+                    (frame.get('id') or 0) & 0xFFFFFFFF,
+                    flags,
+                    min(frame.get('dlc') or 0, 8),
+                    data if len(data) == 8 else (data[:8] + _PAD)[:8],
+                    (seq or 0) & 0xFFFF,
+                )
+            )
+        self._copy_in(head, b''.join(records))
+        _U64.pack_into(buf, _HEAD, head + count)
+        return count
+
+    def _copy_in(self, head: int, block: bytes) -> None:
+        size = _RECORD.size
+        start = (head % self.capacity) * size
+        first = min(len(block), len(self._records) - start)
+        self._records[start : start + first] = block[:first]
+        if first < len(block):
+            self._records[: len(block) - first] = block[first:]
+
+    # -- consumer ------------------------------------------------------------
+
+    def read(self, max_frames: Optional[int] = None, channel: int = 0) -> List[Dict[str, Any]]:
+        """Take up to ``max_frames`` published frames as frame dicts."""
+        buf = self._buf
+        tail = _U64.unpack_from(buf, _TAIL)[0]
+        count = _U64.unpack_from(buf, _HEAD)[0] - tail
+        if max_frames is not None:
+            count = min(count, max_frames)
+        if count <= 0:
+            return []
+        size = _RECORD.size
+        start = (tail % self.capacity) * size
+        end = start + count * size
+        if end <= len(self._records):
+            block = bytes(self._records[start:end])
+        else:
+            block = bytes(self._records[start:]) + bytes(self._records[: end - len(self._records)])
+        _U64.pack_into(buf, _TAIL, tail + count)
+
+        frames: List[Dict[str, Any]] = []
+        append = frames.append
+        for ts_us, identifier, flags, dlc, data, seq in _RECORD.iter_unpack(block):
+            frame = {
+                'id': identifier,
+                'ts_us': ts_us,
+                'dlc': dlc,
+                'ext': bool(flags & FLAG_EXT),
+                'rtr': bool(flags & FLAG_RTR),
+                'data': b'' if flags & FLAG_RTR else data[:dlc],
+                'channel': channel,
+            }
+            if flags & _FLAG_SEQ:
+                frame['seq'] = seq
+            append(frame)
+        return frames
+
+    def close(self) -> None:
+        """Release the mapping; the creating side also unlinks the block."""
+        self._records.release()
+        self._buf = None  # type: ignore[assignment]
+        try:
+            self._shm.close()
+        except Exception:
+            pass
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except Exception:
+                pass
+
+
+__all__ = ['DEFAULT_CAPACITY', 'FrameRing']
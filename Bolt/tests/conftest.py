@@ -0,0 +1,6 @@
+"""Run the tests against the sources in ``src`` (the app is not installed as a package)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from usb_serial import binary_codec
+
+
+@pytest.mark.parametrize(
+    'data',
+    [b'', b'\x00', b'\x00\x00', b'\x11\x00\x22', bytes(range(1, 255)), bytes(range(1, 256)), b'\x01' * 600],
+)
+def test_cobs_round_trip(data):
+    encoded = binary_codec.cobs_encode(data)
+    assert 0 not in encoded
+    assert binary_codec.cobs_decode(encoded) == data
+
+
+def test_cobs_round_trip_random():
+    rng = random.Random(7)
+    for _ in range(200):
+        data = bytes(rng.choice((0, rng.randrange(256))) for _ in range(rng.randrange(600)))
+        assert binary_codec.cobs_decode(binary_codec.cobs_encode(data)) == data
+
+
+def test_cobs_decode_rejects_truncated_block():
+    with pytest.raises(ValueError):
+        binary_codec.cobs_decode(b'\x05\x01\x02')
+
+
+FRAMES = [
+    {'id': 0x123, 'ts_us': 1_000_000, 'dlc': 3, 'data': b'\x01\x02\x03', 'seq': 7},
+    {'id': 0x1ABCDEF0, 'ts_us': 1_000_250, 'dlc': 8, 'data': bytes(range(8)), 'ext': True, 'seq': 65535},
+    {'id': 0x7DF, 'ts_us': 1_000_500, 'dlc': 2, 'rtr': True, 'seq': 0},
+]
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_packet_round_trip(version):
+    packet = binary_codec.encode_packet(FRAMES, version=version)
+    assert packet[0] == 0 and packet[-1] == 0 and 0 not in packet[1:-1]
+    decoded = binary_codec.decode_packet(packet[1:-1])
+    assert [(f['id'], f['ts_us'], f['dlc'], f['ext'], f['rtr']) for f in decoded] == [
+        (0x123, 1_000_000, 3, False, False),
+        (0x1ABCDEF0, 1_000_250, 8, True, False),
+        (0x7DF, 1_000_500, 2, False, True),
+    ]
+    assert decoded[0]['data'] == b'\x01\x02\x03'
+    assert decoded[1]['data'] == bytes(range(8))
+    assert decoded[2]['data'] == b''
+    if version == 2:
+        assert [f['seq'] for f in decoded] == [7, 65535, 0]
+    else:
+        assert all('seq' not in f for f in decoded)
+
+
+def test_decode_batch_rejects_bad_magic_and_length():
+    batch = binary_codec.encode_batch(FRAMES)
+    with pytest.raises(ValueError):
+        binary_codec.decode_batch(b'\x00' + batch[1:])
+    with pytest.raises(ValueError):
+        binary_codec.decode_batch(batch[:-1])
@@ -0,0 +1,17 @@
+from analysis.bus_stats import BusStats, frame_bits
+
+
+def test_frame_bits_grow_with_payload():
+    assert frame_bits(False, 0) < frame_bits(False, 8) < frame_bits(True, 8)
+
+
+def test_quiet_bus_reads_zero():
+    stats = BusStats(500_000)
+    for i in range(3000):
+        stats.update(i * 1000, 0x100, False, 8)
+    busy = stats.summary()
+    assert busy['frames_per_s'][1] > 0 and busy['bus_load'][1] > 0
+    # Nothing arrives for ten seconds of host time
+    quiet = stats.summary(now=stats._head_host + 10.0)
+    assert quiet['frames_per_s'][1] == 0.0
+    assert quiet['bus_load'][1] == 0.0
@@ -0,0 +1,38 @@
+import pytest
+
+from capture import capture_file
+
+FRAMES = [
+    {'id': 0x123, 'ts_us': 5, 'dlc': 2, 'data': b'\x01\x02', 'channel': 0},
+    {'id': 0x1FFFFFFF, 'ts_us': 6, 'dlc': 8, 'data': bytes(range(8)), 'ext': True, 'channel': 2},
+    {'id': 0x7DF, 'ts_us': 7, 'dlc': 4, 'rtr': True, 'channel': 1},
+]
+
+
+def test_records_round_trip_with_channel():
+    block = capture_file.pack_frames(FRAMES)
+    assert len(block) == 3 * capture_file.RECORD_SIZE
+    frames = capture_file.unpack_records(block)
+    assert [(f['id'], f['ts_us'], f['dlc'], f['ext'], f['rtr'], f['channel']) for f in frames] == [
+        (0x123, 5, 2, False, False, 0),
+        (0x1FFFFFFF, 6, 8, True, False, 2),
+        (0x7DF, 7, 4, False, True, 1),
+    ]
+    assert frames[1]['data'] == bytes(range(8)) and frames[2]['data'] == b''
+
+
+def test_version_1_records_read_as_channel_0():
+    v1 = capture_file.record_struct(1)
+    block = v1.pack(9, 0x42, 0, 1, b'\x07'.ljust(8, b'\x00'))
+    header = capture_file.HEADER.pack(capture_file.MAGIC, 1, v1.size)
+    assert capture_file.check_header(header) == 1
+    (frame,) = capture_file.unpack_records(block, version=1)
+    assert (frame['id'], frame['data'], frame['channel']) == (0x42, b'\x07', 0)
+
+
+def test_check_header_rejects_other_files():
+    assert capture_file.check_header(capture_file.header_bytes()) == capture_file.VERSION
+    with pytest.raises(ValueError):
+        capture_file.check_header(b'NOTBOLT\x00' + bytes(8))
+    with pytest.raises(ValueError):
+        capture_file.check_header(capture_file.header_bytes()[:4])
@@ -0,0 +1,46 @@
+import queue
+import random
+import threading
+
+from usb_serial.decode_process import ProcessReader
+from usb_serial.shm_ring import FrameRing
+
+
+def test_drain_keeps_lines_in_order_with_frames():
+    # The child side is played by a thread writing the ring and the queue
+    reader = ProcessReader('unused', 115200)
+    reader._ring = FrameRing.create(256)
+    reader._messages = queue.Queue()
+    producer = FrameRing.attach(reader._ring.name)
+    total = 5000
+    done = threading.Event()
+
+    def child():
+        rng = random.Random(1)
+        for i in range(total):
+            if rng.random() < 0.1:
+                reader._messages.put(('line', producer.written, f'L{i}'))
+                producer.count_line()
+            else:
+                while not producer.write([{'id': i, 'ts_us': i, 'dlc': 0}]):
+                    pass
+        done.set()
+
+    thread = threading.Thread(target=child)
+    thread.start()
+    order = []
+    try:
+        while True:
+            finished = done.is_set()
+            for item in reader.drain():
+                if isinstance(item, str):
+                    order.append(int(item[1:]))
+                else:
+                    order.extend(frame['id'] for frame in item)
+            if finished and not reader._held and not reader._ring.pending and reader._messages.empty():
+                break
+    finally:
+        thread.join()
+        producer.close()
+        reader._ring.close()
+    assert order == list(range(total))
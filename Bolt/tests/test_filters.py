@@ -0,0 +1,66 @@
+import pytest
+
+from gui.filters import ExpressionFilter, FilterSyntaxError, TextFilter, compile_filter, parse_filter
+from gui.frame_store import FLAG_EXT, FrameStore
+
+
+@pytest.fixture
+def store():
+    store = FrameStore(1000)
+    for i in range(100):
+        flags = FLAG_EXT if i % 10 == 0 else 0
+        payload = bytes([i, i * 2 & 0xFF, 0x30 | i % 4])
+        store.append(1_000_000 + i * 1000, 0x100 + i % 20, flags, i % 9, payload, '', i % 3)
+    return store
+
+
+def _brute(store, predicate):
+    return [seq for seq in store.seqs() if predicate(store.row(seq), store.channel(seq))]
+
+
+@pytest.mark.parametrize(
+    'text, predicate',
+    [
+        ('id == 0x105', lambda row, ch: row[2] == 0x105),
+        ('id in [0x100, 0x110..0x113]', lambda row, ch: row[2] == 0x100 or 0x110 <= row[2] <= 0x113),
+        ('ext', lambda row, ch: bool(row[3] & FLAG_EXT)),
+        ('dlc < 3 and not ext', lambda row, ch: row[4] < 3 and not row[3] & FLAG_EXT),
+        ('data[2] & 0xF0 == 0x30', lambda row, ch: len(row[5]) > 2 and row[5][2] & 0xF0 == 0x30),
+        ('channel == 1 || id == 0x101', lambda row, ch: ch == 1 or row[2] == 0x101),
+        ('time >= 10 and time < 20', lambda row, ch: 10 <= (row[1] - 1_000_000) / 1000 < 20),
+        ('ts_us > 1050000', lambda row, ch: row[1] > 1_050_000),
+    ],
+)
+def test_expression_matches_brute_force(store, text, predicate):
+    compiled = compile_filter(text)
+    assert isinstance(compiled, ExpressionFilter)
+    assert compiled.scan(store, 0, 1_000_000) == _brute(store, predicate)
+
+
+def test_scan_from_start_seq(store):
+    compiled = parse_filter('id == 0x100')
+    assert compiled.scan(store, 50) == [seq for seq in compiled.scan(store, 0) if seq >= 50]
+
+
+def test_time_uses_channel_offsets(store):
+    # Channel 1's clock runs an hour ahead; the table shows its frames shifted back
+    offsets = {1: -3600 * 10**6}
+    shifted = FrameStore(10)
+    shifted.append(1_000_000, 0x1, 0, 0, b'', '', 0)
+    shifted.append(3600 * 10**6 + 1_000_500, 0x2, 0, 0, b'', '', 1)
+    compiled = parse_filter('time < 2')
+    assert compiled.scan(shifted, 0, 1_000_000, offsets) == [shifted.first_seq, shifted.first_seq + 1]
+    assert compiled.scan(shifted, 0, 1_000_000) == [shifted.first_seq]
+
+
+def test_fallback_to_text_search(store):
+    compiled = compile_filter('0x105')
+    assert isinstance(compiled, TextFilter)
+    assert compiled.scan(store, 0) == _brute(store, lambda row, ch: row[2] == 0x105)
+    assert compile_filter('  ') is None
+
+
+@pytest.mark.parametrize('text', ['id ==', 'data[2 == 1', 'id in [1..', 'dlc < < 3'])
+def test_syntax_errors(text):
+    with pytest.raises(FilterSyntaxError):
+        parse_filter(text)
@@ -0,0 +1,41 @@
+import random
+
+from gui.frame_store import FrameStore, sorted_page
+
+
+def _fill(store, count, seed=3):
+    rng = random.Random(seed)
+    for i in range(count):
+        store.append(i * 100, rng.randrange(0x100, 0x110), 0, rng.randrange(9), bytes([i & 0xFF]), '', rng.randrange(3))
+
+
+def test_ring_wraps_and_keeps_newest():
+    store = FrameStore(50)
+    _fill(store, 120)
+    assert len(store) == 50
+    assert store.last_seq - store.first_seq == 49
+    assert not store.contains(store.first_seq - 1)
+    assert store.row(store.last_seq)[1] == 119 * 100
+    assert sum(store.id_count(i) for i in store.present_ids()) == 50
+    assert sum(store.channel_count(c) for c in store.present_channels()) == 50
+
+
+def test_sorted_page_matches_brute_force():
+    store = FrameStore(200)
+    _fill(store, 700)
+    key = {'ids': lambda seq: store.row(seq)[2], 'dlc': lambda seq: store.row(seq)[4], 'channels': store.channel}
+    for column, value in key.items():
+        groups = store.index_groups(column)
+        for descending in (False, True):
+            expected = sorted(store.seqs(), key=lambda seq: (value(seq), seq), reverse=descending)
+            for start, stop in ((0, 20), (37, 80), (180, 230)):
+                assert sorted_page(groups, start, stop, descending) == expected[start:stop]
+
+
+def test_snapshot_is_isolated_from_later_appends():
+    store = FrameStore(10)
+    _fill(store, 10)
+    snapshot = store.snapshot()
+    before = list(snapshot.ts_us)
+    _fill(store, 10, seed=4)
+    assert list(snapshot.ts_us) == before and len(snapshot) == 10
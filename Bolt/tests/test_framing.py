@@ -0,0 +1,50 @@
+from usb_serial import binary_codec
+from usb_serial.framing import ChannelLine, StreamDecoder
+
+LINE = b'{"type":"can","ts_us":1000,"id":291,"ext":false,"rtr":false,"dlc":2,"data":"0A0B","seq":5}'
+
+
+def _feed_all(decoder, data, step=None):
+    out = []
+    if step is None:
+        out.extend(decoder.feed(data))
+    else:
+        for start in range(0, len(data), step):
+            out.extend(decoder.feed(data[start : start + step]))
+    return out
+
+
+def test_text_lines_are_parsed_and_grouped():
+    out = _feed_all(StreamDecoder(), LINE + b'\n' + LINE + b'\nI (123) boot: hello\n' + LINE + b'\n')
+    assert [type(item) for item in out] == [list, str, list]
+    assert len(out[0]) == 2 and len(out[2]) == 1
+    frame = out[0][0]
+    assert (frame['id'], frame['ts_us'], frame['dlc'], frame['data'], frame['seq']) == (291, 1000, 2, b'\x0a\x0b', 5)
+    assert out[1] == 'I (123) boot: hello'
+
+
+def test_partial_line_waits_for_more_data():
+    decoder = StreamDecoder()
+    assert decoder.feed(LINE[:20]) == []
+    assert decoder.pending == 20
+    out = decoder.feed(LINE[20:] + b'\n')
+    assert len(out) == 1 and out[0][0]['id'] == 291
+
+
+def test_first_zero_byte_switches_to_binary():
+    frames = [{'id': 0x100 + i, 'ts_us': 10 * i, 'dlc': 1, 'data': bytes([i]), 'seq': i} for i in range(5)]
+    stream = b'I (1) boot: starting\n' + binary_codec.encode_packet(frames) + b'log between batches\x00'
+    for step in (None, 1, 7):
+        decoder = StreamDecoder()
+        out = _feed_all(decoder, stream, step)
+        assert decoder.binary
+        assert out[0] == 'I (1) boot: starting'
+        assert [f['id'] for f in out[1]] == [0x100 + i for i in range(5)]
+        assert out[2] == 'log between batches'
+        assert decoder.batches == 1
+
+
+def test_channel_tags_frames_and_lines():
+    out = StreamDecoder(channel=3).feed(LINE + b'\nhello\n')
+    assert out[0][0]['channel'] == 3
+    assert isinstance(out[1], ChannelLine) and out[1].channel == 3
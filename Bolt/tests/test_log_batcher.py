@@ -0,0 +1,51 @@
+from gui.log_batcher import LogBatcher, RotatingLogFile
+
+
+def _flood(batcher, ticks, per_tick, interval=0.1):
+    out = []
+    for tick in range(ticks):
+        for i in range(per_tick):
+            batcher.add(f'task {chr(65 + i % 26)}{i} tick {tick}')
+        out.extend(batcher.flush(now=tick * interval))
+    return out
+
+
+def test_repeats_collapse():
+    batcher = LogBatcher(0)
+    for i in range(5):
+        batcher.add(f'bus error count={i}')
+    batcher.add('other')
+    assert batcher.flush(now=0) == ['bus error count=4  [x5]', 'other']
+
+
+def test_cap_below_render_rate_still_shows_lines():
+    # 5 lines/s at 10 ticks/s: half a line per tick
+    out = _flood(LogBatcher(5), ticks=50, per_tick=40)
+    assert len(out) <= 5 + 5 * 5
+    real = [line for line in out if not line.startswith('...')]
+    assert len(real) >= 20
+    assert any('not shown' in line for line in out)
+
+
+def test_uncapped_shows_everything():
+    out = _flood(LogBatcher(0), ticks=3, per_tick=10)
+    assert len(out) == 30
+
+
+def test_file_gets_every_line(tmp_path):
+    path = tmp_path / 'monitor.log'
+    batcher = LogBatcher(1, RotatingLogFile(str(path)))
+    _flood(batcher, ticks=5, per_tick=100)
+    batcher.close()
+    assert len(path.read_text().splitlines()) == 500
+
+
+def test_log_file_rotates(tmp_path):
+    path = tmp_path / 'monitor.log'
+    log_file = RotatingLogFile(str(path), max_bytes=1000, backups=2)
+    for i in range(100):
+        log_file.write_lines([f'line {i:04d} ' + 'x' * 40])
+    log_file.close()
+    assert (tmp_path / 'monitor.log.1').exists() and (tmp_path / 'monitor.log.2').exists()
+    assert not (tmp_path / 'monitor.log.3').exists()
+    assert path.stat().st_size <= 1000
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from usb_serial import channel as channel_module
+from usb_serial import serial_handler
+
+
+@pytest.fixture
+def fake_ports(monkeypatch):
+    """Channels that 'open' without hardware; records which ports were closed."""
+    closed = []
+
+    def fake_open(self, timeout=1.0):
+        time.sleep(0.005)
+
+    monkeypatch.setattr(channel_module.SerialChannel, 'open', fake_open)
+    monkeypatch.setattr(channel_module.SerialChannel, 'start', lambda self, *args, **kwargs: None)
+    monkeypatch.setattr(channel_module.SerialChannel, 'close', lambda self: closed.append(self.port))
+    monkeypatch.setattr(serial_handler, 'push_jtag_line', lambda line: None)
+    yield closed
+    serial_handler.disconnect()
+
+
+def _ports():
+    return {index: channel.port for index, channel in serial_handler._CHANNELS.items()}
+
+
+def test_connect_refuses_a_port_held_by_another_channel(fake_ports):
+    assert serial_handler.connect('/dev/a')[0]
+    assert serial_handler.add_channel('/dev/b')[0]
+    assert not serial_handler.connect('/dev/b')[0]
+    assert serial_handler.connect('/dev/c')[0]
+    assert _ports() == {0: '/dev/c', 1: '/dev/b'} and fake_ports == ['/dev/a']
+
+
+def test_concurrent_adds_get_distinct_channels(fake_ports):
+    results = []
+    threads = [
+        threading.Thread(target=lambda port=f'/dev/p{i}': results.append(serial_handler.add_channel(port)))
+        for i in range(260)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(ok for ok, _ in results) == 256
+    assert len(_ports()) == 256 and not serial_handler._OPENING
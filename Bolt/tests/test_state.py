@@ -0,0 +1,38 @@
+import pytest
+
+from gui import state as st
+
+HOUR_US = 3600 * 10**6
+
+
+def _frames(channel, start_us, identifier, count=10, step_us=100_000):
+    base = {'id': identifier, 'dlc': 0, 'data': b'', 'ext': False, 'rtr': False, 'channel': channel}
+    return [dict(base, ts_us=start_us + i * step_us) for i in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    st.clear_frames()
+    st.set_merge_channels(True)
+    yield
+    st.clear_frames()
+
+
+def test_time_filter_uses_aligned_channel_clocks():
+    st.append_frames(_frames(0, 1_000_000, 0x100))
+    # Channel 1's sniffer booted an hour earlier; its rows are aligned to channel 0
+    st.append_frames(_frames(1, HOUR_US + 1_000_000, 0x200))
+    _, total = st.query_frames(1, 100, filter_text='time < 2000')
+    assert total == 20
+
+
+def test_merged_pages_follow_aligned_time():
+    st.append_frames(_frames(0, 1_000_000, 0x100, step_us=100))
+    # Channel 1's first frame is aligned to the newest stored one (1_000_900)
+    st.append_frames(_frames(1, HOUR_US + 1_000_000, 0x200, step_us=100))
+    # Aligned, channel 1's next frames land 50 us after each of channel 0's
+    st.append_frames(_frames(0, 1_002_000, 0x101, step_us=100) + _frames(1, HOUR_US + 1_001_150, 0x201, step_us=100))
+    rows, total = st.query_frames(1, 40, descending=False)
+    assert total == 40
+    ids = [row['id_dec'] for row in rows]
+    assert ids[-20:] == [0x101, 0x201] * 10
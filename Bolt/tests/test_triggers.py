@@ -0,0 +1,40 @@
+from capture import triggers
+
+
+def _frame(channel, ts_us, identifier=1):
+    return {'id': identifier, 'ts_us': ts_us, 'dlc': 0, 'data': b'', 'channel': channel}
+
+
+def _engine(tmp_path):
+    engine = triggers.TriggerEngine(pre_frames=8, post_ms=10, post_frames=1000, directory=str(tmp_path))
+    return engine
+
+
+def test_pattern_trigger_fires_on_masked_match(tmp_path):
+    engine = _engine(tmp_path)
+    engine.add(triggers.Trigger.from_spec({'kind': 'pattern', 'id': '0x120', 'pattern': '12 30', 'mask': 'FF F0'}))
+    engine.offer_frames([{'id': 0x120, 'ts_us': 1, 'dlc': 2, 'data': b'\x12\x4f'}])
+    assert not engine.capturing
+    engine.offer_frames([{'id': 0x120, 'ts_us': 2, 'dlc': 2, 'data': b'\x12\x3f'}])
+    assert engine.capturing
+
+
+def test_post_window_runs_on_the_triggering_channel_clock(tmp_path):
+    engine = _engine(tmp_path)
+    engine.add(triggers.Trigger.from_spec({'kind': 'id', 'id': 0x10, 'channel': 1}))
+    # Channel 0's clock is far ahead of channel 1's
+    engine.offer_frames([_frame(0, 5_000_000), _frame(1, 100, 0x10)])
+    assert engine.capturing
+    engine.offer_frames([_frame(0, 5_000_100), _frame(1, 5_000)])
+    assert engine.capturing
+    engine.offer_frames([_frame(1, 20_000)])
+    assert not engine.capturing
+
+
+def test_holdoff_and_rearm(tmp_path):
+    engine = _engine(tmp_path)
+    trigger = engine.add(triggers.Trigger.from_spec({'kind': 'id', 'id': 5, 'holdoff_s': 60, 'rearm': False}))
+    engine.offer_frames([_frame(0, 1, 5)])
+    engine.finish()
+    engine.offer_frames([_frame(0, 2, 5)])
+    assert trigger.fired == 1 and not trigger.armed and not engine.capturing
@@ -5,4 +5,7 @@
 #define Oracle_on true
 #define CAN_on true
 
+// Oracle transport: false = one JSON line per frame, true = batched COBS binary
+#define Oracle_binary_on false
+
 #endif
@@ -12,15 +12,39 @@
 extern "C" {
 #endif
 
+// Binary transport (see Bolt/src/usb_serial/binary_codec.py)
+#define ORACLE_BINARY_MAGIC 0xB7
+// Version 2 appends the per-frame sequence number to every record
+#define ORACLE_BINARY_VERSION 2
+#define ORACLE_BINARY_HEADER_SIZE 4
+#define ORACLE_BINARY_RECORD_SIZE 24
+#define ORACLE_BINARY_FLAG_EXT 0x01
+#define ORACLE_BINARY_FLAG_RTR 0x02
+#define ORACLE_BATCH_MAX 32
+
 typedef struct {
     twai_message_t message;
     uint64_t timestamp_us;
+    // Counts every frame offered to Oracle_QueueFrame, dropped ones included,
+    // so a gap on the host equals the frames lost on the way
+    uint16_t seq;
 } oracle_can_frame_t;
 
+typedef struct {
+    uint32_t oracle_dropped;
+    uint32_t twai_rx_missed;
+    uint32_t twai_rx_overrun;
+    uint32_t queue_waiting;
+    uint16_t next_seq;
+} oracle_status_t;
+
 void Oracle_Setup(void);
 void Oracle_to_laptop(void *args);
 bool Oracle_QueueFrame(const twai_message_t *msg, uint64_t timestamp_us);
 size_t Oracle_FormatCANFrame(const oracle_can_frame_t *frame, char *buffer, size_t buffer_len);
+size_t Oracle_EncodeBinaryRecord(const oracle_can_frame_t *frame, uint8_t *buffer, size_t buffer_len);
+size_t Oracle_FormatStatus(const oracle_status_t *status, char *buffer, size_t buffer_len);
+size_t Oracle_COBSEncode(const uint8_t *input, size_t length, uint8_t *output, size_t output_len);
 
 #ifdef __cplusplus
 }
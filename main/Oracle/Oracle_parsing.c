@@ -5,6 +5,7 @@
 #include <string.h>
 
 #define ORACLE_JSON_TYPE "can"
+#define ORACLE_JSON_STATUS_TYPE "status"
 
 size_t Oracle_FormatCANFrame(const oracle_can_frame_t *frame, char *buffer, size_t buffer_len) {
     if (!frame || !buffer || buffer_len == 0) {
@@ -22,14 +23,15 @@ size_t Oracle_FormatCANFrame(const oracle_can_frame_t *frame, char *buffer, size
     int written = snprintf(
         buffer,
         buffer_len,
-        "{\"type\":\"%s\",\"ts_us\":%" PRIu64 ",\"id\":%u,\"ext\":%s,\"rtr\":%s,\"dlc\":%u,\"data\":\"%s\"}\n",
+        "{\"type\":\"%s\",\"ts_us\":%" PRIu64 ",\"id\":%u,\"ext\":%s,\"rtr\":%s,\"dlc\":%u,\"data\":\"%s\",\"seq\":%u}\n",
         ORACLE_JSON_TYPE,
         frame->timestamp_us,
         msg->identifier,
         msg->extd ? "true" : "false",
         msg->rtr ? "true" : "false",
         dlc,
-        data_hex);
+        data_hex,
+        (unsigned)frame->seq);
 
     if (written < 0) {
         return 0;
@@ -37,3 +39,89 @@ size_t Oracle_FormatCANFrame(const oracle_can_frame_t *frame, char *buffer, size
 
     return (size_t)written;
 }
+
+static inline void put_le(uint8_t *dst, uint64_t value, size_t width) {
+    for (size_t i = 0; i < width; ++i) {
+        dst[i] = (uint8_t)(value >> (8 * i));
+    }
+}
+
+size_t Oracle_EncodeBinaryRecord(const oracle_can_frame_t *frame, uint8_t *buffer, size_t buffer_len) {
+    if (!frame || !buffer || buffer_len < ORACLE_BINARY_RECORD_SIZE) {
+        return 0;
+    }
+
+    const twai_message_t *msg = &frame->message;
+    const uint8_t dlc = (msg->data_length_code <= 8) ? msg->data_length_code : 8;
+
+    uint8_t flags = 0;
+    if (msg->extd) {
+        flags |= ORACLE_BINARY_FLAG_EXT;
+    }
+    if (msg->rtr) {
+        flags |= ORACLE_BINARY_FLAG_RTR;
+    }
+
+    put_le(&buffer[0], frame->timestamp_us, 8);
+    put_le(&buffer[8], msg->identifier, 4);
+    buffer[12] = flags;
+    buffer[13] = dlc;
+    memset(&buffer[14], 0, 8);
+    memcpy(&buffer[14], msg->data, dlc);
+    put_le(&buffer[22], frame->seq, 2);
+
+    return ORACLE_BINARY_RECORD_SIZE;
+}
+
+size_t Oracle_FormatStatus(const oracle_status_t *status, char *buffer, size_t buffer_len) {
+    if (!status || !buffer || buffer_len == 0) {
+        return 0;
+    }
+
+    int written = snprintf(
+        buffer,
+        buffer_len,
+        "{\"type\":\"%s\",\"oracle_dropped\":%" PRIu32 ",\"twai_rx_missed\":%" PRIu32
+        ",\"twai_rx_overrun\":%" PRIu32 ",\"queue_waiting\":%" PRIu32 ",\"next_seq\":%u}\n",
+        ORACLE_JSON_STATUS_TYPE,
+        status->oracle_dropped,
+        status->twai_rx_missed,
+        status->twai_rx_overrun,
+        status->queue_waiting,
+        (unsigned)status->next_seq);
+
+    if (written < 0) {
+        return 0;
+    }
+
+    return (size_t)written;
+}
+
+size_t Oracle_COBSEncode(const uint8_t *input, size_t length, uint8_t *output, size_t output_len) {
+    // Worst case adds one overhead byte per 254 input bytes plus the leading code byte.
+    if (!input || !output || output_len < length + (length / 254) + 1) {
+        return 0;
+    }
+
+    size_t code_index = 0;
+    size_t out = 1;
+    uint8_t code = 1;
+
+    for (size_t i = 0; i < length; ++i) {
+        if (input[i] == 0) {
+            output[code_index] = code;
+            code_index = out++;
+            code = 1;
+            continue;
+        }
+        output[out++] = input[i];
+        if (++code == 0xFF) {
+            output[code_index] = code;
+            code_index = out++;
+            code = 1;
+        }
+    }
+    output[code_index] = code;
+
+    return out;
+}
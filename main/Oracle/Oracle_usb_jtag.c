@@ -1,3 +1,4 @@
+#include "ENV_variables.h"
 #include "Oracle.h"
 #include "main.h"
 
@@ -13,12 +14,19 @@
 
 #define ORACLE_QUEUE_LENGTH 64
 #define ORACLE_LOG_TAG "[ORACLE_JTAG]"
+// Drop counters are reported at most this often, and only when they changed
+#define ORACLE_STATUS_PERIOD_MS 1000
+
+#define ORACLE_BATCH_PAYLOAD_MAX (ORACLE_BINARY_HEADER_SIZE + ORACLE_BATCH_MAX * ORACLE_BINARY_RECORD_SIZE)
+// COBS overhead plus the leading and trailing 0x00 delimiters
+#define ORACLE_BATCH_PACKET_MAX (ORACLE_BATCH_PAYLOAD_MAX + (ORACLE_BATCH_PAYLOAD_MAX / 254) + 3)
 
 static QueueHandle_t s_frame_queue;
 static StaticQueue_t s_frame_queue_struct;
 static uint8_t s_frame_queue_storage[ORACLE_QUEUE_LENGTH * sizeof(oracle_can_frame_t)];
 
 static uint32_t s_dropped_frames;
+static uint16_t s_next_seq;
 
 static inline void ensure_usb_jtag_ready(void) {
     static bool s_installed = false;
@@ -57,6 +65,7 @@ void Oracle_Setup(void) {
     }
 
     s_dropped_frames = 0;
+    s_next_seq = 0;
 }
 
 bool Oracle_QueueFrame(const twai_message_t *msg, uint64_t timestamp_us) {
@@ -67,43 +76,116 @@ bool Oracle_QueueFrame(const twai_message_t *msg, uint64_t timestamp_us) {
     oracle_can_frame_t frame = {
         .message = *msg,
         .timestamp_us = timestamp_us,
+        .seq = s_next_seq++,
     };
 
     BaseType_t status = xQueueSend(s_frame_queue, &frame, 0);
     if (status != pdTRUE) {
+        // Counted for the status line; the host also sees the skipped seq as a gap
         s_dropped_frames++;
-        static uint32_t last_warn_ms;
-        uint32_t now_ms = (uint32_t)(xTaskGetTickCount() * portTICK_PERIOD_MS);
-        if (now_ms - last_warn_ms >= 1000) {
-            ESP_LOGW(ORACLE_LOG_TAG, "Dropping CAN frames: total=%" PRIu32, s_dropped_frames);
-            last_warn_ms = now_ms;
-        }
         return false;
     }
 
     return true;
 }
 
+static void Oracle_send_json(const oracle_can_frame_t *frame) {
+    char json_buffer[160];
+    size_t len = Oracle_FormatCANFrame(frame, json_buffer, sizeof(json_buffer));
+    if (len == 0) {
+        return;
+    }
+
+    if (len > sizeof(json_buffer)) {
+        len = sizeof(json_buffer);
+    }
+
+    usb_write_bytes(json_buffer, len);
+}
+
+static void Oracle_send_binary_batch(const oracle_can_frame_t *first) {
+    static uint8_t payload[ORACLE_BATCH_PAYLOAD_MAX];
+    static uint8_t packet[ORACLE_BATCH_PACKET_MAX];
+
+    oracle_can_frame_t frame = *first;
+    uint16_t count = 0;
+    size_t offset = ORACLE_BINARY_HEADER_SIZE;
+
+    // Drain whatever is already queued so one USB write carries several frames
+    do {
+        offset += Oracle_EncodeBinaryRecord(&frame, &payload[offset], sizeof(payload) - offset);
+        count++;
+    } while (count < ORACLE_BATCH_MAX && xQueueReceive(s_frame_queue, &frame, 0) == pdTRUE);
+
+    payload[0] = ORACLE_BINARY_MAGIC;
+    payload[1] = ORACLE_BINARY_VERSION;
+    payload[2] = (uint8_t)(count & 0xFF);
+    payload[3] = (uint8_t)(count >> 8);
+
+    packet[0] = 0x00;
+    size_t encoded = Oracle_COBSEncode(payload, offset, &packet[1], sizeof(packet) - 2);
+    if (encoded == 0) {
+        return;
+    }
+    packet[encoded + 1] = 0x00;
+
+    usb_write_bytes((const char *)packet, encoded + 2);
+}
+
+static void Oracle_send_status(void) {
+    static oracle_status_t s_reported;
+    static TickType_t s_last_check;
+
+    TickType_t now = xTaskGetTickCount();
+    if ((now - s_last_check) < pdMS_TO_TICKS(ORACLE_STATUS_PERIOD_MS)) {
+        return;
+    }
+    s_last_check = now;
+
+    oracle_status_t status = {
+        .oracle_dropped = s_dropped_frames,
+        .queue_waiting = (uint32_t)uxQueueMessagesWaiting(s_frame_queue),
+        .next_seq = s_next_seq,
+    };
+    twai_status_info_t info;
+    if (twai_get_status_info(&info) == ESP_OK) {
+        status.twai_rx_missed = info.rx_missed_count;
+        status.twai_rx_overrun = info.rx_overrun_count;
+    }
+    if (status.oracle_dropped == s_reported.oracle_dropped &&
+        status.twai_rx_missed == s_reported.twai_rx_missed &&
+        status.twai_rx_overrun == s_reported.twai_rx_overrun) {
+        return;
+    }
+    s_reported = status;
+
+    // Written between frames/batches; the host reads it like a log line
+    char buffer[192];
+    size_t len = Oracle_FormatStatus(&status, buffer, sizeof(buffer));
+    if (len == 0) {
+        return;
+    }
+    if (len > sizeof(buffer)) {
+        len = sizeof(buffer);
+    }
+    usb_write_bytes(buffer, len);
+}
+
 void Oracle_to_laptop(void *args) {
     (void)args;
 
     oracle_can_frame_t frame;
-    char json_buffer[160];
 
     for (;;) {
-        if (xQueueReceive(s_frame_queue, &frame, portMAX_DELAY) != pdTRUE) {
-            continue;
-        }
-
-        size_t len = Oracle_FormatCANFrame(&frame, json_buffer, sizeof(json_buffer));
-        if (len == 0) {
-            continue;
-        }
-
-        if (len > sizeof(json_buffer)) {
-            len = sizeof(json_buffer);
+        // Wake up at least once per status period so drops are reported when idle
+        if (xQueueReceive(s_frame_queue, &frame, pdMS_TO_TICKS(ORACLE_STATUS_PERIOD_MS)) == pdTRUE) {
+            if (Oracle_binary_on) {
+                Oracle_send_binary_batch(&frame);
+            } else {
+                Oracle_send_json(&frame);
+            }
         }
 
-        usb_write_bytes(json_buffer, len);
+        Oracle_send_status();
     }
 }